@@ -0,0 +1,236 @@
+import contextlib
+import fcntl
+import os
+from pathlib import Path
+import threading
+from typing import Dict, Generator, Iterator, NamedTuple, Tuple, Union
+
+from ethpm_cli.constants import ASSET_PACK, ASSET_PACK_INDEX
+
+
+def get_ipfs_asset_path(ethpm_dir: Path, ipfs_hash: str) -> Path:
+    """
+    ex.
+    ipfs hash: QmdvZEW3AaUntDfFkcbdnYzeLAAeD4YFeixQsdmHF88T6Q
+    dir store: ethpmcli/Qm/dv/ZE/QmdvZEW3AaUntDfFkcbdnYzeLAAeD4YFeixQsdmHF88T6Q
+    """
+    return ethpm_dir / ipfs_hash[0:2] / ipfs_hash[2:4] / ipfs_hash[4:6] / ipfs_hash
+
+
+class AssetLocation(NamedTuple):
+    """
+    Where a stored asset's bytes lie on disk.
+    """
+
+    path: Path
+    offset: int
+    length: int
+    # changes whenever the stored bytes may have changed
+    version: Tuple[int, int]
+
+
+def iter_loose_asset_paths(ethpm_dir: Path) -> Iterator[Path]:
+    """
+    Yields the path of every asset in the loose store under ethpm_dir, skipping
+    partial writes and any other files that live alongside the shard directories.
+    """
+    for path in sorted(ethpm_dir.glob("??/??/??/*")):
+        if path.is_file() and get_ipfs_asset_path(ethpm_dir, path.name) == path:
+            yield path
+
+
+class LooseAssetStore:
+    """
+    Content addressed store of one file per IPFS asset, sharded by the first six
+    characters of its hash. See get_ipfs_asset_path.
+    """
+
+    def __init__(self, ethpm_dir: Path) -> None:
+        self.ethpm_dir = ethpm_dir
+
+    def __enter__(self) -> "LooseAssetStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __contains__(self, ipfs_hash: object) -> bool:
+        return (
+            isinstance(ipfs_hash, str)
+            and get_ipfs_asset_path(self.ethpm_dir, ipfs_hash).is_file()  # noqa: W503
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        for path in iter_loose_asset_paths(self.ethpm_dir):
+            yield path.name
+
+    def close(self) -> None:
+        pass
+
+    def read(self, ipfs_hash: str) -> bytes:
+        return get_ipfs_asset_path(self.ethpm_dir, ipfs_hash).read_bytes()
+
+    def write(self, ipfs_hash: str, contents: bytes) -> None:
+        asset_dest_path = get_ipfs_asset_path(self.ethpm_dir, ipfs_hash)
+        asset_dest_path.parent.mkdir(parents=True, exist_ok=True)
+        # write under a temporary name so an interrupted write never looks complete,
+        # unique to the writer as scrape workers may store the same asset at once
+        partial_path = asset_dest_path.with_name(
+            f"{ipfs_hash}.{os.getpid()}.{threading.get_ident()}.part"
+        )
+        partial_path.write_bytes(contents)
+        os.replace(partial_path, asset_dest_path)
+
+    def remove(self, ipfs_hash: str) -> None:
+        get_ipfs_asset_path(self.ethpm_dir, ipfs_hash).unlink()
+
+    def locate(self, ipfs_hash: str) -> AssetLocation:
+        asset_path = get_ipfs_asset_path(self.ethpm_dir, ipfs_hash)
+        asset_stat = asset_path.stat()
+        return AssetLocation(
+            asset_path,
+            0,
+            asset_stat.st_size,
+            (asset_stat.st_mtime_ns, asset_stat.st_size),
+        )
+
+
+class PackedAssetStore:
+    """
+    Content addressed store of every IPFS asset appended to a single packfile,
+    with an append-only index of where each asset lies in the pack. Writing an
+    asset is one append to each file, and reading one is a single positioned read.
+
+    The pack is written before the index, so an interrupted write leaves at most
+    some unindexed bytes at the end of the pack. Index entries that are torn or
+    point past the end of the pack are ignored.
+
+    Removing an asset appends a "<ipfs hash> - -" entry to the index, while its
+    bytes stay in the pack.
+
+    Appends hold an exclusive flock on the pack, so stores opened on the same pack,
+    ex. by concurrent scrapes, never interleave their writes. Assets written by
+    another store are only seen once the pack is reopened.
+
+    index file: one "<ipfs hash> <offset> <length>" line per asset
+    """
+
+    def __init__(self, ethpm_dir: Path) -> None:
+        self.pack_path = ethpm_dir / ASSET_PACK
+        self.index_path = ethpm_dir / ASSET_PACK_INDEX
+        self._lock = threading.Lock()
+        self._pack = self.pack_path.open(mode="ab")
+        self._pack_fd = os.open(self.pack_path, os.O_RDONLY)
+        self._entries = self._read_index(self._pack.seek(0, os.SEEK_END))
+        self._index = self.index_path.open(mode="a")
+        # terminate a line torn by an interrupted write, so it isn't run into
+        if self.index_path.stat().st_size and not self._index_ends_with_newline():
+            self._index.write("\n")
+            self._index.flush()
+
+    def __enter__(self) -> "PackedAssetStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __contains__(self, ipfs_hash: object) -> bool:
+        with self._lock:
+            return ipfs_hash in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def close(self) -> None:
+        self._index.close()
+        self._pack.close()
+        os.close(self._pack_fd)
+
+    def read(self, ipfs_hash: str) -> bytes:
+        with self._lock:
+            offset, length = self._entries[ipfs_hash]
+        return os.pread(self._pack_fd, length, offset)
+
+    def write(self, ipfs_hash: str, contents: bytes) -> None:
+        with self._lock:
+            if ipfs_hash in self._entries:
+                return
+            with self._lock_pack():
+                offset = self._pack.seek(0, os.SEEK_END)
+                self._pack.write(contents)
+                self._pack.flush()
+                self._index.write(f"{ipfs_hash} {offset} {len(contents)}\n")
+                self._index.flush()
+            self._entries[ipfs_hash] = (offset, len(contents))
+
+    def sync(self) -> None:
+        """
+        Flushes every asset written so far to disk.
+        """
+        with self._lock:
+            os.fsync(self._pack.fileno())
+            os.fsync(self._index.fileno())
+
+    def remove(self, ipfs_hash: str) -> None:
+        with self._lock:
+            del self._entries[ipfs_hash]
+            with self._lock_pack():
+                self._index.write(f"{ipfs_hash} - -\n")
+                self._index.flush()
+
+    def locate(self, ipfs_hash: str) -> AssetLocation:
+        with self._lock:
+            offset, length = self._entries[ipfs_hash]
+        return AssetLocation(self.pack_path, offset, length, (offset, length))
+
+    @contextlib.contextmanager
+    def _lock_pack(self) -> Generator[None, None, None]:
+        fcntl.flock(self._pack.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._pack.fileno(), fcntl.LOCK_UN)
+
+    def _index_ends_with_newline(self) -> bool:
+        with self.index_path.open(mode="rb") as index_file:
+            index_file.seek(-1, os.SEEK_END)
+            return index_file.read(1) == b"\n"
+
+    def _read_index(self, pack_size: int) -> Dict[str, Tuple[int, int]]:
+        entries: Dict[str, Tuple[int, int]] = {}
+        if not self.index_path.is_file():
+            return entries
+        for line in self.index_path.read_text().splitlines():
+            try:
+                ipfs_hash, raw_offset, raw_length = line.split(" ")
+                if raw_offset == "-":
+                    entries.pop(ipfs_hash, None)
+                    continue
+                offset, length = int(raw_offset), int(raw_length)
+            except ValueError:
+                continue
+            if offset + length <= pack_size:
+                entries[ipfs_hash] = (offset, length)
+        return entries
+
+
+AssetStore = Union[LooseAssetStore, PackedAssetStore]
+
+
+def is_packed_asset_store(ethpm_dir: Path) -> bool:
+    return (ethpm_dir / ASSET_PACK_INDEX).is_file()
+
+
+def get_asset_store(ethpm_dir: Path) -> AssetStore:
+    """
+    Opens the asset store under ethpm_dir in whichever layout it was last
+    converted to with `ethpm store pack` / `ethpm store unpack`, loose by default.
+    """
+    if is_packed_asset_store(ethpm_dir):
+        return PackedAssetStore(ethpm_dir)
+    return LooseAssetStore(ethpm_dir)
@@ -0,0 +1,82 @@
+import threading
+from typing import Any
+
+# Blocks per batch until the size is tuned to the provider
+BATCH_SIZE = 5000
+
+# Providers report an oversized eth_getLogs response in a variety of ways,
+# ex. infura: {"code": -32005, "message": "query returned more than 10000 results"}
+RESULT_LIMIT_ERROR_CODES = (-32005,)
+RESULT_LIMIT_ERROR_MESSAGES = (
+    "more than",
+    "too many",
+    "limit exceeded",
+    "response size exceeded",
+    "timeout",
+    "timed out",
+)
+
+
+class AdaptiveBatchSize:
+    """
+    Thread-safe block window size that adapts to provider feedback.
+
+    The window shrinks when a batch returns more logs than `target_logs`, takes
+    longer than `target_latency` seconds or hits a provider result limit. It grows
+    when a full-size batch comes back well under both targets. The size is always
+    kept within min_size - max_size.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        min_size: int,
+        max_size: int,
+        target_logs: int = 1000,
+        target_latency: float = 10.0,
+    ) -> None:
+        if min_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid batch size bounds: {min_size} - {max_size}.")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_logs = target_logs
+        self.target_latency = target_latency
+        self._size = self._clamp(size)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def record(self, block_count: int, log_count: int, latency: float) -> None:
+        with self._lock:
+            if log_count > self.target_logs or latency > self.target_latency:
+                self._size = self._clamp(self._size // 2)
+            elif (
+                block_count >= self._size
+                and log_count < self.target_logs // 2  # noqa: W503
+                and latency < self.target_latency / 2  # noqa: W503
+            ):
+                self._size = self._clamp(self._size * 2)
+
+    def shrink(self) -> None:
+        with self._lock:
+            self._size = self._clamp(self._size // 2)
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(self.max_size, size))
+
+
+def is_result_limit_error(error: Exception) -> bool:
+    """
+    Returns True if error looks like a provider refusing or timing out on a
+    log query because the requested block window was too large.
+    """
+    error_data: Any = error.args[0] if error.args else None
+    if isinstance(error_data, dict):
+        if error_data.get("code") in RESULT_LIMIT_ERROR_CODES:
+            return True
+        message = str(error_data.get("message", ""))
+    else:
+        message = str(error)
+    return any(fragment in message.lower() for fragment in RESULT_LIMIT_ERROR_MESSAGES)
@@ -0,0 +1,135 @@
+import json
+from pathlib import Path
+import threading
+from typing import Dict, Iterable, Optional
+
+from eth_typing import Address
+from web3 import Web3
+
+from ethpm_cli._utils.filesystem import atomic_replace
+from ethpm_cli._utils.rpc import get_blocks
+
+_cache_file_lock = threading.Lock()
+
+
+class BlockTimestamps:
+    """
+    Block timestamp lookups backed by a json cache on disk.
+
+    Timestamps are stored per chain ID, so one cache file can be shared by every
+    chain scraped from the same xdg root.
+
+    cache file: {"1": {"7370000": 1552564775, ...}, ...}
+    """
+
+    def __init__(self, w3: Web3, cache_path: Path) -> None:
+        self.w3 = w3
+        self.cache_path = cache_path
+        self.chain_id = str(w3.eth.chainId)
+        self._timestamps: Dict[str, int] = self._read_cache_file().get(
+            self.chain_id, {}
+        )
+        self._dirty = False
+
+    def __getitem__(self, block_number: int) -> int:
+        key = str(block_number)
+        if key not in self._timestamps:
+            self._timestamps[key] = self.w3.eth.getBlock(block_number)["timestamp"]
+            self._dirty = True
+        return self._timestamps[key]
+
+    def __contains__(self, block_number: object) -> bool:
+        return str(block_number) in self._timestamps
+
+    def prefetch(self, block_numbers: Iterable[int]) -> None:
+        """
+        Look up every uncached timestamp in block_numbers in a single round trip,
+        if the provider supports batch requests.
+        """
+        missing = sorted(set(number for number in block_numbers if number not in self))
+        if not missing:
+            return
+        for block_number, block in zip(missing, get_blocks(self.w3, missing)):
+            if block is not None:
+                self._timestamps[str(block_number)] = block["timestamp"]
+                self._dirty = True
+
+    def flush(self) -> None:
+        """
+        Write any newly looked up timestamps to the cache file.
+        """
+        if not self._dirty:
+            return
+        # other chains may be scraped into the same cache file at the same time
+        with _cache_file_lock:
+            all_timestamps = self._read_cache_file()
+            all_timestamps[self.chain_id] = {
+                **all_timestamps.get(self.chain_id, {}),
+                **self._timestamps,
+            }
+            if not self.cache_path.is_file():
+                self.cache_path.touch()
+            with atomic_replace(self.cache_path) as cache_file:
+                cache_file.write(json.dumps(all_timestamps, sort_keys=True))
+        self._dirty = False
+
+    def _read_cache_file(self) -> Dict[str, Dict[str, int]]:
+        if self.cache_path.is_file():
+            return json.loads(self.cache_path.read_text())
+        return {}
+
+
+def find_block_before_timestamp(
+    timestamps: BlockTimestamps, from_block: int, to_block: int, target_timestamp: int
+) -> int:
+    """
+    Returns the last block in from_block - to_block with a timestamp before
+    target_timestamp, or from_block if no such block exists.
+
+    Each round probes both the block interpolated from the surrounding timestamps
+    and the midpoint of the range, looked up together, so the search needs at most
+    O(log n) round trips.
+    """
+    low, high = from_block, to_block
+    timestamps.prefetch((low, high))
+    if timestamps[low] >= target_timestamp:
+        return low
+    if timestamps[high] < target_timestamp:
+        return high
+
+    # invariant: timestamps[low] < target_timestamp <= timestamps[high]
+    while high - low > 1:
+        low_ts, high_ts = timestamps[low], timestamps[high]
+        offset = (target_timestamp - low_ts) * (high - low) // (high_ts - low_ts)
+        interpolated = min(max(low + offset, low + 1), high - 1)
+        probes = sorted({interpolated, (low + high) // 2})
+        timestamps.prefetch(probes)
+        for probe in probes:
+            if timestamps[probe] < target_timestamp:
+                low = probe
+            else:
+                high = probe
+                break
+    return low
+
+
+def find_deployment_block(
+    w3: Web3, address: Address, latest_block: int
+) -> Optional[int]:
+    """
+    Returns the first block at which address has code, bisecting over code lookups
+    at past blocks, or None if there is no code at address as of latest_block.
+
+    Looking up the code at past blocks needs a node that keeps historical state.
+    """
+    if not w3.eth.getCode(address, latest_block):
+        return None
+    low, high = 0, latest_block
+    # invariant: address has code at high
+    while low < high:
+        middle = (low + high) // 2
+        if w3.eth.getCode(address, middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low
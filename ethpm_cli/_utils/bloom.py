@@ -0,0 +1,42 @@
+from typing import Iterable, Tuple
+
+from eth_utils import keccak
+
+# Size in bits of the logsBloom of a block header
+BLOOM_BITS = 2048
+
+
+def get_bloom_bits(value: bytes) -> Tuple[int, ...]:
+    """
+    Returns the 3 bloom bits set by value: the low 11 bits of each of the first
+    three byte pairs of keccak(value), as specified in the yellow paper.
+    """
+    value_hash = keccak(value)
+    return tuple(
+        (value_hash[offset] << 8 | value_hash[offset + 1]) % BLOOM_BITS
+        for offset in (0, 2, 4)
+    )
+
+
+def bloom_may_contain(bloom: bytes, value: bytes) -> bool:
+    """
+    Whether value may have been added to bloom. Bit 0 is the lowest bit of the
+    last byte of the 256 byte bloom.
+    """
+    bloom_value = int.from_bytes(bloom, "big")
+    return all(bloom_value >> bit & 1 for bit in get_bloom_bits(value))
+
+
+def bloom_may_contain_log(
+    bloom: bytes, topic: bytes, addresses: Iterable[bytes] = None
+) -> bool:
+    """
+    Whether a log with topic, emitted by any of addresses if given, may be in the
+    block or receipt with this bloom. False positives are possible, but never
+    false negatives.
+    """
+    if not bloom_may_contain(bloom, topic):
+        return False
+    if addresses is None:
+        return True
+    return any(bloom_may_contain(bloom, address) for address in addresses)
@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import List, Optional
+
+from ethpm_cli._utils.metrics import ScrapeMetrics
+
+# Exit status of a scrape that stopped on its budget, EX_TEMPFAIL in sysexits.h,
+# so a scheduler can tell a run to resume apart from a finished or failed one
+BUDGET_EXHAUSTED_EXIT_CODE = 75
+
+
+class ScrapeBudget:
+    """
+    Limits on the wall time, JSON-RPC requests and IPFS bytes a scrape run may use,
+    summed over the metrics it watches. Unset limits are unbounded.
+
+    Budgets are checked between batches, so the batches in flight when a budget runs
+    out still complete, and a run overshoots its limits by at most those batches.
+    """
+
+    def __init__(
+        self,
+        max_duration: float = None,
+        max_rpc_calls: int = None,
+        max_bytes: int = None,
+    ) -> None:
+        self.max_duration = max_duration
+        self.max_rpc_calls = max_rpc_calls
+        self.max_bytes = max_bytes
+        self.started_at = time.monotonic()
+        # Description of the first limit reached, ex. "2000 JSON-RPC requests"
+        self.exhausted: Optional[str] = None
+        self._metrics: List[ScrapeMetrics] = []
+        self._lock = threading.Lock()
+
+    def watch(self, metrics: ScrapeMetrics) -> None:
+        with self._lock:
+            if metrics not in self._metrics:
+                self._metrics.append(metrics)
+
+    def is_exhausted(self) -> bool:
+        """
+        Whether any limit has been reached. Once one has, the budget stays exhausted.
+        """
+        with self._lock:
+            if self.exhausted is None:
+                self.exhausted = self._find_reached_limit()
+            return self.exhausted is not None
+
+    def _find_reached_limit(self) -> Optional[str]:
+        if self.max_duration is not None:
+            if time.monotonic() - self.started_at >= self.max_duration:
+                return f"{self.max_duration:g} seconds"
+        if self.max_rpc_calls is not None:
+            rpc_calls = sum(
+                metrics.get_counter("rpc_calls") for metrics in self._metrics
+            )
+            if rpc_calls >= self.max_rpc_calls:
+                return f"{self.max_rpc_calls} JSON-RPC requests"
+        if self.max_bytes is not None:
+            ipfs_bytes = sum(
+                metrics.get_counter("ipfs_bytes_fetched") for metrics in self._metrics
+            )
+            if ipfs_bytes >= self.max_bytes:
+                return f"{self.max_bytes} bytes of IPFS assets"
+        return None
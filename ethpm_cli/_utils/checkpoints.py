@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Optional
+
+from eth_utils import to_hex
+from web3 import Web3
+from web3.exceptions import BlockNotFound
+
+from ethpm_cli._utils.rpc import get_blocks, supports_batch_requests
+
+# Blocks below the newest checkpoint for which checkpoints are kept
+CHECKPOINT_WINDOW = 256
+
+Checkpoint = Dict[str, str]
+
+
+def get_block_checkpoint(w3: Web3, block_number: int) -> Checkpoint:
+    """
+    ex. {"block": "7370000", "hash": "0x5a3d..."}
+    """
+    block_hash = w3.eth.getBlock(block_number)["hash"]
+    return {"block": str(block_number), "hash": to_hex(block_hash)}
+
+
+def add_checkpoint(
+    checkpoints: List[Checkpoint], checkpoint: Checkpoint
+) -> List[Checkpoint]:
+    """
+    Returns checkpoints sorted by block number with checkpoint added, keeping every
+    checkpoint within CHECKPOINT_WINDOW blocks of the newest one, plus the newest
+    checkpoint below that window as an anchor for reorgs deeper than the window.
+    """
+    by_block = {int(cp["block"]): cp for cp in checkpoints}
+    by_block[int(checkpoint["block"])] = checkpoint
+    window_start = max(by_block) - CHECKPOINT_WINDOW
+    below_window = [block for block in by_block if block < window_start]
+    anchor = max(below_window) if below_window else window_start
+    return [
+        by_block[block]
+        for block in sorted(by_block)
+        if block >= window_start or block == anchor
+    ]
+
+
+def is_canonical(w3: Web3, checkpoint: Checkpoint) -> bool:
+    try:
+        block = w3.eth.getBlock(int(checkpoint["block"]))
+    except BlockNotFound:
+        return False
+    return is_checkpointed_block(checkpoint, block)
+
+
+def is_checkpointed_block(checkpoint: Checkpoint, block: Optional[Any]) -> bool:
+    return block is not None and to_hex(block["hash"]) == checkpoint["hash"]
+
+
+def find_reorged_checkpoint(w3: Web3, checkpoints: List[Checkpoint]) -> Optional[int]:
+    """
+    Returns the index of the oldest checkpoint in the sorted checkpoints that is no
+    longer on the canonical chain, or None if the newest checkpoint is canonical.
+
+    Since every block commits to its parent, all checkpoints before a canonical one
+    are canonical too. The older checkpoints are all checked in a single batch
+    request where the provider allows it, otherwise the boundary is found by
+    bisection.
+    """
+    if not checkpoints or is_canonical(w3, checkpoints[-1]):
+        return None
+
+    if supports_batch_requests(w3):
+        older_checkpoints = checkpoints[:-1]
+        blocks = get_blocks(w3, [int(cp["block"]) for cp in older_checkpoints])
+        return next(
+            (
+                index
+                for index, (checkpoint, block) in enumerate(
+                    zip(older_checkpoints, blocks)
+                )
+                if not is_checkpointed_block(checkpoint, block)
+            ),
+            len(checkpoints) - 1,
+        )
+
+    # invariant: checkpoints[low] is canonical (or low == -1), checkpoints[high] is not
+    low, high = -1, len(checkpoints) - 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if is_canonical(w3, checkpoints[middle]):
+            low = middle
+        else:
+            high = middle
+    return high
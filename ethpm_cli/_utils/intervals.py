@@ -0,0 +1,115 @@
+import bisect
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class BlockRanges:
+    """
+    Sorted set of non-overlapping, inclusive block ranges.
+
+    Adjacent and overlapping ranges are merged as they are added, so membership
+    and coverage checks are a bisect over the range boundaries rather than a
+    scan over every block number.
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()) -> None:
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in ranges:
+            self.add(start, end)
+
+    @classmethod
+    def from_chain_data(cls, scraped_blocks: List[Dict[str, str]]) -> "BlockRanges":
+        """
+        :scraped_blocks: [{"min": "0", "max": "2"}, {"min": "4", "max": "4"}]
+        """
+        return cls((int(rnge["min"]), int(rnge["max"])) for rnge in scraped_blocks)
+
+    def to_chain_data(self) -> List[Dict[str, str]]:
+        return [{"min": str(start), "max": str(end)} for start, end in self]
+
+    def add(self, start: int, end: int) -> None:
+        """
+        Add the inclusive range start - end, merging any range it overlaps or touches.
+        """
+        if start > end:
+            raise ValueError(f"Invalid block range: {start} - {end}.")
+        # first range whose end reaches the block before start
+        left = bisect.bisect_left(self._ends, start - 1)
+        # first range that starts after the block following end
+        right = bisect.bisect_right(self._starts, end + 1)
+        if left < right:
+            start = min(start, self._starts[left])
+            end = max(end, self._ends[right - 1])
+        self._starts[left:right] = [start]
+        self._ends[left:right] = [end]
+
+    def remove(self, start: int, end: int) -> None:
+        """
+        Remove the inclusive range start - end, splitting any range it partially covers.
+        """
+        if start > end:
+            raise ValueError(f"Invalid block range: {start} - {end}.")
+        left = bisect.bisect_left(self._ends, start)
+        right = bisect.bisect_right(self._starts, end)
+        if left >= right:
+            return
+        new_starts = []
+        new_ends = []
+        if self._starts[left] < start:
+            new_starts.append(self._starts[left])
+            new_ends.append(start - 1)
+        if self._ends[right - 1] > end:
+            new_starts.append(end + 1)
+            new_ends.append(self._ends[right - 1])
+        self._starts[left:right] = new_starts
+        self._ends[left:right] = new_ends
+
+    def union(self, other: "BlockRanges") -> "BlockRanges":
+        merged = BlockRanges(self)
+        for start, end in other:
+            merged.add(start, end)
+        return merged
+
+    def contains_range(self, start: int, end: int) -> bool:
+        """
+        Returns True if every block in the inclusive range start - end is present.
+        """
+        index = bisect.bisect_right(self._starts, start) - 1
+        return index >= 0 and self._ends[index] >= end
+
+    def gaps(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the inclusive ranges within start - end that are not present.
+        """
+        cursor = start
+        index = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        while cursor <= end and index < len(self._starts):
+            range_start, range_end = self._starts[index], self._ends[index]
+            if range_start > end:
+                break
+            if range_start > cursor:
+                yield cursor, range_start - 1
+            cursor = max(cursor, range_end + 1)
+            index += 1
+        if cursor <= end:
+            yield cursor, end
+
+    def __contains__(self, block: object) -> bool:
+        if not isinstance(block, int):
+            return False
+        return self.contains_range(block, block)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BlockRanges):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        ranges = ", ".join(f"{start}-{end}" for start, end in self)
+        return f"BlockRanges({ranges})"
@@ -1,7 +1,267 @@
-from ethpm.backends.ipfs import BaseIPFSBackend, InfuraIPFSBackend, LocalIPFSBackend
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import logging
+from pathlib import Path
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+from eth_typing import URI
+from ethpm._utils.ipfs import extract_ipfs_path_from_uri, is_ipfs_uri
+from ethpm.backends.ipfs import (
+    BaseIPFSBackend,
+    InfuraIPFSBackend,
+    IPFSOverHTTPBackend,
+    LocalIPFSBackend,
+)
+from ethpm.uri import resolve_uri_contents
+import ipfshttpclient
+
+from ethpm_cli._utils.asset_store import get_asset_store
+from ethpm_cli._utils.metrics import ScrapeMetrics
+from ethpm_cli.exceptions import ConfigurationError
+
+logger = logging.getLogger("ethpm_cli._utils.ipfs")
+
+DEFAULT_IPFS_JOBS = 4
+
+# Most CIDs sent to the IPFS daemon in a single pin request
+PIN_BATCH_SIZE = 50
 
 
 def get_ipfs_backend(ipfs: bool = False) -> BaseIPFSBackend:
     if ipfs:
         return LocalIPFSBackend()
     return InfuraIPFSBackend()
+
+
+def connect_to_local_ipfs() -> LocalIPFSBackend:
+    try:
+        return LocalIPFSBackend()
+    except ipfshttpclient.exceptions.Error as err:
+        raise ConfigurationError(
+            f"Unable to connect to a local IPFS daemon: {err}. "
+            "Make sure the daemon is running with its API on port 5001."
+        )
+
+
+class IPFSAssetDownloader:
+    """
+    Fetches content addressed assets with bounded concurrency.
+
+    Concurrent requests for the same asset share a single fetch. IPFS assets are
+    written straight to the content store under ethpm_dir, in whichever layout it
+    has (see get_asset_store), and assets already in the store are read from disk
+    rather than fetched, so each IPFS asset is fetched at most once no matter how
+    many times it is requested. Contents are only held in memory while a fetch is
+    in flight.
+
+    Fetches, bytes fetched and store hits are counted in metrics, if given.
+
+    With a pinner, every IPFS asset in the store that is requested is also added
+    to and pinned on the pinner's IPFS node. The pinner is left open for its owner
+    to close.
+    """
+
+    def __init__(
+        self,
+        ethpm_dir: Path,
+        max_workers: int = DEFAULT_IPFS_JOBS,
+        metrics: ScrapeMetrics = None,
+        pinner: "LocalIPFSPinner" = None,
+    ) -> None:
+        self.ethpm_dir = ethpm_dir
+        self.metrics = metrics if metrics is not None else ScrapeMetrics(None)
+        self.pinner = pinner
+        self.max_workers = max_workers
+        self.store = get_asset_store(ethpm_dir)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._downloads: Dict[str, "Future[bytes]"] = {}
+        self._requested = 0
+        self._completed = 0
+
+    def __enter__(self) -> "IPFSAssetDownloader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.store.close()
+
+    def submit(self, uri: URI) -> "Future[bytes]":
+        """
+        Schedule uri for download, returning the in-flight future of any earlier
+        request for the same content.
+        """
+        key = extract_ipfs_path_from_uri(uri) if is_ipfs_uri(uri) else uri
+        with self._lock:
+            if key in self._downloads:
+                return self._downloads[key]
+            future = self._executor.submit(self._download, uri)
+            self._downloads[key] = future
+            self._requested += 1
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+
+    def fetch(self, uri: URI) -> bytes:
+        return self.submit(uri).result()
+
+    def fetch_all(self, uris: Iterable[URI], max_pending: int = None) -> None:
+        """
+        Download every uri concurrently, re-raising the first failure.
+
+        uris are consumed lazily, with at most max_pending downloads outstanding
+        (defaults to twice max_workers), so a stream of uris of any length is
+        fetched without holding more than max_pending assets in memory.
+        """
+        if max_pending is None:
+            max_pending = 2 * self.max_workers
+        submitted = set()
+        pending: Set["Future[bytes]"] = set()
+        for uri in uris:
+            if uri in submitted:
+                continue
+            submitted.add(uri)
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(self.submit(uri))
+        wait(pending)
+        for future in pending:
+            future.result()
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._downloads.pop(key, None)
+
+    def _download(self, uri: URI) -> bytes:
+        if not is_ipfs_uri(uri):
+            return resolve_uri_contents(uri)
+
+        ipfs_hash = extract_ipfs_path_from_uri(uri)
+        if ipfs_hash in self.store:
+            self.metrics.increment("ipfs_cache_hits")
+            contents = self.store.read(ipfs_hash)
+            if self.pinner is not None:
+                self.pinner.pin(ipfs_hash, contents)
+            return contents
+
+        with self.metrics.time_stage("ipfs_fetch"):
+            contents = resolve_uri_contents(uri)
+        self.metrics.increment("ipfs_assets_fetched")
+        self.metrics.increment("ipfs_bytes_fetched", len(contents))
+        self.store.write(ipfs_hash, contents)
+        if self.pinner is not None:
+            self.pinner.pin(ipfs_hash, contents)
+        with self._lock:
+            self._completed += 1
+            completed, requested = self._completed, self._requested
+        logger.info(
+            "(%d/%d) %s written to\n %s.\n",
+            completed,
+            requested,
+            uri,
+            self.store.locate(ipfs_hash).path,
+        )
+        return contents
+
+
+class LocalIPFSPinner:
+    """
+    Adds assets to, and pins them on, the node behind ipfs_backend, ex. a local
+    daemon, with up to max_workers requests in flight. Each asset's contents are
+    added before it is pinned, so the node doesn't fetch from the network what is
+    already on disk.
+
+    Assets are sent as soon as a worker is free, and queue up into batches of at
+    most batch_size while every worker is busy. Each hash is pinned at most once.
+    Closing the pinner waits for every queued asset to be pinned, and re-raises the
+    first failed request.
+
+    Pinned hashes and pin request latencies are recorded in metrics, if given.
+
+    Usage:
+
+    with LocalIPFSPinner(connect_to_local_ipfs()) as pinner:
+        pinner.pin("QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW", contents)
+    """
+
+    def __init__(
+        self,
+        ipfs_backend: IPFSOverHTTPBackend,
+        max_workers: int = DEFAULT_IPFS_JOBS,
+        batch_size: int = PIN_BATCH_SIZE,
+        metrics: ScrapeMetrics = None,
+    ) -> None:
+        self.client = ipfs_backend.client
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.metrics = metrics if metrics is not None else ScrapeMetrics(None)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # reentrant, as a batch that completes right away runs its callback inline
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._seen: Set[str] = set()
+        self._queued: List[Tuple[str, bytes]] = []
+        self._in_flight = 0
+        self._errors: List[BaseException] = []
+
+    def __enter__(self) -> "LocalIPFSPinner":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def pin(self, ipfs_hash: str, contents: bytes) -> None:
+        with self._lock:
+            if ipfs_hash in self._seen:
+                return
+            self._seen.add(ipfs_hash)
+            self._queued.append((ipfs_hash, contents))
+            self._submit_queued()
+
+    def close(self) -> None:
+        with self._idle:
+            while self._in_flight:
+                self._idle.wait()
+        self._executor.shutdown(wait=True)
+        if self._errors:
+            raise self._errors[0]
+
+    def _submit_queued(self) -> None:
+        while self._queued and (
+            self._in_flight < self.max_workers or len(self._queued) >= self.batch_size
+        ):
+            batch = self._queued[: self.batch_size]
+            del self._queued[: self.batch_size]
+            self._in_flight += 1
+            future = self._executor.submit(self._pin_batch, batch)
+            future.add_done_callback(self._batch_done)
+
+    def _batch_done(self, batch: "Future[None]") -> None:
+        with self._idle:
+            self._in_flight -= 1
+            if batch.exception() is not None:
+                self._errors.append(batch.exception())
+            self._submit_queued()
+            if not self._in_flight:
+                self._idle.notify_all()
+
+    def _pin_batch(self, assets: List[Tuple[str, bytes]]) -> None:
+        ipfs_hashes = [ipfs_hash for ipfs_hash, _ in assets]
+        with self.metrics.time_stage("ipfs_pin"):
+            for ipfs_hash, contents in assets:
+                added_hash = self.client.add_bytes(contents, opts={"pin": "false"})
+                if added_hash != ipfs_hash:
+                    logger.warning(
+                        "The local IPFS node added %s as %s, so it fetches %s "
+                        "from the network to pin it.",
+                        ipfs_hash,
+                        added_hash,
+                        ipfs_hash,
+                    )
+            self.client.pin.add(*ipfs_hashes)
+        self.metrics.increment("ipfs_assets_pinned", len(ipfs_hashes))
+        logger.info("%d assets pinned to the local IPFS node.", len(ipfs_hashes))
@@ -0,0 +1,61 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from eth_typing import URI
+from eth_utils import to_tuple
+
+
+class PendingAssetJournal:
+    """
+    Write-ahead journal of the manifest URIs of scraped batches whose IPFS assets
+    have not all been written to disk yet.
+
+    A batch is journaled before its block range is recorded as scraped, and the
+    entry is dropped once its assets are stored. Entries left behind by a crash
+    are replayed at the start of the next scrape, so a range is never recorded as
+    scraped while its assets are missing.
+
+    journal file, one JSON entry per line:
+    {"from_block": 100, "to_block": 200, "manifest_uris": ["ipfs://Qm...", ...]}
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def record(self, from_block: int, to_block: int, manifest_uris: List[URI]) -> None:
+        entry = {
+            "from_block": from_block,
+            "to_block": to_block,
+            "manifest_uris": manifest_uris,
+        }
+        with self.path.open(mode="a") as journal_file:
+            journal_file.write(json.dumps(entry))
+            journal_file.write("\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def complete(self) -> None:
+        """
+        Drops every entry. Batches are committed one at a time in block order, so
+        once a batch's assets are stored no earlier entry can still be pending.
+        """
+        if self.path.is_file():
+            self.path.unlink()
+
+    @to_tuple
+    def pending(self) -> Iterable[Tuple[int, int, List[URI]]]:
+        """
+        Returns (from_block, to_block, manifest_uris) of every journaled batch.
+        A line torn by a crash mid-write is skipped, as its batch was never
+        recorded as scraped.
+        """
+        if not self.path.is_file():
+            return
+        for line in self.path.read_text().splitlines():
+            try:
+                entry: Dict[str, Any] = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            yield entry["from_block"], entry["to_block"], entry["manifest_uris"]
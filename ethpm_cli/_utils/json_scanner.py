@@ -0,0 +1,135 @@
+import json
+import re
+from typing import Iterator, Optional
+
+WHITESPACE = re.compile(rb"[ \t\n\r]*")
+# Characters that open, close or may hide a bracket inside a skipped value
+NESTING_CHARS = re.compile(rb'["{}\[\]]')
+SCALAR = re.compile(rb"[^ \t\n\r,:{}\[\]\"]+")
+# A string that opens with a URI scheme, ex. "ipfs:
+URI_SCHEME = re.compile(rb'"[A-Za-z][A-Za-z0-9+.-]*:')
+
+
+class JSONScanner:
+    """
+    Reads selected fields of a JSON document without decoding the rest of it.
+
+    Values the caller doesn't ask for are skipped by jumping between quotes and
+    brackets, so large strings and nested values that are skipped are never
+    decoded into python objects.
+
+    Usage:
+
+    scanner = JSONScanner(b'{"meta": {"links": {...}}, "sources": {...}}')
+    for key in scanner.iter_object():
+        if key == "sources":
+            uris = [uri for uri in scanner.iter_uri_values() if uri]
+        else:
+            scanner.skip_value()
+
+    Each value yielded by iter_object must be read or skipped before the next key.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Yields each key of the object at the current position, leaving the scanner
+        at its value.
+        """
+        self._expect(b"{")
+        if self._peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self._expect(b":")
+            yield key
+            if self._next_char() == b"}":
+                return
+            self.pos -= 1
+            self._expect(b",")
+
+    def iter_uri_values(self) -> Iterator[Optional[str]]:
+        """
+        Yields the value of each member of the object at the current position if it
+        is a string that opens with a URI scheme, or None otherwise.
+        """
+        for _ in self.iter_object():
+            self._skip_whitespace()
+            if URI_SCHEME.match(self.data, self.pos):
+                yield self.read_string()
+            else:
+                self.skip_value()
+                yield None
+
+    def read_string(self) -> str:
+        self._skip_whitespace()
+        start = self.pos
+        self._expect(b'"')
+        self.pos = self._find_string_end(start)
+        return json.loads(self.data[start : self.pos])  # noqa: E203
+
+    def skip_value(self) -> None:
+        self._skip_whitespace()
+        char = self._peek()
+        if char == b'"':
+            self.pos = self._find_string_end(self.pos)
+        elif char in (b"{", b"["):
+            self._skip_nested()
+        else:
+            scalar = SCALAR.match(self.data, self.pos)
+            if scalar is None:
+                raise ValueError(f"Invalid JSON value at position {self.pos}.")
+            self.pos = scalar.end()
+
+    def _skip_nested(self) -> None:
+        depth = 0
+        while True:
+            match = NESTING_CHARS.search(self.data, self.pos)
+            if match is None:
+                raise ValueError("Unterminated JSON object or array.")
+            char = match.group()
+            if char == b'"':
+                self.pos = self._find_string_end(match.start())
+                continue
+            self.pos = match.end()
+            depth += 1 if char in (b"{", b"[") else -1
+            if depth == 0:
+                return
+
+    def _find_string_end(self, start: int) -> int:
+        """
+        Returns the position after the closing quote of the string opened at start.
+        """
+        end = start
+        while True:
+            end = self.data.find(b'"', end + 1)
+            if end == -1:
+                raise ValueError(f"Unterminated JSON string at position {start}.")
+            backslashes = end - 1
+            while self.data[backslashes] == ord("\\"):
+                backslashes -= 1
+            # a quote preceded by an odd number of backslashes is escaped
+            if (end - 1 - backslashes) % 2 == 0:
+                return end + 1
+
+    def _skip_whitespace(self) -> None:
+        self.pos = WHITESPACE.match(self.data, self.pos).end()
+
+    def _peek(self) -> bytes:
+        self._skip_whitespace()
+        return self.data[self.pos : self.pos + 1]  # noqa: E203
+
+    def _next_char(self) -> bytes:
+        char = self._peek()
+        self.pos += 1
+        return char
+
+    def _expect(self, char: bytes) -> None:
+        if self._next_char() != char:
+            raise ValueError(
+                f"Expected {char.decode()} at position {self.pos - 1} of JSON."
+            )
@@ -0,0 +1,200 @@
+import contextlib
+import json
+import logging
+import os
+from pathlib import Path
+import socket
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+import uuid
+
+# Seconds a lease is held for without being renewed
+LEASE_DURATION = 60.0
+
+logger = logging.getLogger("ethpm_cli._utils.leases")
+
+
+class Lease(NamedTuple):
+    path: Path
+    # identifies this holding of the lease, so a reclaimed lease is never renewed
+    # or released by its previous holder
+    token: str
+    expires_at: float
+
+
+def acquire_lease(path: Path, duration: float = LEASE_DURATION) -> Optional[Lease]:
+    """
+    Takes the lease at path for `duration` seconds, reclaiming it if its holder let
+    it expire or died, and returns None if it's held by anyone else.
+
+    lease file:
+    {"token": "9b1d...", "host": "worker-1", "pid": 4242, "expires_at": 1578000060.0}
+
+    A lease file is written in full under a temporary name, then hard linked into
+    place, which fails if the lease is taken, even on network filesystems.
+    """
+    lease = Lease(path, uuid.uuid4().hex, time.time() + duration)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f"{path.name}.{lease.token}")
+    partial_path.write_text(
+        json.dumps(
+            {
+                "token": lease.token,
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "expires_at": lease.expires_at,
+            }
+        )
+    )
+    try:
+        try:
+            os.link(str(partial_path), str(path))
+        except FileExistsError:
+            if not reclaim_stale_lease(path):
+                return None
+            # another process may take the reclaimed lease first
+            try:
+                os.link(str(partial_path), str(path))
+            except FileExistsError:
+                return None
+        return lease
+    finally:
+        partial_path.unlink()
+
+
+def renew_lease(lease: Lease, duration: float = LEASE_DURATION) -> Optional[Lease]:
+    """
+    Extends lease by `duration` seconds from now. Returns None if the lease has
+    been reclaimed by another holder since it was taken.
+
+    Like a reclaim, a renewal first renames the lease aside, so the lease file of
+    another holder is never overwritten, and restores it if it isn't this lease.
+    """
+    renewed = lease._replace(expires_at=time.time() + duration)
+    renewing_path = lease.path.with_name(f"{lease.path.name}.{lease.token}.renewing")
+    try:
+        os.rename(str(lease.path), str(renewing_path))
+    except FileNotFoundError:
+        return None
+    partial_path = lease.path.with_name(f"{lease.path.name}.{lease.token}")
+    try:
+        record = read_lease_record(renewing_path)
+        if record is None or record["token"] != lease.token:
+            with contextlib.suppress(FileExistsError):
+                os.link(str(renewing_path), str(lease.path))
+            return None
+        partial_path.write_text(
+            json.dumps(dict(record, expires_at=renewed.expires_at))
+        )
+        try:
+            os.link(str(partial_path), str(lease.path))
+        except FileExistsError:
+            # taken by another process while it was renamed aside
+            return None
+        finally:
+            partial_path.unlink()
+        return renewed
+    finally:
+        renewing_path.unlink()
+
+
+def release_lease(lease: Lease) -> None:
+    record = read_lease_record(lease.path)
+    if record is not None and record["token"] == lease.token:
+        lease.path.unlink()
+
+
+def read_lease_record(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+def is_stale_lease(record: Dict[str, Any]) -> bool:
+    """
+    Whether the lease has expired, or was held by a process on this host that no
+    longer runs.
+    """
+    if record["expires_at"] < time.time():
+        return True
+    if record["host"] != socket.gethostname():
+        return False
+    try:
+        os.kill(record["pid"], 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def reclaim_stale_lease(path: Path) -> bool:
+    """
+    Removes the lease at path if it is stale, and returns whether the lease is
+    free to be taken. The lease is first renamed aside, which only one of several
+    processes reclaiming it can do, and restored if it turns out to have been
+    replaced by a live lease in the meantime.
+    """
+    record = read_lease_record(path)
+    if record is None:
+        return True
+    if not is_stale_lease(record):
+        return False
+
+    reclaimed_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.stale")
+    try:
+        os.rename(str(path), str(reclaimed_path))
+    except FileNotFoundError:
+        return True
+    try:
+        reclaimed = read_lease_record(reclaimed_path)
+        if reclaimed is not None and reclaimed["token"] != record["token"]:
+            with contextlib.suppress(FileExistsError):
+                os.link(str(reclaimed_path), str(path))
+            return False
+        logger.info("Reclaimed lease %s from %s.", path.name, record["host"])
+        return True
+    finally:
+        reclaimed_path.unlink()
+
+
+class LeaseKeeper:
+    """
+    Renews a lease from a background thread every third of its duration, until
+    the context exits, then releases it.
+
+    Usage:
+
+    lease = acquire_lease(path)
+    if lease is not None:
+        with LeaseKeeper(lease):
+            ...
+    """
+
+    def __init__(self, lease: Lease, duration: float = LEASE_DURATION) -> None:
+        self.lease = lease
+        self.duration = duration
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        release_lease(self.lease)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.duration / 3):
+            renewed = renew_lease(self.lease, self.duration)
+            if renewed is None:
+                logger.warning(
+                    "Lease %s expired and was taken by another worker.",
+                    self.lease.path.name,
+                )
+                return
+            self.lease = renewed
@@ -0,0 +1,346 @@
+import bisect
+import contextlib
+import json
+from pathlib import Path
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from web3 import Web3
+
+from ethpm_cli._utils.filesystem import atomic_replace
+from ethpm_cli._utils.rpc import observe_batch_requests
+
+# Seconds between rewrites of the status and prometheus files
+DEFAULT_METRICS_INTERVAL = 10.0
+
+# Upper bounds (in seconds) of the stage latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COUNTERS = {
+    "blocks_scraped": "Blocks scraped for VersionRelease events.",
+    "logs_found": "VersionRelease events found.",
+    "rpc_calls": "JSON-RPC requests sent to the node, counting each call in a batch.",
+    "bloom_skipped_blocks": "Blocks the logsBloom filter skipped without a log query.",
+    "ipfs_assets_fetched": "IPFS assets fetched from the network.",
+    "ipfs_bytes_fetched": "Bytes of IPFS assets fetched from the network.",
+    "ipfs_cache_hits": "IPFS assets found in the local store instead of fetched.",
+    "ipfs_assets_pinned": "IPFS assets pinned to the local IPFS node.",
+}
+
+
+class LatencyHistogram:
+    """
+    Cumulative histogram of observed latencies, bucketed by LATENCY_BUCKETS.
+    """
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(LATENCY_BUCKETS):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative_buckets(self) -> List[Tuple[str, int]]:
+        """
+        ex. [("0.005", 0), ("0.01", 2), ..., ("+Inf", 5)]
+        """
+        cumulative = []
+        total = 0
+        for upper_bound, bucket_count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            total += bucket_count
+            cumulative.append((f"{upper_bound:g}", total))
+        cumulative.append(("+Inf", self.count))
+        return cumulative
+
+
+class StageTimer:
+    def __init__(self, metrics: "ScrapeMetrics", stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.started_at = time.monotonic()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.metrics.observe(self.stage, time.monotonic() - self.started_at)
+
+
+class ScrapeMetrics:
+    """
+    Thread-safe throughput counters, progress and per-stage latencies of one
+    chain's scrape. Metrics that aren't tied to a chain, ex. those of a downloader
+    shared by several chains, are kept with a chain_id of None.
+    """
+
+    def __init__(self, chain_id: Optional[int]) -> None:
+        self.chain_id = chain_id
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters = {name: 0 for name in COUNTERS}
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self.head_block: Optional[int] = None
+        self.blocks_remaining = 0
+        self.last_progress_at: Optional[float] = None
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def get_counter(self, counter: str) -> int:
+        with self._lock:
+            return self._counters[counter]
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._stages.setdefault(stage, LatencyHistogram()).observe(seconds)
+
+    def time_stage(self, stage: str) -> StageTimer:
+        """
+        Usage:
+
+        with metrics.time_stage("logs"):
+            w3.eth.getLogs(...)
+        """
+        return StageTimer(self, stage)
+
+    def add_blocks_remaining(self, block_count: int) -> None:
+        with self._lock:
+            self.blocks_remaining += block_count
+
+    def record_scraped_batch(self, block_count: int, log_count: int) -> None:
+        with self._lock:
+            self._counters["blocks_scraped"] += block_count
+            self._counters["logs_found"] += log_count
+            self.blocks_remaining = max(self.blocks_remaining - block_count, 0)
+            self.last_progress_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the current counters along with the rates derived from them.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(histogram.cumulative_buckets()),
+                }
+                for stage, histogram in sorted(self._stages.items())
+            }
+            blocks_remaining = self.blocks_remaining
+            last_progress_at = self.last_progress_at
+
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        blocks_per_second = counters["blocks_scraped"] / elapsed
+        if blocks_per_second > 0:
+            eta_seconds: Optional[float] = blocks_remaining / blocks_per_second
+        else:
+            eta_seconds = None
+        return {
+            "chain_id": self.chain_id,
+            "started_at": self.started_at,
+            "last_progress_at": last_progress_at,
+            "head_block": self.head_block,
+            "blocks_remaining": blocks_remaining,
+            "counters": counters,
+            "rates": {
+                "blocks_per_second": blocks_per_second,
+                "logs_per_second": counters["logs_found"] / elapsed,
+            },
+            "eta_seconds": eta_seconds,
+            "stages": stages,
+        }
+
+    def record_batch_request(self, call_count: int, seconds: float) -> None:
+        self.increment("rpc_calls", call_count)
+        self.observe("rpc_batch", seconds)
+
+    @contextlib.contextmanager
+    def count_rpc_calls(self, w3: Web3) -> Generator[None, None, None]:
+        """
+        Counts every request sent by w3 within the context in "rpc_calls", including
+        each call in a batch request, and times batch requests as the "rpc_batch"
+        stage.
+        """
+        name = f"rpc_counter_{id(self)}"
+
+        def rpc_counter_middleware(
+            make_request: Callable[[str, Any], Dict[str, Any]], w3: Web3
+        ) -> Callable[[str, Any], Dict[str, Any]]:
+            def middleware(method: str, params: Any) -> Dict[str, Any]:
+                self.increment("rpc_calls")
+                return make_request(method, params)
+
+            return middleware
+
+        w3.middleware_onion.add(rpc_counter_middleware, name)
+        try:
+            with observe_batch_requests(w3, self.record_batch_request):
+                yield
+        finally:
+            w3.middleware_onion.remove(name)
+
+
+def write_status_file(status_path: Path, all_metrics: Iterable[ScrapeMetrics]) -> None:
+    """
+    ex. {"updated_at": 1578000000.0, "chains": [{"chain_id": 1, ...}]}
+    """
+    status = {
+        "updated_at": time.time(),
+        "chains": [metrics.snapshot() for metrics in all_metrics],
+    }
+    if not status_path.is_file():
+        status_path.touch()
+    with atomic_replace(status_path) as status_file:
+        status_file.write(json.dumps(status, indent=4, sort_keys=True))
+        status_file.write("\n")
+
+
+def write_prometheus_file(
+    prometheus_path: Path, all_metrics: Iterable[ScrapeMetrics]
+) -> None:
+    """
+    Writes metrics in the prometheus text format, for the node exporter's
+    textfile collector.
+    """
+    snapshots = [metrics.snapshot() for metrics in all_metrics]
+    lines: List[str] = []
+
+    def add_metric(
+        name: str, metric_type: str, help_text: str, samples: Iterable[Tuple[str, Any]]
+    ) -> None:
+        lines.append(f"# HELP ethpm_scraper_{name} {help_text}")
+        lines.append(f"# TYPE ethpm_scraper_{name} {metric_type}")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"ethpm_scraper_{name}{format_labels(labels)} {value}")
+
+    def chain_label(snapshot: Dict[str, Any]) -> str:
+        if snapshot["chain_id"] is None:
+            return ""
+        return f'chain_id="{snapshot["chain_id"]}"'
+
+    for counter, help_text in COUNTERS.items():
+        add_metric(
+            f"{counter}_total",
+            "counter",
+            help_text,
+            ((chain_label(s), s["counters"][counter]) for s in snapshots),
+        )
+    gauges = (
+        ("head_block", "Latest confirmed block of the chain.", "head_block"),
+        ("blocks_remaining", "Blocks left to scrape.", "blocks_remaining"),
+        ("eta_seconds", "Estimated seconds until the head is reached.", "eta_seconds"),
+        (
+            "last_progress_timestamp_seconds",
+            "Unix time of the last committed batch.",
+            "last_progress_at",
+        ),
+    )
+    for name, help_text, key in gauges:
+        add_metric(
+            name, "gauge", help_text, ((chain_label(s), s[key]) for s in snapshots)
+        )
+    for rate in ("blocks_per_second", "logs_per_second"):
+        add_metric(
+            rate,
+            "gauge",
+            f"Average {rate.replace('_', ' ')} since the scrape started.",
+            ((chain_label(s), s["rates"][rate]) for s in snapshots),
+        )
+
+    lines.append(
+        "# HELP ethpm_scraper_stage_latency_seconds Latency of each scraper stage."
+    )
+    lines.append("# TYPE ethpm_scraper_stage_latency_seconds histogram")
+    for snapshot in snapshots:
+        for stage, histogram in snapshot["stages"].items():
+            labels = ",".join(filter(None, (chain_label(snapshot), f'stage="{stage}"')))
+            for upper_bound, count in histogram["buckets"].items():
+                lines.append(
+                    "ethpm_scraper_stage_latency_seconds_bucket"
+                    f'{{{labels},le="{upper_bound}"}} {count}'
+                )
+            lines.append(
+                "ethpm_scraper_stage_latency_seconds_sum"
+                f"{{{labels}}} {histogram['sum']}"
+            )
+            lines.append(
+                "ethpm_scraper_stage_latency_seconds_count"
+                f"{{{labels}}} {histogram['count']}"
+            )
+
+    if not prometheus_path.is_file():
+        prometheus_path.touch()
+    with atomic_replace(prometheus_path) as prometheus_file:
+        prometheus_file.write("\n".join(lines))
+        prometheus_file.write("\n")
+
+
+def format_labels(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+class MetricsExporter:
+    """
+    Periodically rewrites a JSON status file and / or a prometheus textfile with
+    the given metrics, from a background thread. Both files are written once more
+    when the exporter is stopped, so they reflect the final state of a scrape.
+
+    Usage:
+
+    with MetricsExporter(all_metrics, status_path=Path("status.json")):
+        scrape(...)
+    """
+
+    def __init__(
+        self,
+        all_metrics: Sequence[ScrapeMetrics],
+        status_path: Path = None,
+        prometheus_path: Path = None,
+        interval: float = DEFAULT_METRICS_INTERVAL,
+    ) -> None:
+        self.all_metrics = all_metrics
+        self.status_path = status_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "MetricsExporter":
+        if self.status_path is not None or self.prometheus_path is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def write(self) -> None:
+        if self.status_path is not None:
+            write_status_file(self.status_path, self.all_metrics)
+        if self.prometheus_path is not None:
+            write_prometheus_file(self.prometheus_path, self.all_metrics)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+        self.write()
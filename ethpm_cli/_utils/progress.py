@@ -0,0 +1,155 @@
+import contextlib
+import fcntl
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, Generator, Iterable
+
+from eth_utils import to_tuple
+from eth_utils.toolz import assoc
+
+from ethpm_cli._utils.batching import BATCH_SIZE
+from ethpm_cli._utils.checkpoints import add_checkpoint
+from ethpm_cli._utils.intervals import BlockRanges
+from ethpm_cli.config import write_updated_chain_data
+from ethpm_cli.constants import CHAIN_DATA_LOCK, SCRAPE_PROGRESS
+
+# Size in bytes the progress log grows to before it is compacted into chain data
+PROGRESS_COMPACTION_SIZE = 64 * 1024
+
+# Chain data stores whose lock is held by the current thread
+_held_chain_data_locks = threading.local()
+
+
+def get_progress_log_path(chain_data_path: Path) -> Path:
+    return chain_data_path.parent / SCRAPE_PROGRESS
+
+
+@contextlib.contextmanager
+def lock_chain_data(chain_data_path: Path) -> Generator[None, None, None]:
+    """
+    Holds the lock on the chain data store within the context, so scrapes of the
+    chain in other processes, ex. scrape workers, never interleave a read and a
+    write of it. The lock is reentrant within a thread, and released by the system
+    if its holder dies.
+    """
+    held = _held_chain_data_locks.__dict__.setdefault("paths", set())
+    if chain_data_path in held:
+        yield
+        return
+    chain_data_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(chain_data_path.with_name(CHAIN_DATA_LOCK), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        held.add(chain_data_path)
+        try:
+            yield
+        finally:
+            held.remove(chain_data_path)
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def read_chain_data(chain_data_path: Path) -> Dict[str, Any]:
+    """
+    Returns the chain data store at chain_data_path with its progress log replayed.
+
+    Scrape progress is kept as a snapshot, the chain data store, plus an append-only
+    log of the progress made since, so committing a batch is one fsync'd append
+    rather than a rewrite of the store. Replaying the log onto a snapshot that
+    already holds some or all of it gives the same chain data, so a crash between
+    compacting the log into the snapshot and dropping the log loses nothing.
+
+    progress log file, one JSON record per line:
+    {"from_block": 100, "to_block": 200, "batch_size": 100, "checkpoint": {...}}
+    {"rollback_from": 150}
+    """
+    with lock_chain_data(chain_data_path):
+        chain_data = json.loads(chain_data_path.read_text())
+        progress_log = read_progress_log(get_progress_log_path(chain_data_path))
+    scraped_ranges = BlockRanges.from_chain_data(chain_data["scraped_blocks"])
+    checkpoints = chain_data.get("checkpoints", [])
+    for record in progress_log:
+        if "rollback_from" in record:
+            rollback_block = record["rollback_from"]
+            for _, range_end in list(scraped_ranges):
+                if range_end >= rollback_block:
+                    scraped_ranges.remove(rollback_block, range_end)
+            checkpoints = [
+                cp for cp in checkpoints if int(cp["block"]) < rollback_block
+            ]
+            continue
+
+        scraped_ranges.add(record["from_block"], record["to_block"] - 1)
+        # Only a size that has been tuned away from the default is worth remembering
+        batch_size = record.get("batch_size")
+        if batch_size is not None and batch_size != chain_data.get(
+            "batch_size", BATCH_SIZE
+        ):
+            chain_data = assoc(chain_data, "batch_size", batch_size)
+        if "checkpoint" in record:
+            checkpoints = add_checkpoint(checkpoints, record["checkpoint"])
+
+    chain_data = assoc(chain_data, "scraped_blocks", scraped_ranges.to_chain_data())
+    if checkpoints or "checkpoints" in chain_data:
+        chain_data = assoc(chain_data, "checkpoints", checkpoints)
+    return chain_data
+
+
+@to_tuple
+def read_progress_log(log_path: Path) -> Iterable[Dict[str, Any]]:
+    """
+    Returns every record in the progress log. A line torn by a crash mid-append is
+    skipped, as its batch was never committed.
+    """
+    if not log_path.is_file():
+        return
+    for line in log_path.read_text().splitlines():
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def append_progress_record(chain_data_path: Path, record: Dict[str, Any]) -> None:
+    """
+    Durably appends record to the progress log of chain_data_path, compacting the
+    log into the chain data store once it outgrows PROGRESS_COMPACTION_SIZE.
+    """
+    log_path = get_progress_log_path(chain_data_path)
+    with lock_chain_data(chain_data_path):
+        with log_path.open(mode="a+b") as log_file:
+            log_size = log_file.seek(0, os.SEEK_END)
+            # terminate a line torn by an interrupted append, so it isn't run into
+            if log_size:
+                log_file.seek(-1, os.SEEK_END)
+                if log_file.read(1) != b"\n":
+                    log_file.write(b"\n")
+            log_file.write(json.dumps(record).encode())
+            log_file.write(b"\n")
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            log_size = log_file.tell()
+        if log_size >= PROGRESS_COMPACTION_SIZE:
+            compact_chain_data(chain_data_path)
+
+
+def compact_chain_data(chain_data_path: Path) -> None:
+    """
+    Folds the progress log into the chain data store, then drops the log.
+    """
+    with lock_chain_data(chain_data_path):
+        if get_progress_log_path(chain_data_path).is_file():
+            write_chain_data(chain_data_path, read_chain_data(chain_data_path))
+
+
+def write_chain_data(chain_data_path: Path, chain_data: Dict[str, Any]) -> None:
+    """
+    Replaces the chain data store with chain_data and drops its progress log, so
+    chain_data must hold every logged record, ex. as returned by read_chain_data
+    within the same lock_chain_data context.
+    """
+    with lock_chain_data(chain_data_path):
+        write_updated_chain_data(chain_data_path, chain_data)
+        log_path = get_progress_log_path(chain_data_path)
+        if log_path.is_file():
+            log_path.unlink()
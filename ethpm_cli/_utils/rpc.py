@@ -0,0 +1,270 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import json
+import logging
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from eth_utils import to_int
+from eth_utils.toolz import partition_all
+from hexbytes import HexBytes
+import requests
+from web3 import HTTPProvider, Web3, WebsocketProvider
+from web3.exceptions import BlockNotFound
+
+logger = logging.getLogger("ethpm_cli._utils.rpc")
+
+# Calls sent per batch request, kept under the batch limits of hosted nodes
+MAX_BATCH_REQUEST_SIZE = 100
+
+# Seconds to wait for the response to a batch request over HTTP, as web3 does
+HTTP_REQUEST_TIMEOUT = 10
+
+# (method, params), with params already in their JSON-RPC encoding
+RPCCall = Tuple[str, Sequence[Any]]
+
+BatchProvider = Union[HTTPProvider, WebsocketProvider]
+
+# Called with the number of calls in, and the seconds taken by, each batch request
+BatchObserver = Callable[[int, float], None]
+
+# Sends a raw batch request, returning the decoded response or None if refused
+BatchSender = Callable[[bytes], Any]
+
+# Endpoints that can't take batch requests, and are only sent single requests
+_unbatched_endpoints: Set[str] = set()
+_http_session = requests.Session()
+# Batches sent over a websocket are serialized, as their responses share its stream
+_websocket_locks: Dict[str, threading.Lock] = {}
+_endpoints_lock = threading.Lock()
+
+# Observers of the batch requests sent by each Web3 instance
+_batch_observers: Dict[Web3, List[BatchObserver]] = {}
+_batch_observers_lock = threading.Lock()
+
+
+def supports_batch_requests(w3: Web3) -> bool:
+    provider = getattr(w3, "provider", None)
+    endpoint = get_endpoint(provider)
+    with _endpoints_lock:
+        if endpoint in _unbatched_endpoints:
+            return False
+    if get_batch_sender(provider) is not None:
+        return True
+    disable_batch_requests(endpoint, "can't send batch requests")
+    return False
+
+
+def get_batch_sender(provider: Any) -> Optional[BatchSender]:
+    """
+    Returns the function sending raw batch requests to the endpoint of provider, or
+    None if provider can't send them. web3 has no public API for batches, and only
+    exposes the event loop running websocket requests privately, so websocket
+    batches are only sent where this version of web3 has one.
+    """
+    if isinstance(provider, HTTPProvider):
+        return functools.partial(_post_batch, provider)
+    if isinstance(provider, WebsocketProvider):
+        loop = getattr(WebsocketProvider, "_loop", None)
+        if isinstance(loop, asyncio.AbstractEventLoop) and hasattr(
+            provider, "coro_make_request"
+        ):
+            return functools.partial(_send_websocket_batch, provider, loop)
+    return None
+
+
+def get_endpoint(provider: Any) -> str:
+    return str(getattr(provider, "endpoint_uri", provider))
+
+
+def disable_batch_requests(endpoint: str, reason: str) -> None:
+    """
+    Sends only single requests to endpoint from now on, logging why the first time.
+    """
+    with _endpoints_lock:
+        if endpoint in _unbatched_endpoints:
+            return
+        _unbatched_endpoints.add(endpoint)
+    logger.warning("%s %s, falling back to single requests.", endpoint, reason)
+
+
+@contextlib.contextmanager
+def observe_batch_requests(
+    w3: Web3, observer: BatchObserver
+) -> Generator[None, None, None]:
+    """
+    Calls observer after every batch request w3 sends within the context. Batches
+    bypass web3's middlewares, which only see single requests.
+    """
+    with _batch_observers_lock:
+        _batch_observers.setdefault(w3, []).append(observer)
+    try:
+        yield
+    finally:
+        with _batch_observers_lock:
+            _batch_observers[w3].remove(observer)
+            if not _batch_observers[w3]:
+                del _batch_observers[w3]
+
+
+def make_batch_request(w3: Web3, calls: Sequence[RPCCall]) -> Optional[List[Any]]:
+    """
+    Sends calls to the HTTP or websocket endpoint of w3 as JSON-RPC batch requests,
+    returning the raw result of each call in order. Results are not run through
+    web3's result formatters.
+
+    Returns None if w3 can't take batch requests, ex. an IPC provider or an
+    endpoint that rejects batches, so callers can fall back to single requests.
+    """
+    if not supports_batch_requests(w3):
+        return None
+
+    results: List[Any] = []
+    for chunk in partition_all(MAX_BATCH_REQUEST_SIZE, calls):
+        chunk_results = _send_batch(w3, chunk)
+        if chunk_results is None:
+            disable_batch_requests(
+                get_endpoint(w3.provider), "rejected a batch request"
+            )
+            return None
+        results.extend(chunk_results)
+    return results
+
+
+def _send_batch(w3: Web3, calls: Sequence[RPCCall]) -> Optional[List[Any]]:
+    payload = [
+        {"jsonrpc": "2.0", "method": method, "params": list(params), "id": call_id}
+        for call_id, (method, params) in enumerate(calls)
+    ]
+    started_at = time.monotonic()
+    try:
+        responses = send_raw_batch(w3.provider, json.dumps(payload).encode())
+    finally:
+        _notify_batch_observers(w3, len(calls), time.monotonic() - started_at)
+
+    # Endpoints without batch support answer with a single error object
+    if not isinstance(responses, list):
+        return None
+    responses_by_id: Dict[int, Dict[str, Any]] = {
+        response.get("id"): response for response in responses
+    }
+    if set(responses_by_id) != set(range(len(calls))):
+        return None
+    return [get_result(responses_by_id[call_id]) for call_id in range(len(calls))]
+
+
+def send_raw_batch(provider: BatchProvider, request_data: bytes) -> Any:
+    """
+    Returns the decoded response of provider's endpoint to a batch request, or None
+    if the endpoint refused it outright.
+    """
+    send_batch = get_batch_sender(provider)
+    if send_batch is None:
+        return None
+    return send_batch(request_data)
+
+
+def post_batch_request(
+    endpoint_uri: str, request_data: bytes, **request_kwargs: Any
+) -> bytes:
+    request_kwargs.setdefault("timeout", HTTP_REQUEST_TIMEOUT)
+    response = _http_session.post(endpoint_uri, data=request_data, **request_kwargs)
+    response.raise_for_status()
+    return response.content
+
+
+def _post_batch(provider: HTTPProvider, request_data: bytes) -> Any:
+    try:
+        raw_response = post_batch_request(
+            provider.endpoint_uri, request_data, **provider.get_request_kwargs()
+        )
+    except requests.exceptions.HTTPError:
+        return None
+    return json.loads(raw_response)
+
+
+def _send_websocket_batch(
+    provider: WebsocketProvider,
+    loop: asyncio.AbstractEventLoop,
+    request_data: bytes,
+) -> Any:
+    """
+    Sends a batch over the connection and event loop web3 sends single requests
+    of provider over, ex. those of the wss:// Infura endpoints from setup_w3.
+    Returns None if the batch isn't answered in time, ex. as nothing runs loop.
+    """
+    endpoint = get_endpoint(provider)
+    with _endpoints_lock:
+        websocket_lock = _websocket_locks.setdefault(endpoint, threading.Lock())
+    with websocket_lock:
+        future = asyncio.run_coroutine_threadsafe(
+            provider.coro_make_request(request_data), loop
+        )
+        try:
+            # sending and receiving are each bounded by the websocket timeout
+            return future.result(2 * provider.websocket_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            return None
+
+
+def _notify_batch_observers(w3: Web3, call_count: int, seconds: float) -> None:
+    with _batch_observers_lock:
+        observers = list(_batch_observers.get(w3, ()))
+    for observer in observers:
+        observer(call_count, seconds)
+
+
+def get_result(response: Dict[str, Any]) -> Any:
+    # Same error surface as a single web3 request
+    if "error" in response:
+        raise ValueError(response["error"])
+    return response["result"]
+
+
+def get_blocks(
+    w3: Web3, block_numbers: Sequence[int]
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Returns the header of every block in block_numbers, in a single round trip
+    where the provider allows it, or None for each block that is not available.
+
+    Only the "number", "hash", "timestamp" and "logsBloom" fields are guaranteed
+    to be set.
+    """
+    calls = [("eth_getBlockByNumber", [hex(number), False]) for number in block_numbers]
+    raw_blocks = make_batch_request(w3, calls)
+    if raw_blocks is None:
+        return [get_block_or_none(w3, number) for number in block_numbers]
+    return [
+        {
+            "number": to_int(hexstr=block["number"]),
+            "hash": HexBytes(block["hash"]),
+            "timestamp": to_int(hexstr=block["timestamp"]),
+            "logsBloom": HexBytes(block["logsBloom"]),
+        }
+        if block is not None
+        else None
+        for block in raw_blocks
+    ]
+
+
+def get_block_or_none(w3: Web3, block_number: int) -> Optional[Dict[str, Any]]:
+    try:
+        return w3.eth.getBlock(block_number)
+    except BlockNotFound:
+        return None
@@ -0,0 +1,114 @@
+import hashlib
+from typing import List, NamedTuple, Tuple
+
+from eth_utils import to_text
+from ethpm._utils.ipfs import b58encode
+
+# Defaults of `ipfs add`, which every CIDv0 ("Qm...") asset is assumed to use
+CHUNK_SIZE = 262_144
+MAX_LINKS = 174
+
+# sha2-256 multihash prefix: hash function code, then digest length
+SHA2_256_PREFIX = b"\x12\x20"
+
+UNIXFS_RAW_TYPE = 0
+UNIXFS_FILE_TYPE = 2
+
+
+class DagNode(NamedTuple):
+    multihash: bytes
+    # bytes of the file under this node
+    file_size: int
+    # bytes of this node and every node it links to, as recorded in links
+    tree_size: int
+
+
+def is_ipfs_file_hash(ipfs_hash: str, contents: bytes) -> bool:
+    """
+    Whether ipfs_hash is the CIDv0 of a file with these contents. Older releases
+    of `ipfs add` typed the chunks of multi-chunk files as raw unixfs nodes rather
+    than file nodes, so either encoding is accepted.
+    """
+    if get_ipfs_file_hash(contents) == ipfs_hash:
+        return True
+    return (
+        len(contents) > CHUNK_SIZE
+        and get_ipfs_file_hash(contents, UNIXFS_RAW_TYPE) == ipfs_hash  # noqa: W503
+    )
+
+
+def get_ipfs_file_hash(contents: bytes, leaf_type: int = UNIXFS_FILE_TYPE) -> str:
+    """
+    Returns the CIDv0 that `ipfs add` gives a file with these contents: the file
+    is split into 256KiB chunks that are linked from a balanced merkle dag of
+    unixfs nodes, with at most 174 links per node.
+    """
+    if len(contents) <= CHUNK_SIZE:
+        leaf_type = UNIXFS_FILE_TYPE
+    nodes = [
+        make_leaf_node(contents[offset : offset + CHUNK_SIZE], leaf_type)  # noqa: E203
+        for offset in range(0, max(len(contents), 1), CHUNK_SIZE)
+    ]
+    while len(nodes) > 1:
+        nodes = [
+            make_parent_node(nodes[offset : offset + MAX_LINKS])  # noqa: E203
+            for offset in range(0, len(nodes), MAX_LINKS)
+        ]
+    return to_text(b58encode(nodes[0].multihash))
+
+
+def make_leaf_node(chunk: bytes, leaf_type: int) -> DagNode:
+    unixfs_data = encode_unixfs_data(leaf_type, chunk, len(chunk), ())
+    encoded_node = encode_bytes_field(1, unixfs_data)
+    return DagNode(get_multihash(encoded_node), len(chunk), len(encoded_node))
+
+
+def make_parent_node(children: List[DagNode]) -> DagNode:
+    file_size = sum(child.file_size for child in children)
+    unixfs_data = encode_unixfs_data(
+        UNIXFS_FILE_TYPE, b"", file_size, tuple(child.file_size for child in children)
+    )
+    # links are encoded before the data, as in the canonical dag-pb encoding
+    encoded_node = b"".join(
+        encode_bytes_field(
+            2,
+            encode_bytes_field(1, child.multihash)
+            + encode_bytes_field(2, b"")  # noqa: W503
+            + encode_varint_field(3, child.tree_size),  # noqa: W503
+        )
+        for child in children
+    ) + encode_bytes_field(1, unixfs_data)
+    tree_size = len(encoded_node) + sum(child.tree_size for child in children)
+    return DagNode(get_multihash(encoded_node), file_size, tree_size)
+
+
+def encode_unixfs_data(
+    unixfs_type: int, data: bytes, file_size: int, block_sizes: Tuple[int, ...]
+) -> bytes:
+    encoded = encode_varint_field(1, unixfs_type)
+    if data:
+        encoded += encode_bytes_field(2, data)
+    encoded += encode_varint_field(3, file_size)
+    encoded += b"".join(encode_varint_field(4, size) for size in block_sizes)
+    return encoded
+
+
+def get_multihash(value: bytes) -> bytes:
+    return SHA2_256_PREFIX + hashlib.sha256(value).digest()
+
+
+def encode_bytes_field(field_number: int, value: bytes) -> bytes:
+    return encode_varint((field_number << 3) | 2) + encode_varint(len(value)) + value
+
+
+def encode_varint_field(field_number: int, value: int) -> bytes:
+    return encode_varint(field_number << 3) + encode_varint(value)
+
+
+def encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
@@ -0,0 +1,359 @@
+import contextlib
+import itertools
+import logging
+import multiprocessing
+from pathlib import Path
+import signal
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+from eth_typing import ChecksumAddress
+from web3 import Web3
+
+from ethpm_cli._utils.asset_store import is_packed_asset_store
+from ethpm_cli._utils.ipfs import DEFAULT_IPFS_JOBS, IPFSAssetDownloader
+from ethpm_cli._utils.journal import PendingAssetJournal
+from ethpm_cli._utils.leases import (
+    LEASE_DURATION,
+    Lease,
+    LeaseKeeper,
+    acquire_lease,
+    release_lease,
+)
+from ethpm_cli._utils.progress import compact_chain_data
+from ethpm_cli.commands.scraper import (
+    get_scrape_start_block,
+    get_scraped_ranges,
+    replay_pending_assets,
+    scrape,
+    stop_on_signals,
+    update_scraped_registries,
+)
+from ethpm_cli.config import setup_w3
+from ethpm_cli.constants import LEASES_DIR, PENDING_ASSETS
+from ethpm_cli.exceptions import ValidationError
+
+# Blocks in each range leased to a worker
+LEASE_BLOCKS = 10_000
+
+# Seconds a worker waits for ranges leased by other workers to be scraped or freed
+LEASE_POLL_INTERVAL = 5.0
+
+# Workers are spawned rather than forked, as a forked worker inherits the web3
+# providers of the coordinator without the event loop thread that runs websocket
+# requests, ex. to the wss:// Infura endpoints from setup_w3, and hangs on them.
+WORKER_START_METHOD = "spawn"
+
+logger = logging.getLogger("ethpm_cli.commands.coordinator")
+
+
+def get_block_lease_path(
+    chain_data_path: Path, lease_start: int, lease_end: int
+) -> Path:
+    lease_name = f"blocks-{lease_start}-{lease_end}.lease"
+    return chain_data_path.parent / LEASES_DIR / lease_name
+
+
+def get_worker_lease_path(chain_data_path: Path, slot: int) -> Path:
+    return chain_data_path.parent / LEASES_DIR / f"worker-{slot}.lease"
+
+
+def get_worker_journal_path(chain_data_path: Path, slot: int) -> Path:
+    return chain_data_path.parent / LEASES_DIR / f"worker-{slot}.{PENDING_ASSETS}"
+
+
+def iter_lease_ranges(
+    block_ranges: Iterable[Tuple[int, int]], lease_blocks: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Yields the inclusive ranges of lease_blocks blocks, aligned to multiples of
+    lease_blocks, that overlap the sorted inclusive block_ranges, each once.
+    Aligned ranges are named the same by every worker, whatever its view of the
+    scraped blocks.
+    """
+    last_index = None
+    for range_start, range_end in block_ranges:
+        for index in range(range_start // lease_blocks, range_end // lease_blocks + 1):
+            if index != last_index:
+                yield index * lease_blocks, (index + 1) * lease_blocks - 1
+                last_index = index
+
+
+def acquire_block_lease(
+    chain_data_path: Path,
+    unscraped_ranges: Iterable[Tuple[int, int]],
+    lease_blocks: int,
+    lease_duration: float,
+) -> Optional[Tuple[int, int, Lease]]:
+    """
+    Leases the first free range overlapping unscraped_ranges, if any, returning its
+    inclusive bounds along with the lease.
+    """
+    for lease_start, lease_end in iter_lease_ranges(unscraped_ranges, lease_blocks):
+        lease = acquire_lease(
+            get_block_lease_path(chain_data_path, lease_start, lease_end),
+            lease_duration,
+        )
+        if lease is not None:
+            return lease_start, lease_end, lease
+    return None
+
+
+@contextlib.contextmanager
+def hold_worker_slot(
+    chain_data_path: Path, lease_duration: float = LEASE_DURATION
+) -> Generator[int, None, None]:
+    """
+    Leases the lowest free worker slot of the chain within the context. Each slot
+    has its own pending asset journal, so the journal of a worker that died is
+    replayed by the next worker to take its slot.
+    """
+    for slot in itertools.count():
+        slot_path = get_worker_lease_path(chain_data_path, slot)
+        lease = acquire_lease(slot_path, lease_duration)
+        if lease is not None:
+            break
+    with LeaseKeeper(lease, lease_duration):
+        yield slot
+
+
+def scrape_worker(
+    w3: Web3,
+    ethpm_dir: Path,
+    chain_data_path: Path,
+    start_block: int,
+    end_block: int,
+    registry_addresses: Tuple[ChecksumAddress, ...] = None,
+    lease_blocks: int = LEASE_BLOCKS,
+    lease_duration: float = LEASE_DURATION,
+    poll_interval: float = LEASE_POLL_INTERVAL,
+    ipfs_jobs: int = DEFAULT_IPFS_JOBS,
+    stop: threading.Event = None,
+    **scrape_kwargs: Any,
+) -> int:
+    """
+    Scrapes blocks start_block - (end_block - 1) into the chain data store and asset
+    store shared with other workers, one leased range at a time, until every block
+    is scraped or `stop` is set. Returns the number of ranges this worker scraped.
+
+    Ranges of lease_blocks blocks are leased through lock files next to the chain
+    data store, and each lease is renewed while its range is scraped. A range whose
+    lease expired, ex. as its worker died, is leased again by the next worker to
+    find it. While every unscraped range is leased by others, the worker polls
+    every poll_interval seconds for them to be scraped or freed.
+
+    Every scraped batch is committed to the shared chain data store under its
+    lock, so scraped ranges merge as they are committed.
+    """
+    if stop is None:
+        stop = threading.Event()
+    scraped_leases = 0
+    with hold_worker_slot(chain_data_path, lease_duration) as slot:
+        pending_assets_path = get_worker_journal_path(chain_data_path, slot)
+        with IPFSAssetDownloader(ethpm_dir, ipfs_jobs) as downloader:
+            while not stop.is_set():
+                unscraped_ranges = list(
+                    get_scraped_ranges(chain_data_path).gaps(start_block, end_block - 1)
+                )
+                if not unscraped_ranges:
+                    break
+                block_lease = acquire_block_lease(
+                    chain_data_path, unscraped_ranges, lease_blocks, lease_duration
+                )
+                if block_lease is None:
+                    stop.wait(poll_interval)
+                    continue
+
+                lease_start, lease_end, lease = block_lease
+                logger.info(
+                    "Worker %d leased blocks %d - %d.", slot, lease_start, lease_end
+                )
+                with LeaseKeeper(lease, lease_duration):
+                    # other workers may have scraped some or all of the range since
+                    leased_ranges = list(
+                        get_scraped_ranges(chain_data_path).gaps(
+                            max(lease_start, start_block), min(lease_end, end_block - 1)
+                        )
+                    )
+                    for range_start, range_end in leased_ranges:
+                        if stop.is_set():
+                            break
+                        scrape(
+                            w3,
+                            ethpm_dir,
+                            range_start,
+                            end_block=range_end + 1,
+                            registry_addresses=registry_addresses,
+                            chain_data_path=chain_data_path,
+                            pending_assets_path=pending_assets_path,
+                            downloader=downloader,
+                            stop=stop,
+                            **scrape_kwargs,
+                        )
+                if leased_ranges:
+                    scraped_leases += 1
+    return scraped_leases
+
+
+def run_scrape_worker(
+    chain_id: int,
+    w3_factory: Callable[[int], Web3],
+    ethpm_dir: Path,
+    chain_data_path: Path,
+    start_block: int,
+    end_block: int,
+    registry_addresses: Optional[Tuple[ChecksumAddress, ...]],
+    worker_kwargs: Dict[str, Any],
+) -> None:
+    """
+    Entry point of a worker process started by coordinate_scrape, which scrapes
+    through the web3 instance w3_factory returns for chain_id.
+    """
+    stop = threading.Event()
+    with stop_on_signals(stop):
+        # Interrupts reach the coordinator too, which passes them on as SIGTERM, so
+        # a worker isn't interrupted outright by getting both.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        scrape_worker(
+            w3_factory(chain_id),
+            ethpm_dir,
+            chain_data_path,
+            start_block,
+            end_block,
+            registry_addresses,
+            stop=stop,
+            **worker_kwargs,
+        )
+
+
+def replay_orphaned_journals(
+    ethpm_dir: Path, chain_data_path: Path, ipfs_jobs: int = DEFAULT_IPFS_JOBS
+) -> None:
+    """
+    Fetches the assets journaled by workers that died, as well as by an interrupted
+    single process scrape, and whose journal no running worker will replay.
+    """
+    journal_paths = sorted(
+        (chain_data_path.parent / LEASES_DIR).glob(f"worker-*.{PENDING_ASSETS}")
+    )
+    with IPFSAssetDownloader(ethpm_dir, ipfs_jobs) as downloader:
+        replay_pending_assets(
+            PendingAssetJournal(chain_data_path.parent / PENDING_ASSETS), downloader
+        )
+        for journal_path in journal_paths:
+            slot_name = journal_path.name.split(".")[0]
+            lease = acquire_lease(journal_path.with_name(f"{slot_name}.lease"))
+            if lease is None:
+                continue
+            try:
+                replay_pending_assets(PendingAssetJournal(journal_path), downloader)
+            finally:
+                release_lease(lease)
+
+
+def coordinate_scrape(
+    chain_id: int,
+    ethpm_dir: Path,
+    chain_data_path: Path,
+    workers: int,
+    start_block: int = 0,
+    registry_addresses: Iterable[ChecksumAddress] = None,
+    confirmations: int = 0,
+    ipfs_jobs: int = DEFAULT_IPFS_JOBS,
+    w3_factory: Callable[[int], Web3] = setup_w3,
+    **worker_kwargs: Any,
+) -> int:
+    """
+    Scrapes a chain with `workers` worker processes, which lease block ranges from
+    one another through lock files next to its chain data store. See scrape_worker.
+
+    Hosts sharing ethpm_dir, ex. over a network filesystem, can each coordinate a
+    scrape of the same chain at the same time to add their workers to it. A SIGINT
+    or SIGTERM stops every worker once its batches in flight are saved.
+
+    The coordinator and each worker process scrape through their own web3 instance
+    from w3_factory, which has to be importable by the workers, as they're spawned.
+
+    Returns the first block left unscraped, or the block scraping ended before.
+    """
+    if is_packed_asset_store(ethpm_dir):
+        raise ValidationError(
+            f"Scrape workers can't share the packed asset store in {ethpm_dir}. "
+            "Run `ethpm store unpack` first."
+        )
+
+    w3 = w3_factory(chain_id)
+    end_block = w3.eth.blockNumber - confirmations
+    registries = tuple(registry_addresses or ()) or None
+    update_scraped_registries(chain_data_path, registries)
+    active_block = get_scrape_start_block(
+        w3, ethpm_dir, chain_data_path, start_block, registries, end_block
+    )
+    replay_orphaned_journals(ethpm_dir, chain_data_path, ipfs_jobs)
+
+    logger.info(
+        "Scraping blocks %d - %d with %d workers.", active_block, end_block - 1, workers
+    )
+    worker_kwargs = dict(worker_kwargs, ipfs_jobs=ipfs_jobs)
+    context = multiprocessing.get_context(WORKER_START_METHOD)
+    processes = [
+        context.Process(  # type: ignore
+            target=run_scrape_worker,
+            args=(
+                chain_id,
+                w3_factory,
+                ethpm_dir,
+                chain_data_path,
+                active_block,
+                end_block,
+                registries,
+                worker_kwargs,
+            ),
+            name=f"scrape-worker-{worker}",
+        )
+        for worker in range(workers)
+    ]
+    stop = threading.Event()
+    with stop_on_signals(stop):
+        for process in processes:
+            process.start()
+        try:
+            while any(process.is_alive() for process in processes):
+                if stop.wait(LEASE_POLL_INTERVAL):
+                    break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join()
+
+    for process in processes:
+        if process.exitcode != 0:
+            logger.warning(
+                "%s exited with status %s, its leased blocks will be scraped by the "
+                "next run.",
+                process.name,
+                process.exitcode,
+            )
+    replay_orphaned_journals(ethpm_dir, chain_data_path, ipfs_jobs)
+    compact_chain_data(chain_data_path)
+    unscraped_range = next(
+        get_scraped_ranges(chain_data_path).gaps(active_block, end_block - 1), None
+    )
+    if unscraped_range is not None:
+        logger.info(
+            "Scrape stopped at block %d, the next run resumes from there.",
+            unscraped_range[0],
+        )
+        return unscraped_range[0]
+    return end_block
@@ -2,7 +2,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
 
-from eth_typing import URI
+from eth_typing import URI, ChecksumAddress
 from eth_utils import to_tuple
 from eth_utils.toolz import assoc, assoc_in, dissoc
 from ethpm.backends.registry import is_valid_registry_uri, parse_registry_uri
@@ -13,7 +13,12 @@ from ethpm_cli._utils.logger import cli_logger
 from ethpm_cli._utils.shellart import bold_blue, bold_green, bold_white
 from ethpm_cli.config import Config
 from ethpm_cli.constants import REGISTRY_STORE
-from ethpm_cli.exceptions import AmbigiousFileSystem, AuthorizationError, InstallError
+from ethpm_cli.exceptions import (
+    AmbigiousFileSystem,
+    AuthorizationError,
+    InstallError,
+    ValidationError,
+)
 
 
 class StoredRegistry(NamedTuple):
@@ -149,6 +154,35 @@ def get_active_registry(store_path: Path) -> StoredRegistry:
     raise InstallError("Invalid registry store data found.")
 
 
+def get_chain_registry_addresses(
+    store_path: Path, chain_id: int, active_only: bool = False
+) -> Tuple[ChecksumAddress, ...]:
+    """
+    Returns the addresses of the registries in the registry store that live on
+    chain_id, or only the active registry's if active_only is True.
+    """
+    if not store_path.is_file():
+        raise AmbigiousFileSystem(
+            "No registry store found in ethPM CLI xdg root. "
+            "Create one with `ethpm registry add`"
+        )
+    registries = get_all_registries(store_path)
+    if active_only:
+        registries = (get_active_registry(store_path),)
+    parsed_uris = (parse_registry_uri(registry.uri) for registry in registries)
+    addresses = tuple(
+        parsed_uri.address
+        for parsed_uri in parsed_uris
+        if int(parsed_uri.chain_id) == chain_id
+    )
+    if not addresses:
+        raise ValidationError(
+            f"No {'active ' if active_only else ''}registry on chain {chain_id} "
+            f"found in {store_path}. Add one with `ethpm registry add`."
+        )
+    return addresses
+
+
 def lookup_registry_by_alias(
     alias: str, all_registries: Tuple[StoredRegistry, ...]
 ) -> StoredRegistry:
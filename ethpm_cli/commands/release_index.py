@@ -0,0 +1,123 @@
+from pathlib import Path
+import sqlite3
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+
+from eth_utils import to_checksum_address, to_hex, to_tuple
+
+RELEASE_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    chain_id INTEGER NOT NULL,
+    registry_address TEXT NOT NULL,
+    package_name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    manifest_uri TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, transaction_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS releases_by_package
+    ON releases (package_name, version);
+CREATE INDEX IF NOT EXISTS releases_by_registry
+    ON releases (registry_address, package_name);
+CREATE INDEX IF NOT EXISTS releases_by_block
+    ON releases (chain_id, block_number);
+"""
+
+
+class IndexedRelease(NamedTuple):
+    chain_id: int
+    registry_address: str
+    package_name: str
+    version: str
+    manifest_uri: str
+    block_number: int
+    transaction_hash: str
+    log_index: int
+
+
+class ReleaseIndex:
+    """
+    SQLite index of every VersionRelease event found by the scraper.
+
+    Usage:
+
+    with ReleaseIndex(xdg_ethpmcli_root / RELEASE_INDEX) as index:
+        index.get_releases(package_name="owned")
+    """
+
+    def __init__(self, index_path: Path) -> None:
+        self.index_path = index_path
+        self._connection = sqlite3.connect(str(index_path))
+        self._connection.executescript(RELEASE_INDEX_SCHEMA)
+
+    def __enter__(self) -> "ReleaseIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def add_releases(self, chain_id: int, version_release_logs: List[Any]) -> None:
+        """
+        Store decoded VersionRelease logs. Re-adding a log is a no-op, so a batch
+        can safely be indexed again after an interrupted scrape.
+        """
+        rows = [
+            (
+                chain_id,
+                to_checksum_address(log["address"]),
+                log["args"]["packageName"],
+                log["args"]["version"],
+                log["args"]["manifestURI"],
+                log["blockNumber"],
+                to_hex(log["transactionHash"]),
+                log["logIndex"],
+            )
+            for log in version_release_logs
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO releases VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def remove_releases_from_block(self, chain_id: int, block_number: int) -> None:
+        """
+        Drop every release at or after block_number, ex. when those blocks are
+        invalidated by a chain reorg.
+        """
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM releases WHERE chain_id = ? AND block_number >= ?",
+                (chain_id, block_number),
+            )
+
+    @to_tuple
+    def get_releases(
+        self,
+        package_name: Optional[str] = None,
+        registry_address: Optional[str] = None,
+        chain_id: Optional[int] = None,
+    ) -> Iterable[IndexedRelease]:
+        """
+        Returns every indexed release matching all of the given filters, in the
+        order they were released.
+        """
+        filters: List[Tuple[str, Any]] = []
+        if package_name is not None:
+            filters.append(("package_name = ?", package_name))
+        if registry_address is not None:
+            filters.append(
+                ("registry_address = ?", to_checksum_address(registry_address))
+            )
+        if chain_id is not None:
+            filters.append(("chain_id = ?", chain_id))
+
+        query = "SELECT * FROM releases"
+        if filters:
+            query += " WHERE " + " AND ".join(clause for clause, _ in filters)
+        query += " ORDER BY chain_id, block_number, log_index"
+        for row in self._connection.execute(query, [value for _, value in filters]):
+            yield IndexedRelease(*row)
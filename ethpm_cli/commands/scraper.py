@@ -1,39 +1,238 @@
-from datetime import datetime
-import itertools
+from collections import deque
+from concurrent.futures import (  # noqa: F401
+    FIRST_EXCEPTION,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, contextmanager, nullcontext
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Set, Tuple  # noqa: F401
+import signal
+import threading
+import time
+from typing import (  # noqa: F401
+    Any,
+    ContextManager,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
-from eth_typing import URI, Address
-from eth_utils import to_dict, to_list
-from eth_utils.toolz import assoc
+from eth_typing import URI, Address, ChecksumAddress
+from eth_utils import (
+    decode_hex,
+    encode_hex,
+    event_abi_to_log_topic,
+    to_canonical_address,
+    to_dict,
+    to_hex,
+    to_list,
+)
+from eth_utils.toolz import assoc, dissoc
 from ethpm._utils.ipfs import extract_ipfs_path_from_uri, is_ipfs_uri
 from ethpm.uri import is_supported_content_addressed_uri, resolve_uri_contents
+import requests
 from web3 import Web3
 
-from ethpm_cli._utils.various import flatten
-from ethpm_cli.config import write_updated_chain_data
-from ethpm_cli.constants import VERSION_RELEASE_ABI
-from ethpm_cli.exceptions import BlockNotFoundError
+from ethpm_cli._utils.batching import (
+    BATCH_SIZE,
+    AdaptiveBatchSize,
+    is_result_limit_error,
+)
+from ethpm_cli._utils.bloom import bloom_may_contain_log
+from ethpm_cli._utils.budget import ScrapeBudget
+from ethpm_cli._utils.blocks import (
+    BlockTimestamps,
+    find_block_before_timestamp,
+    find_deployment_block,
+)
+from ethpm_cli._utils.checkpoints import (
+    CHECKPOINT_WINDOW,
+    Checkpoint,
+    find_reorged_checkpoint,
+    get_block_checkpoint,
+)
+from ethpm_cli._utils.intervals import BlockRanges
+from ethpm_cli._utils.ipfs import (
+    DEFAULT_IPFS_JOBS,
+    IPFSAssetDownloader,
+    LocalIPFSPinner,
+    connect_to_local_ipfs,
+)
+from ethpm_cli._utils.journal import PendingAssetJournal
+from ethpm_cli._utils.json_scanner import JSONScanner
+from ethpm_cli._utils.metrics import (
+    DEFAULT_METRICS_INTERVAL,
+    MetricsExporter,
+    ScrapeMetrics,
+)
+from ethpm_cli._utils.progress import (
+    append_progress_record,
+    compact_chain_data,
+    lock_chain_data,
+    read_chain_data,
+    write_chain_data,
+)
+from ethpm_cli._utils.rpc import get_blocks, supports_batch_requests
+from ethpm_cli._utils.xdg import get_xdg_ethpmcli_root
+from ethpm_cli.commands.release_index import ReleaseIndex
+from ethpm_cli.constants import (
+    BLOCK_TIMESTAMPS,
+    IPFS_CHAIN_DATA,
+    PENDING_ASSETS,
+    RELEASE_INDEX,
+    VERSION_RELEASE_ABI,
+)
+from ethpm_cli.exceptions import BlockNotFoundError, ValidationError
 
 logger = logging.getLogger("ethpm_cli.scraper.Scraper")
 
 # https://github.com/ethereum/EIPs/commit/123b7267b6270914a822001c119d11607e695517
 VERSION_RELEASE_TIMESTAMP = 1_552_564_800  # March 14, 2019
 
-BATCH_SIZE = 5000
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 100_000
 
+# Seconds between polls for new blocks in follow mode
+DEFAULT_POLL_INTERVAL = 15.0
 
-def scrape(w3: Web3, ethpm_dir: Path, start_block: int = 0) -> int:
+# Manifests fetched ahead of the one being read while walking build dependencies
+MANIFEST_PREFETCH = 8
+
+# Blocks between two logsBloom matches that are queried along with them, rather
+# than splitting their logs query in two
+BLOOM_GAP_BLOCKS = 100
+
+# Separate runs of logsBloom matches in a window past which the whole window is
+# queried for logs at once
+MAX_BLOOM_RUNS = 10
+
+VERSION_RELEASE_TOPIC = encode_hex(
+    event_abi_to_log_topic(
+        next(abi for abi in VERSION_RELEASE_ABI if abi.get("name") == "VersionRelease")
+    )
+)
+
+# (from_block, to_block, future resolving to the batch's checkpoint and logs)
+PendingBatch = Tuple[int, int, "Future[Tuple[Checkpoint, List[Any]]]"]
+
+
+class ChainStore(NamedTuple):
+    w3: Web3
+    chain_data_path: Path
+    # None scrapes VersionRelease events emitted by any contract on the chain
+    registry_addresses: Optional[Tuple[ChecksumAddress, ...]] = None
+
+
+class ScrapeContext(NamedTuple):
+    """
+    State shared by every batch of a single scrape run.
+    """
+
+    w3: Web3
+    chain_id: int
+    chain_data_path: Path
+    executor: ThreadPoolExecutor
+    jobs: int
+    batch_size: AdaptiveBatchSize
+    downloader: IPFSAssetDownloader
+    release_index: ReleaseIndex
+    journal: PendingAssetJournal
+    registry_addresses: Optional[Tuple[ChecksumAddress, ...]]
+    bloom_filter: bool
+    stop: threading.Event
+    budget: Optional[ScrapeBudget]
+    metrics: ScrapeMetrics
+
+
+def scrape(
+    w3: Web3,
+    ethpm_dir: Path,
+    start_block: int = 0,
+    end_block: int = None,
+    jobs: int = 1,
+    min_batch_size: int = MIN_BATCH_SIZE,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    ipfs_jobs: int = DEFAULT_IPFS_JOBS,
+    confirmations: int = 0,
+    follow: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    registry_addresses: Iterable[ChecksumAddress] = None,
+    bloom_filter: bool = False,
+    chain_data_path: Path = None,
+    pending_assets_path: Path = None,
+    downloader: IPFSAssetDownloader = None,
+    stop: threading.Event = None,
+    budget: ScrapeBudget = None,
+    metrics: ScrapeMetrics = None,
+) -> int:
     """
     Scrapes VersionRelease event data starting from start_block.
 
     If start_block is not 0, scraping begins from start_block.
-    Otherwise the scraping begins from the ethpm birth block.
+    Otherwise the scraping begins from the ethpm birth block. If end_block is
+    given, scraping stops before it.
+
+    Up to `jobs` block batches are fetched concurrently, but batches are always
+    committed to the chain data store in block order.
+
+    The block window adapts between min_batch_size and max_batch_size according
+    to provider responses, starting from the size tuned on the previous run.
+
+    IPFS assets are downloaded by up to `ipfs_jobs` threads, and each asset is
+    fetched at most once per run.
+
+    Blocks within `confirmations` of the chain head are left for a later run. If
+    follow is True, the scraper keeps polling for new heads every poll_interval
+    seconds and scrapes each newly confirmed block range until interrupted.
+
+    If registry_addresses are given, only VersionRelease events emitted by those
+    registries are scraped, and unless a start_block is given, scraping begins from
+    the block the earliest of them was deployed in.
+
+    If bloom_filter is True, the headers of each batch are fetched in JSON-RPC
+    batch requests, and logs are only queried for the blocks whose logsBloom may
+    hold a VersionRelease event. Providers that don't take batch requests are
+    scraped without the filter, as fetching headers one by one costs more than
+    the log queries it saves.
+
+    Progress is tracked in chain_data_path, which defaults to the chain data store
+    in ethpm_dir. A downloader shared with other scrapes can be passed in, and stays
+    open for its owner to shut down. Setting `stop` ends the scrape after the batches
+    in flight are committed.
+
+    Progress, throughput and stage latencies are recorded in metrics, if given.
+    Once a budget, if given, is exhausted the scrape stops as if `stop` were set,
+    and budget.exhausted tells which of its limits was reached.
+
+    The manifest URIs of each batch are journaled at pending_assets_path, which
+    defaults to a journal next to the chain data store, until the batch's assets
+    are written, and any batches left in the journal by an interrupted run are
+    fetched before scraping resumes. If the scrape is
+    stopped before the head, the first block left unscraped is returned.
     """
-    chain_data_path = ethpm_dir / "chain_data.json"
-    latest_block = w3.eth.blockNumber
+    if chain_data_path is None:
+        chain_data_path = ethpm_dir / IPFS_CHAIN_DATA
+    if stop is None:
+        stop = threading.Event()
+    if metrics is None:
+        metrics = ScrapeMetrics(json.loads(chain_data_path.read_text())["chain_id"])
+    if budget is not None:
+        budget.watch(metrics)
+    latest_block = w3.eth.blockNumber - confirmations
+    if end_block is not None:
+        latest_block = min(latest_block, end_block)
+    metrics.head_block = latest_block
 
     if start_block >= latest_block:
         raise BlockNotFoundError(
@@ -41,216 +240,801 @@ def scrape(w3: Web3, ethpm_dir: Path, start_block: int = 0) -> int:
             f"instance with latest block number of {latest_block}."
         )
 
-    logger.info("Looking up start block for scraping VersionRelease events...")
-    if start_block == 0:
-        active_block = get_ethpm_birth_block(
-            w3, 0, latest_block, VERSION_RELEASE_TIMESTAMP
+    registries = tuple(registry_addresses or ()) or None
+    update_scraped_registries(chain_data_path, registries)
+
+    active_block = get_scrape_start_block(
+        w3, ethpm_dir, chain_data_path, start_block, registries, latest_block
+    )
+
+    if bloom_filter and not supports_batch_requests(w3):
+        logger.info("Scraping blocks without the logsBloom filter.")
+        bloom_filter = False
+
+    release_index = ReleaseIndex(ethpm_dir / RELEASE_INDEX)
+    if pending_assets_path is None:
+        pending_assets_path = chain_data_path.parent / PENDING_ASSETS
+    journal = PendingAssetJournal(pending_assets_path)
+    rollback_reorged_blocks(w3, chain_data_path, release_index)
+    logger.info("Scraping from block %d.", active_block)
+    chain_data = read_chain_data(chain_data_path)
+    scraped_ranges = BlockRanges.from_chain_data(chain_data["scraped_blocks"])
+    batch_size = AdaptiveBatchSize(
+        chain_data.get("batch_size", BATCH_SIZE), min_batch_size, max_batch_size
+    )
+    unscraped_ranges = list(scraped_ranges.gaps(active_block, latest_block - 1))
+    metrics.add_blocks_remaining(
+        sum(range_end - range_start + 1 for range_start, range_end in unscraped_ranges)
+    )
+    if not unscraped_ranges:
+        logger.info(
+            "Block range: %d - %d already scraped.", active_block, latest_block - 1
         )
+
+    downloader_context: ContextManager[IPFSAssetDownloader]
+    if downloader is None:
+        downloader_context = IPFSAssetDownloader(ethpm_dir, ipfs_jobs, metrics)
     else:
-        active_block = start_block
+        downloader_context = nullcontext(downloader)
+    with release_index, downloader_context as downloader, ThreadPoolExecutor(
+        max_workers=jobs
+    ) as executor:
+        context = ScrapeContext(
+            w3,
+            chain_data["chain_id"],
+            chain_data_path,
+            executor,
+            jobs,
+            batch_size,
+            downloader,
+            release_index,
+            journal,
+            registries,
+            bloom_filter,
+            stop,
+            budget,
+            metrics,
+        )
+        replay_pending_assets(journal, downloader)
+        scrape_block_ranges(context, unscraped_ranges)
+        if follow:
+            logger.info("Following new blocks, polling every %ss.", poll_interval)
+        while follow and not is_scrape_stopped(context):
+            # returns as soon as the scrape is stopped, ex. by a signal
+            stop.wait(poll_interval)
+            if is_scrape_stopped(context):
+                break
+            reorged_block = rollback_reorged_blocks(w3, chain_data_path, release_index)
+            if reorged_block is not None:
+                latest_block = min(latest_block, reorged_block)
+            head_block = w3.eth.blockNumber - confirmations
+            metrics.head_block = head_block
+            if head_block > latest_block:
+                metrics.add_blocks_remaining(head_block - latest_block)
+                scrape_block_ranges(context, [(latest_block, head_block - 1)])
+                latest_block = head_block
+        if follow:
+            logger.info("Stopped following new blocks at block %d.", latest_block)
+    compact_chain_data(chain_data_path)
 
-    logger.info("Scraping from block %d.", active_block)
-    for from_block in range(active_block, latest_block, BATCH_SIZE):
-        if (from_block + BATCH_SIZE) > latest_block:
-            to_block = latest_block
-        else:
-            to_block = from_block + BATCH_SIZE
+    if stop.is_set():
+        unscraped_range = next(
+            get_scraped_ranges(chain_data_path).gaps(active_block, latest_block - 1),
+            None,
+        )
+        if unscraped_range is not None:
+            logger.info(
+                "Scrape stopped at block %d, the next run resumes from there.",
+                unscraped_range[0],
+            )
+            return unscraped_range[0]
+    return latest_block
+
+
+def scrape_chains(
+    chain_stores: Sequence[ChainStore],
+    ethpm_dir: Path,
+    start_block: int = 0,
+    ipfs_jobs: int = DEFAULT_IPFS_JOBS,
+    follow: bool = False,
+    pin_local: bool = False,
+    status_path: Path = None,
+    prometheus_path: Path = None,
+    metrics_interval: float = DEFAULT_METRICS_INTERVAL,
+    budget: ScrapeBudget = None,
+    **scrape_kwargs: Any,
+) -> List[int]:
+    """
+    Scrapes every chain in chain_stores at the same time, each narrowed to its
+    ChainStore's registry addresses, if any. (w3, chain data path) pairs are also
+    accepted. Each chain's progress is tracked in its own chain data store, while
+    IPFS assets from every chain are written to the single content addressed store
+    in ethpm_dir by one shared downloader.
 
-        if block_range_needs_scraping(from_block, to_block, chain_data_path):
-            scraped_manifests = scrape_block_range_for_manifests(
-                w3, from_block, to_block
+    If any chain fails, the others are stopped and the error is re-raised. A SIGINT
+    or SIGTERM stops every chain once the batches in flight are saved. A second
+    signal raises KeyboardInterrupt, though only after those batches are saved, as
+    the threads scraping them can't be interrupted. Returns the last scraped block
+    of each chain.
+
+    If pin_local is True, every IPFS asset of the scraped releases is also pinned
+    to the local IPFS daemon.
+
+    Every metrics_interval seconds, the metrics of each chain are written to the
+    JSON status file at status_path and the prometheus textfile at prometheus_path,
+    where given.
+
+    A budget, if given, is shared by every chain: once any of its limits is reached
+    across all chains and the downloader, every chain stops at its next batch.
+    """
+    chain_stores = [ChainStore(*chain_store) for chain_store in chain_stores]
+    stop = threading.Event()
+    download_metrics = ScrapeMetrics(None)
+    chain_metrics = [
+        ScrapeMetrics(json.loads(chain_store.chain_data_path.read_text())["chain_id"])
+        for chain_store in chain_stores
+    ]
+    if budget is not None:
+        for metrics in (download_metrics, *chain_metrics):
+            budget.watch(metrics)
+    exporter = MetricsExporter(
+        [download_metrics, *chain_metrics],
+        status_path,
+        prometheus_path,
+        metrics_interval,
+    )
+    with ExitStack() as stack:
+        for chain_store, metrics in zip(chain_stores, chain_metrics):
+            stack.enter_context(metrics.count_rpc_calls(chain_store.w3))
+        stack.enter_context(exporter)
+        stack.enter_context(stop_on_signals(stop))
+        if pin_local:
+            pinner: Optional[LocalIPFSPinner] = stack.enter_context(
+                LocalIPFSPinner(
+                    connect_to_local_ipfs(), ipfs_jobs, metrics=download_metrics
+                )
             )
-            update_chain_data(chain_data_path, from_block, to_block, scraped_manifests)
-            write_ipfs_uris_to_disk(ethpm_dir, scraped_manifests)
         else:
-            logger.info("Block range: %d - %d already scraped.", from_block, to_block)
+            pinner = None
+        downloader = stack.enter_context(
+            IPFSAssetDownloader(ethpm_dir, ipfs_jobs, download_metrics, pinner)
+        )
+        executor = stack.enter_context(
+            ThreadPoolExecutor(max_workers=len(chain_stores))
+        )
+        futures = [
+            executor.submit(
+                scrape,
+                chain_store.w3,
+                ethpm_dir,
+                start_block,
+                follow=follow,
+                registry_addresses=chain_store.registry_addresses,
+                chain_data_path=chain_store.chain_data_path,
+                downloader=downloader,
+                stop=stop,
+                budget=budget,
+                metrics=metrics,
+                **scrape_kwargs,
+            )
+            for chain_store, metrics in zip(chain_stores, chain_metrics)
+        ]
+        try:
+            wait(futures, return_when=FIRST_EXCEPTION)
+        finally:
+            stop.set()
+    return [future.result() for future in futures]
 
-    return latest_block
+
+@contextmanager
+def stop_on_signals(stop: threading.Event) -> Generator[None, None, None]:
+    """
+    Sets stop on the first SIGINT or SIGTERM received within the context, and
+    raises KeyboardInterrupt on the next. Signal handlers can only be installed
+    from the main thread, so elsewhere this does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handle_signal(signum: int, frame: Any) -> None:
+        if stop.is_set():
+            raise KeyboardInterrupt
+        logger.info(
+            "Received %s, stopping once the batches in flight are saved.",
+            signal.Signals(signum).name,
+        )
+        stop.set()
+
+    previous_handlers = {
+        signum: signal.signal(signum, handle_signal)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        yield
+    finally:
+        for signum, previous_handler in previous_handlers.items():
+            signal.signal(signum, previous_handler)
+
+
+def scrape_block_ranges(
+    context: ScrapeContext, block_ranges: Iterable[Tuple[int, int]]
+) -> None:
+    """
+    Scrapes the inclusive block_ranges with up to `context.jobs` batches in flight,
+    committing each batch in block order. No new batches are started once
+    `context.stop` is set or `context.budget` is exhausted.
+    """
+    in_flight: Deque[PendingBatch] = deque()
+    for from_block, to_block in get_block_batches(block_ranges, context.batch_size):
+        if is_scrape_stopped(context):
+            break
+        future = context.executor.submit(scrape_batch, context, from_block, to_block)
+        in_flight.append((from_block, to_block, future))
+        if len(in_flight) >= context.jobs:
+            commit_scraped_batch(context, *in_flight.popleft())
+    while in_flight:
+        commit_scraped_batch(context, *in_flight.popleft())
+
+
+def is_scrape_stopped(context: ScrapeContext) -> bool:
+    """
+    Whether the scrape should stop, setting `context.stop` on an exhausted budget
+    so every scrape sharing the stop event winds down with it.
+    """
+    if context.stop.is_set():
+        return True
+    if context.budget is not None and context.budget.is_exhausted():
+        logger.info(
+            "Scrape budget of %s used up, stopping once the batches in flight are "
+            "saved.",
+            context.budget.exhausted,
+        )
+        context.stop.set()
+        return True
+    return False
+
+
+def get_block_batches(
+    block_ranges: Iterable[Tuple[int, int]], batch_size: AdaptiveBatchSize
+) -> Iterable[Tuple[int, int]]:
+    """
+    Splits inclusive block ranges into (from_block, to_block) batches,
+    where to_block is exclusive. Each batch is sized by the current batch_size.
+    """
+    for range_start, range_end in block_ranges:
+        from_block = range_start
+        while from_block <= range_end:
+            to_block = min(from_block + batch_size.size, range_end + 1)
+            yield from_block, to_block
+            from_block = to_block
+
+
+def commit_scraped_batch(
+    context: ScrapeContext,
+    from_block: int,
+    to_block: int,
+    scraped: "Future[Tuple[Checkpoint, List[Any]]]",
+) -> None:
+    """
+    Waits for a fetched batch and records it, re-raising any error from the fetch
+    so that no later batch is committed past a failed one.
+
+    The batch's manifest URIs are journaled before its range is recorded, and the
+    journal is cleared once their assets are on disk.
+    """
+    checkpoint, version_release_logs = scraped.result()
+    if version_release_logs:
+        scraped_manifests = format_version_release_logs(version_release_logs)
+    else:
+        scraped_manifests = {}
+    manifest_uris = get_manifest_uris(scraped_manifests)
+    if manifest_uris:
+        context.journal.record(from_block, to_block, manifest_uris)
+    with context.metrics.time_stage("index"):
+        context.release_index.add_releases(context.chain_id, version_release_logs)
+    with context.metrics.time_stage("chain_data"):
+        update_chain_data(
+            context.chain_data_path,
+            from_block,
+            to_block,
+            scraped_manifests,
+            context.batch_size.size,
+            checkpoint,
+        )
+    with context.metrics.time_stage("ipfs"):
+        write_manifest_assets_to_disk(manifest_uris, context.downloader)
+    if manifest_uris:
+        context.journal.complete()
+    context.metrics.record_scraped_batch(
+        to_block - from_block, len(version_release_logs)
+    )
+
+
+def get_scrape_start_block(
+    w3: Web3,
+    ethpm_dir: Path,
+    chain_data_path: Path,
+    start_block: int,
+    registry_addresses: Optional[Tuple[ChecksumAddress, ...]],
+    latest_block: int,
+) -> int:
+    """
+    Returns start_block if it's not 0, else the block the earliest of
+    registry_addresses was deployed in, falling back to the ethpm birth block.
+    """
+    if start_block:
+        return start_block
+    if registry_addresses:
+        logger.info("Looking up deployment blocks of the scraped registries...")
+        deployment_block = get_registries_deployment_block(
+            w3, chain_data_path, registry_addresses, latest_block
+        )
+        if deployment_block is not None:
+            return deployment_block
+    logger.info("Looking up start block for scraping VersionRelease events...")
+    return get_ethpm_birth_block(
+        w3,
+        0,
+        latest_block,
+        VERSION_RELEASE_TIMESTAMP,
+        BlockTimestamps(w3, ethpm_dir / BLOCK_TIMESTAMPS),
+    )
 
 
 def get_ethpm_birth_block(
-    w3: Web3, from_block: int, to_block: int, target_timestamp: int
+    w3: Web3,
+    from_block: int,
+    to_block: int,
+    target_timestamp: int,
+    timestamps: BlockTimestamps = None,
 ) -> int:
     """
     Returns the closest block found before the target_timestamp
     """
-    version_release_date = datetime.fromtimestamp(target_timestamp)
-    from_date = datetime.fromtimestamp(w3.eth.getBlock(from_block)["timestamp"])
-    delta = version_release_date - from_date
+    if timestamps is None:
+        timestamps = BlockTimestamps(w3, get_xdg_ethpmcli_root() / BLOCK_TIMESTAMPS)
+    try:
+        return find_block_before_timestamp(
+            timestamps, from_block, to_block, target_timestamp
+        )
+    finally:
+        timestamps.flush()
 
-    if delta.days <= 0 and from_date < version_release_date:
-        while (
-            w3.eth.getBlock(from_block)["timestamp"] < version_release_date.timestamp()
-        ):
-            from_block += 1
-        return from_block - 1
 
-    elif from_date < version_release_date:
-        updated_block = int((from_block + to_block) / 2)
-        return get_ethpm_birth_block(w3, updated_block, to_block, target_timestamp)
+def update_scraped_registries(
+    chain_data_path: Path, registry_addresses: Optional[Tuple[ChecksumAddress, ...]]
+) -> None:
+    """
+    Records the registries that blocks scraped into chain_data_path cover, where
+    None stands for every contract on the chain. Blocks scraped for some registries
+    say nothing about the others', and blocks scraped for fewer registries than
+    recorded wouldn't cover the recorded ones, so scraping for any other registries
+    is refused while any scraped blocks are stored.
+    """
+    with lock_chain_data(chain_data_path):
+        chain_data = read_chain_data(chain_data_path)
+        scraped_registries = chain_data.get("registry_addresses")
+        if registry_addresses is None:
+            changes_scope = scraped_registries is not None
+        else:
+            changes_scope = sorted(registry_addresses) != scraped_registries
+        # the genesis block a new store starts out with holds no releases
+        has_scraped_blocks = any(
+            int(block_range["max"]) > 0 for block_range in chain_data["scraped_blocks"]
+        )
+        if has_scraped_blocks and changes_scope:
+            if scraped_registries is None:
+                scope = "every registry"
+            else:
+                scope = f"the registries: {', '.join(scraped_registries)}"
+            raise ValidationError(
+                f"Blocks in {chain_data_path} were scraped for {scope}. Remove it to "
+                "scrape other registries."
+            )
+        if registry_addresses is None:
+            updated_chain_data = dissoc(chain_data, "registry_addresses")
+        else:
+            updated_chain_data = assoc(
+                chain_data, "registry_addresses", sorted(registry_addresses)
+            )
+        if updated_chain_data != chain_data:
+            write_chain_data(chain_data_path, updated_chain_data)
 
-    else:
-        updated_block = from_block - int(to_block - from_block)
-        return get_ethpm_birth_block(w3, updated_block, from_block, target_timestamp)
 
+def get_registries_deployment_block(
+    w3: Web3,
+    chain_data_path: Path,
+    registry_addresses: Sequence[ChecksumAddress],
+    latest_block: int,
+) -> Optional[int]:
+    """
+    Returns the block the earliest of registry_addresses was deployed in, or None if
+    any of their deployment blocks can't be found. Deployment blocks are cached in
+    the chain data store, so each is only looked up once.
+    """
+    chain_data = read_chain_data(chain_data_path)
+    deployment_blocks = dict(chain_data.get("deployment_blocks", {}))
+    for address in registry_addresses:
+        if address in deployment_blocks:
+            continue
+        try:
+            deployment_block = find_deployment_block(w3, address, latest_block)
+        except ValueError:
+            logger.info(
+                "Provider doesn't serve historical state, so registry deployment "
+                "blocks can't be looked up."
+            )
+            return None
+        if deployment_block is None:
+            logger.info("No registry deployed at %s.", address)
+            return None
+        deployment_blocks[address] = str(deployment_block)
 
-def block_range_needs_scraping(
-    from_block: int, to_block: int, chain_data_path: Path
-) -> bool:
-    all_scraped_blocks = get_scraped_blocks(chain_data_path)
-    if any(block not in all_scraped_blocks for block in range(from_block, to_block)):
-        return True
-    return False
+    if deployment_blocks != chain_data.get("deployment_blocks", {}):
+        # chain data may have changed during the lookups, so it's read again
+        with lock_chain_data(chain_data_path):
+            chain_data = read_chain_data(chain_data_path)
+            deployment_blocks = dict(
+                chain_data.get("deployment_blocks", {}), **deployment_blocks
+            )
+            write_chain_data(
+                chain_data_path,
+                assoc(chain_data, "deployment_blocks", deployment_blocks),
+            )
+    return min(int(deployment_blocks[address]) for address in registry_addresses)
 
 
 def update_chain_data(
     chain_data_path: Path,
     from_block: int,
     to_block: int,
-    manifests: Dict[Address, Dict[str, str]],
+    manifests: Dict[Address, List[Dict[str, str]]],
+    batch_size: int = None,
+    checkpoint: Checkpoint = None,
 ) -> None:
-    chain_data = json.loads(chain_data_path.read_text())
+    """
+    Records from_block - (to_block - 1) as scraped with a single append to the
+    progress log of chain_data_path. See read_chain_data.
+    """
+    record: Dict[str, Any] = {"from_block": from_block, "to_block": to_block}
+    if batch_size is not None:
+        record["batch_size"] = batch_size
+    if checkpoint is not None:
+        record["checkpoint"] = checkpoint
+    append_progress_record(chain_data_path, record)
 
-    old_scraped_blocks = get_scraped_blocks(chain_data_path)
-    new_scraped_blocks = list(range(from_block, to_block))
-    updated_blocks = blocks_to_ranges(set(old_scraped_blocks + new_scraped_blocks))
 
-    chain_data_with_updated_blocks = assoc(chain_data, "scraped_blocks", updated_blocks)
-    write_updated_chain_data(chain_data_path, chain_data_with_updated_blocks)
+def rollback_reorged_blocks(
+    w3: Web3, chain_data_path: Path, release_index: ReleaseIndex = None
+) -> Optional[int]:
+    """
+    Checks the stored block hash checkpoints against the chain and drops every
+    scraped block after the newest checkpoint that is still canonical, so only the
+    reorged tail is scraped again. Releases indexed from the dropped blocks are
+    removed from release_index. Returns the first dropped block, if any.
+    """
+    chain_data = read_chain_data(chain_data_path)
+    checkpoints = chain_data.get("checkpoints", [])
+    reorged_index = find_reorged_checkpoint(w3, checkpoints)
+    if reorged_index is None:
+        return None
 
+    if reorged_index > 0:
+        reorged_block = int(checkpoints[reorged_index - 1]["block"]) + 1
+    else:
+        # Even the oldest checkpoint was reorged out, so the fork point is unknown.
+        reorged_block = max(int(checkpoints[0]["block"]) - CHECKPOINT_WINDOW, 0)
+        logger.warning(
+            "Chain reorg deeper than all stored checkpoints, the oldest of which "
+            "is at block %s.",
+            checkpoints[0]["block"],
+        )
 
-@to_list
-def blocks_to_ranges(blocks_list: List[int]) -> Iterable[Dict[str, str]]:
+    append_progress_record(chain_data_path, {"rollback_from": reorged_block})
+    compact_chain_data(chain_data_path)
+    if release_index is not None:
+        release_index.remove_releases_from_block(chain_data["chain_id"], reorged_block)
+    logger.info(
+        "Chain reorg detected, blocks from %d onwards will be scraped again.",
+        reorged_block,
+    )
+    return reorged_block
+
+
+def get_scraped_ranges(chain_data_path: Path) -> BlockRanges:
+    scraped_blocks = read_chain_data(chain_data_path)["scraped_blocks"]
+    return BlockRanges.from_chain_data(scraped_blocks)
+
+
+def write_manifest_assets_to_disk(
+    manifest_uris: Iterable[URI], downloader: IPFSAssetDownloader
+) -> None:
     """
-    Takes a list of block numbers, and returns them grouped into min/max ranges.
-    :blocks_list: [0, 1, 2, 4, 6, 9]
-    -> [{"min": "0", "max": "2"}, {"min": "4", "max": "4"}, {"min": "6", "max": "9"}]
+    Streams the IPFS assets of every manifest reachable from manifest_uris to the
+    downloader's store as the manifests are read, so only a bounded number of
+    manifests and assets are held in memory at a time.
     """
-    for a, b in itertools.groupby(enumerate(blocks_list), lambda x: x[0] - x[1]):
-        c = list(b)
-        yield {"min": str(c[0][1]), "max": str(c[-1][1])}
+    downloader.fetch_all(iter_manifest_ipfs_uris(manifest_uris, downloader))
 
 
-def get_scraped_blocks(chain_data_path: Path) -> List[int]:
-    scraped_blocks = json.loads(chain_data_path.read_text())["scraped_blocks"]
-    scraped_ranges = [
-        list(range(int(rnge["min"]), int(rnge["max"]) + 1)) for rnge in scraped_blocks
-    ]
-    return flatten(scraped_ranges)
+@to_list
+def get_manifest_uris(
+    manifests: Dict[Address, List[Dict[str, str]]]
+) -> Iterable[URI]:
+    for releases in manifests.values():
+        for version_release_data in releases:
+            if is_supported_content_addressed_uri(version_release_data["manifestURI"]):
+                yield version_release_data["manifestURI"]
 
 
-def write_ipfs_uris_to_disk(
-    ethpm_dir: Path, manifests: Dict[Address, Dict[str, str]]
+def replay_pending_assets(
+    journal: PendingAssetJournal, downloader: IPFSAssetDownloader
 ) -> None:
-    all_manifest_uris = [
-        version_release_data["manifestURI"]
-        for version_release_data in manifests.values()
-        if is_supported_content_addressed_uri(version_release_data["manifestURI"])
-    ]
-    base_ipfs_uris = [uri for uri in all_manifest_uris if is_ipfs_uri(uri)]
-    nested_ipfs_uris = [pluck_ipfs_uris_from_manifest(uri) for uri in all_manifest_uris]
-    all_ipfs_uris = set(flatten(nested_ipfs_uris) + base_ipfs_uris)
-    # ex.
-    # ipfs uri: QmdvZEW3AaUntDfFkcbdnYzeLAAeD4YFeixQsdmHF88T6Q
-    # dir store: ethpmcli/Qm/dv/ZE/QmdvZEW3AaUntDfFkcbdnYzeLAAeD4YFeixQsdmHF88T6Q
-    for uri in all_ipfs_uris:
-        ipfs_hash = extract_ipfs_path_from_uri(uri)
-        first_two_bytes_dir = ethpm_dir / ipfs_hash[0:2]
-        second_two_bytes_dir = first_two_bytes_dir / ipfs_hash[2:4]
-        third_two_bytes_dir = second_two_bytes_dir / ipfs_hash[4:6]
-        asset_dest_path = third_two_bytes_dir / ipfs_hash
-
-        if not asset_dest_path.is_file():
-            if not first_two_bytes_dir.is_dir():
-                first_two_bytes_dir.mkdir()
-            if not second_two_bytes_dir.is_dir():
-                second_two_bytes_dir.mkdir()
-            if not third_two_bytes_dir.is_dir():
-                third_two_bytes_dir.mkdir()
-
-            asset_dest_path.touch()
-            asset_dest_path.write_bytes(resolve_uri_contents(uri))
-            logger.info("%s written to\n %s.\n", uri, asset_dest_path)
-
-
-def scrape_block_range_for_manifests(
-    w3: Web3, from_block: int, to_block: int
-) -> Dict[Address, Dict[str, str]]:
-    version_release_logs = get_block_version_release_logs(w3, from_block, to_block)
+    """
+    Writes the assets of every batch left in the journal by an interrupted scrape.
+    """
+    pending_batches = journal.pending()
+    for from_block, to_block, manifest_uris in pending_batches:
+        logger.info(
+            "Fetching assets of blocks %d-%d left by an interrupted scrape.",
+            from_block,
+            to_block - 1,
+        )
+        write_manifest_assets_to_disk(manifest_uris, downloader)
+    if pending_batches:
+        journal.complete()
+
+
+def scrape_batch(
+    context: ScrapeContext, from_block: int, to_block: int
+) -> Tuple[Checkpoint, List[Any]]:
+    # The checkpoint is read before the logs: if a reorg lands in between, the
+    # stale checkpoint is caught by the next run rather than the logs going unseen.
+    if context.bloom_filter:
+        checkpoint, log_ranges = get_bloom_matching_ranges(
+            context, from_block, to_block
+        )
+    else:
+        with context.metrics.time_stage("checkpoint"):
+            checkpoint = get_block_checkpoint(context.w3, to_block - 1)
+        log_ranges = BlockRanges([(from_block, to_block - 1)])
+    version_release_logs = []
+    started_at = time.monotonic()
+    with context.metrics.time_stage("logs"):
+        for range_start, range_end in log_ranges:
+            version_release_logs.extend(
+                fetch_version_release_logs(
+                    context.w3,
+                    range_start,
+                    range_end + 1,
+                    context.batch_size,
+                    context.registry_addresses,
+                )
+            )
+    # The window is sized as a whole, however few of its blocks the bloom left
+    context.batch_size.record(
+        to_block - from_block, len(version_release_logs), time.monotonic() - started_at
+    )
     logger.info(
         "Blocks %d-%d scraped. %d VersionRelease events found.",
         from_block,
-        to_block,
+        to_block - 1,
         len(version_release_logs),
     )
-    if version_release_logs:
-        return format_version_release_logs(version_release_logs)
+    return checkpoint, version_release_logs
+
+
+def get_bloom_matching_ranges(
+    context: ScrapeContext, from_block: int, to_block: int
+) -> Tuple[Checkpoint, BlockRanges]:
+    """
+    Returns the checkpoint of block to_block - 1, and the ranges of blocks in
+    from_block - (to_block - 1) whose logsBloom may hold a VersionRelease event from
+    the scraped registries. Blocks whose header isn't available are kept.
+
+    Bloom false positives are scattered, so matches up to BLOOM_GAP_BLOCKS apart
+    are merged into one range, and a window with more than MAX_BLOOM_RUNS ranges
+    left is returned whole, to be queried with a single request.
+    """
+    if context.registry_addresses is None:
+        addresses = None
+    else:
+        addresses = [to_canonical_address(a) for a in context.registry_addresses]
+    with context.metrics.time_stage("headers"):
+        headers = get_blocks(context.w3, range(from_block, to_block))
+
+    matching_ranges = BlockRanges()
+    for block_number, header in enumerate(headers, start=from_block):
+        if header is None or bloom_may_contain_log(
+            header["logsBloom"], decode_hex(VERSION_RELEASE_TOPIC), addresses
+        ):
+            matching_ranges.add(block_number, block_number)
+    if matching_ranges:
+        first_match, _ = next(iter(matching_ranges))
+        _, last_match = list(matching_ranges)[-1]
+        for gap_start, gap_end in list(matching_ranges.gaps(first_match, last_match)):
+            if gap_end - gap_start < BLOOM_GAP_BLOCKS:
+                matching_ranges.add(gap_start, gap_end)
+    if len(matching_ranges) > MAX_BLOOM_RUNS:
+        matching_ranges = BlockRanges([(from_block, to_block - 1)])
+    context.metrics.increment(
+        "bloom_skipped_blocks",
+        to_block - from_block - sum(end - start + 1 for start, end in matching_ranges),
+    )
+
+    if headers[-1] is None:
+        checkpoint = get_block_checkpoint(context.w3, to_block - 1)
     else:
-        return {}
+        checkpoint = {"block": str(to_block - 1), "hash": to_hex(headers[-1]["hash"])}
+    return checkpoint, matching_ranges
 
 
-@to_list
-def pluck_ipfs_uris_from_manifest(uri: URI) -> Iterable[List[Any]]:
-    manifest_contents = json.loads(resolve_uri_contents(uri))
-    yield pluck_ipfs_uris(manifest_contents)
+def fetch_version_release_logs(
+    w3: Web3,
+    from_block: int,
+    to_block: int,
+    batch_size: AdaptiveBatchSize,
+    registry_addresses: Sequence[ChecksumAddress] = None,
+) -> List[Any]:
+    """
+    Fetches VersionRelease logs for from_block - (to_block - 1). If the provider
+    rejects the window as too large, batch_size is shrunk and the window is split
+    in half and each half is retried.
+    """
+    try:
+        logs = get_block_version_release_logs(
+            w3, from_block, to_block - 1, registry_addresses
+        )
+    except (ValueError, requests.exceptions.Timeout) as err:
+        if to_block - from_block <= 1 or not is_result_limit_error(err):
+            raise
+        batch_size.shrink()
+        midpoint = from_block + (to_block - from_block) // 2
+        logger.info(
+            "Provider rejected blocks %d-%d, retrying as %d-%d and %d-%d.",
+            from_block,
+            to_block - 1,
+            from_block,
+            midpoint - 1,
+            midpoint,
+            to_block - 1,
+        )
+        return fetch_version_release_logs(
+            w3, from_block, midpoint, batch_size, registry_addresses
+        ) + fetch_version_release_logs(
+            w3, midpoint, to_block, batch_size, registry_addresses
+        )
 
-    if "build_dependencies" in manifest_contents:
-        for dependency_uri in manifest_contents["build_dependencies"].values():
-            yield pluck_ipfs_uris_from_manifest(dependency_uri)
+    return logs
 
 
-@to_list
-def pluck_ipfs_uris(manifest: Dict[str, Any]) -> Iterable[List[str]]:
-    if "sources" in manifest:
-        for source in manifest["sources"].values():
-            if is_ipfs_uri(source):
-                yield source
+def iter_manifest_ipfs_uris(
+    uris: Iterable[URI],
+    downloader: IPFSAssetDownloader = None,
+    prefetch: int = MANIFEST_PREFETCH,
+) -> Iterator[URI]:
+    """
+    Yields the IPFS uris found in every manifest reachable from uris through
+    build_dependencies, as each manifest is read.
+
+    The dependency graph is walked breadth first with a visited set, so shared
+    dependencies are read once and cyclic references terminate. With a downloader,
+    up to `prefetch` manifests are fetched ahead of the one being read, and
+    manifests already in the local store are read from disk. Manifests are scanned
+    for their uris rather than decoded, see iter_manifest_uri_fields.
+    """
+    visited = set()
+    unfetched: Deque[URI] = deque()
+    for uri in uris:
+        if get_manifest_key(uri) not in visited:
+            visited.add(get_manifest_key(uri))
+            unfetched.append(uri)
 
-    if "meta" in manifest:
-        if "links" in manifest["meta"]:
-            for link in manifest["meta"]["links"].values():
-                if is_ipfs_uri(link):
-                    yield link
+    fetching: Deque["Future[bytes]"] = deque()
+    while unfetched or fetching:
+        while downloader is not None and unfetched and len(fetching) < prefetch:
+            fetching.append(downloader.submit(unfetched.popleft()))
+        if downloader is None:
+            contents = resolve_uri_contents(unfetched.popleft())
+        else:
+            contents = fetching.popleft().result()
 
-    if "build_dependencies" in manifest:
-        for source in manifest["build_dependencies"].values():
-            if is_ipfs_uri(source):
-                yield source
+        for field, uri in iter_manifest_uri_fields(contents):
+            if is_ipfs_uri(uri):
+                yield uri
+            if field == "build_dependencies" and get_manifest_key(uri) not in visited:
+                visited.add(get_manifest_key(uri))
+                unfetched.append(uri)
+
+
+def iter_manifest_uri_fields(contents: bytes) -> Iterator[Tuple[str, URI]]:
+    """
+    Yields ("sources" | "links" | "build_dependencies", uri) for every uri in the
+    manifest contents, in document order.
+
+    Only the members holding uris are read, and only strings opening with a uri
+    scheme are decoded, so inline sources, contract types and deployments, which
+    make up most of a large manifest, are skipped without being parsed.
+    """
+    scanner = JSONScanner(contents)
+    for key in scanner.iter_object():
+        if key in ("sources", "build_dependencies"):
+            field = key
+        elif key == "meta":
+            for meta_key in scanner.iter_object():
+                if meta_key == "links":
+                    for uri in scanner.iter_uri_values():
+                        if uri is not None:
+                            yield "links", URI(uri)
+                else:
+                    scanner.skip_value()
+            continue
+        else:
+            scanner.skip_value()
+            continue
+
+        for uri in scanner.iter_uri_values():
+            if uri is not None:
+                yield field, URI(uri)
+
+
+def get_manifest_key(uri: URI) -> str:
+    """
+    Identifies a manifest by its content hash where possible, so different uris
+    for the same IPFS content are treated as one manifest.
+    """
+    if is_ipfs_uri(uri):
+        return extract_ipfs_path_from_uri(uri)
+    return uri
 
 
-@to_dict
 def format_version_release_logs(
-    all_entries: Dict[Any, Any]
-) -> Iterable[Tuple[Address, Any]]:
-    all_addresses = set(entry["address"] for entry in all_entries)
-    for address in all_addresses:
-        all_releases_by_address = process_entries(address, all_entries)
-        yield address, all_releases_by_address
+    all_entries: Iterable[Any],
+) -> Dict[Address, List[Dict[str, str]]]:
+    """
+    Groups VersionRelease logs by registry address in a single pass, keeping every
+    release from each registry in the order it was logged.
+    """
+    releases_by_address: Dict[Address, List[Dict[str, str]]] = {}
+    for entry in all_entries:
+        releases_by_address.setdefault(entry["address"], []).append(
+            process_entry(entry)
+        )
+    return releases_by_address
 
 
 @to_dict
-def process_entries(
-    address: Address, all_entries: Dict[Any, Any]
-) -> Iterable[Tuple[str, str]]:
-    for entry in all_entries:
-        if entry["address"] == address:
-            logger.info(
-                "<Package %s==%s> released on registry @ %s.\n" "Manifest URI: %s\n",
-                entry["args"]["packageName"],
-                entry["args"]["version"],
-                address,
-                entry["args"]["manifestURI"],
-            )
-            yield "manifestURI", entry["args"]["manifestURI"]
-            yield "packageName", entry["args"]["packageName"]
-            yield "version", entry["args"]["version"]
+def process_entry(entry: Any) -> Iterable[Tuple[str, str]]:
+    logger.info(
+        "<Package %s==%s> released on registry @ %s.\n" "Manifest URI: %s\n",
+        entry["args"]["packageName"],
+        entry["args"]["version"],
+        entry["address"],
+        entry["args"]["manifestURI"],
+    )
+    yield "manifestURI", entry["args"]["manifestURI"]
+    yield "packageName", entry["args"]["packageName"]
+    yield "version", entry["args"]["version"]
 
 
 def get_block_version_release_logs(
-    w3: Web3, from_block: int, to_block: int
-) -> Dict[str, Any]:
-    log_contract = w3.eth.contract(abi=VERSION_RELEASE_ABI)
-    log_filter = log_contract.events.VersionRelease.createFilter(
-        fromBlock=from_block, toBlock=to_block
-    )
-    return log_filter.get_all_entries()
+    w3: Web3,
+    from_block: int,
+    to_block: int,
+    registry_addresses: Sequence[ChecksumAddress] = None,
+) -> List[Any]:
+    """
+    Fetches every VersionRelease log in from_block - to_block with a single
+    stateless eth_getLogs request, rather than installing a filter on the provider.
+    """
+    filter_params: Dict[str, Any] = {
+        "fromBlock": from_block,
+        "toBlock": to_block,
+        "topics": [VERSION_RELEASE_TOPIC],
+    }
+    if registry_addresses:
+        filter_params["address"] = list(registry_addresses)
+    raw_logs = w3.eth.getLogs(filter_params)
+    version_release = w3.eth.contract(abi=VERSION_RELEASE_ABI).events.VersionRelease()
+    return [version_release.processLog(log) for log in raw_logs]
@@ -0,0 +1,145 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from ethpm_cli._utils.asset_store import (
+    LooseAssetStore,
+    PackedAssetStore,
+    get_asset_store,
+    is_packed_asset_store,
+    iter_loose_asset_paths,
+)
+from ethpm_cli._utils.filesystem import atomic_replace
+from ethpm_cli._utils.logger import cli_logger
+from ethpm_cli._utils.unixfs import is_ipfs_file_hash
+from ethpm_cli.constants import QUARANTINE_DIR, VERIFIED_ASSETS
+from ethpm_cli.exceptions import AmbigiousFileSystem
+
+# Assets sent to each verification worker at a time
+VERIFY_CHUNK_SIZE = 16
+
+
+class VerificationReport(NamedTuple):
+    checked: int
+    skipped: int
+    mismatched: Tuple[str, ...]
+
+
+def pack_asset_store(ethpm_dir: Path) -> int:
+    """
+    Moves every asset in the loose store under ethpm_dir into the packfile, which
+    is created if missing, and returns the number of assets moved. Loose files are
+    only deleted once the pack holding them is synced to disk, so an interrupted
+    conversion can simply be run again.
+    """
+    loose_asset_paths = list(iter_loose_asset_paths(ethpm_dir))
+    with PackedAssetStore(ethpm_dir) as pack:
+        for asset_path in loose_asset_paths:
+            pack.write(asset_path.name, asset_path.read_bytes())
+        pack.sync()
+
+    for asset_path in loose_asset_paths:
+        asset_path.unlink()
+        remove_empty_shard_dirs(ethpm_dir, asset_path.parent)
+    cli_logger.info("%d assets packed into %s.", len(loose_asset_paths), pack.pack_path)
+    return len(loose_asset_paths)
+
+
+def unpack_asset_store(ethpm_dir: Path) -> int:
+    """
+    Writes every asset in the packfile under ethpm_dir back to the loose store,
+    then removes the packfile. Returns the number of assets unpacked.
+    """
+    if not is_packed_asset_store(ethpm_dir):
+        raise AmbigiousFileSystem(
+            f"No packed asset store found in {ethpm_dir}. "
+            "Create one with `ethpm store pack`."
+        )
+
+    loose_store = LooseAssetStore(ethpm_dir)
+    with PackedAssetStore(ethpm_dir) as pack:
+        for ipfs_hash in pack:
+            loose_store.write(ipfs_hash, pack.read(ipfs_hash))
+        asset_count = len(pack)
+
+    # Without its index the pack is no longer used, even if removing it fails
+    pack.index_path.unlink()
+    pack.pack_path.unlink()
+    cli_logger.info("%d assets unpacked into %s.", asset_count, ethpm_dir)
+    return asset_count
+
+
+def remove_empty_shard_dirs(ethpm_dir: Path, shard_dir: Path) -> None:
+    while shard_dir != ethpm_dir and not any(shard_dir.iterdir()):
+        shard_dir.rmdir()
+        shard_dir = shard_dir.parent
+
+
+def verify_asset_store(
+    ethpm_dir: Path, quarantine: bool = False, jobs: int = None
+) -> VerificationReport:
+    """
+    Recomputes the IPFS hash of every asset in the store under ethpm_dir across a
+    pool of `jobs` processes, and reports the assets whose contents don't match
+    the hash they are stored under. With quarantine, mismatched assets are moved
+    out of the store into ethpm_dir/quarantine, so a later scrape fetches them
+    again.
+
+    Assets that verified and haven't changed since, per the store's record of
+    verified assets, are skipped.
+    """
+    verified_assets_path = ethpm_dir / VERIFIED_ASSETS
+    if verified_assets_path.is_file():
+        verified_assets = json.loads(verified_assets_path.read_text())
+    else:
+        verified_assets = {}
+
+    with get_asset_store(ethpm_dir) as store:
+        locations = {ipfs_hash: store.locate(ipfs_hash) for ipfs_hash in store}
+        unverified = [
+            ipfs_hash
+            for ipfs_hash, location in locations.items()
+            if verified_assets.get(ipfs_hash) != list(location.version)
+        ]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            matches = executor.map(
+                is_stored_asset_hash,
+                unverified,
+                [str(locations[ipfs_hash].path) for ipfs_hash in unverified],
+                [locations[ipfs_hash].offset for ipfs_hash in unverified],
+                [locations[ipfs_hash].length for ipfs_hash in unverified],
+                chunksize=VERIFY_CHUNK_SIZE,
+            )
+            mismatched = tuple(
+                ipfs_hash
+                for ipfs_hash, is_match in zip(unverified, matches)
+                if not is_match
+            )
+
+        if quarantine:
+            for ipfs_hash in mismatched:
+                quarantine_path = ethpm_dir / QUARANTINE_DIR / ipfs_hash
+                quarantine_path.parent.mkdir(exist_ok=True)
+                quarantine_path.write_bytes(store.read(ipfs_hash))
+                store.remove(ipfs_hash)
+
+    updated_verified_assets: Dict[str, List[int]] = {
+        ipfs_hash: list(location.version)
+        for ipfs_hash, location in sorted(locations.items())
+        if ipfs_hash not in mismatched
+    }
+    if not verified_assets_path.is_file():
+        verified_assets_path.touch()
+    with atomic_replace(verified_assets_path) as verified_assets_file:
+        verified_assets_file.write(json.dumps(updated_verified_assets, indent=4))
+        verified_assets_file.write("\n")
+    return VerificationReport(
+        len(unverified), len(locations) - len(unverified), mismatched
+    )
+
+
+def is_stored_asset_hash(ipfs_hash: str, path: str, offset: int, length: int) -> bool:
+    with open(path, mode="rb") as asset_file:
+        asset_file.seek(offset)
+        return is_ipfs_file_hash(ipfs_hash, asset_file.read(length))
@@ -18,6 +18,7 @@ from ethpm_cli._utils.logger import cli_logger
 from ethpm_cli._utils.xdg import get_xdg_ethpmcli_root
 from ethpm_cli.commands.auth import get_authorized_private_key, import_keyfile
 from ethpm_cli.constants import (
+    CHAIN_STORES_DIR,
     ETHPM_DIR_ENV_VAR,
     ETHPM_PACKAGES_DIR,
     IPFS_CHAIN_DATA,
@@ -132,15 +133,40 @@ def setup_xdg_ethpm_dir(xdg_ethpmcli_root: Path, w3: Web3) -> None:
 def initialize_xdg_ethpm_dir(xdg_ethpmcli_root: Path, w3: Web3) -> None:
     xdg_ethpmcli_root.mkdir()
     os.environ["XDG_ETHPMCLI_ROOT"] = str(xdg_ethpmcli_root)
-    xdg_chain_data = xdg_ethpmcli_root / IPFS_CHAIN_DATA
-    xdg_chain_data.touch()
+    initialize_chain_data_store(xdg_ethpmcli_root / IPFS_CHAIN_DATA, w3.eth.chainId)
+    xdg_keyfile = xdg_ethpmcli_root / KEYFILE_PATH
+    xdg_keyfile.touch()
+
+
+def initialize_chain_data_store(chain_data_path: Path, chain_id: int) -> None:
+    chain_data_path.touch()
     init_chain_data = {
-        "chain_id": w3.eth.chainId,
+        "chain_id": chain_id,
         "scraped_blocks": [{"min": "0", "max": "0"}],
     }
-    write_updated_chain_data(xdg_chain_data, init_chain_data)
-    xdg_keyfile = xdg_ethpmcli_root / KEYFILE_PATH
-    xdg_keyfile.touch()
+    write_updated_chain_data(chain_data_path, init_chain_data)
+
+
+def get_chain_data_path(xdg_ethpmcli_root: Path, chain_id: int) -> Path:
+    """
+    Returns the path to the chain data store for chain_id, creating the store if
+    it doesn't exist yet.
+
+    The store in the xdg root belongs to the chain it was initialized with. Every
+    other chain is stored under xdg root / chains / chain id.
+    """
+    root_chain_data_path = xdg_ethpmcli_root / IPFS_CHAIN_DATA
+    root_chain_data = json.loads(root_chain_data_path.read_text())
+    if root_chain_data["chain_id"] == chain_id:
+        return root_chain_data_path
+
+    chain_data_path = (
+        xdg_ethpmcli_root / CHAIN_STORES_DIR / str(chain_id) / IPFS_CHAIN_DATA
+    )
+    if not chain_data_path.is_file():
+        chain_data_path.parent.mkdir(parents=True, exist_ok=True)
+        initialize_chain_data_store(chain_data_path, chain_id)
+    return chain_data_path
 
 
 def write_updated_chain_data(
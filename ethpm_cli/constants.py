@@ -4,17 +4,28 @@ import pkg_resources
 
 from ethpm_cli import CLI_ASSETS_DIR
 
+ASSET_PACK = "assets.pack"
+ASSET_PACK_INDEX = "assets.pack.idx"
+BLOCK_TIMESTAMPS = "block_timestamps.json"
+CHAIN_DATA_LOCK = "chain_data.lock"
+CHAIN_STORES_DIR = "chains"
 ETHPM_DIR_ENV_VAR = "ETHPM_CLI_PACKAGES_DIR"
 ETHPM_PACKAGES_DIR = "_ethpm_packages"
 IPFS_ASSETS_DIR = "ipfs"
 IPFS_CHAIN_DATA = "chain_data.json"
 KEYFILE_PATH = "_ethpm_keyfile.json"
+LEASES_DIR = "leases"
 LOCKFILE_NAME = "ethpm.lock"
+PENDING_ASSETS = "pending_assets.jsonl"
+QUARANTINE_DIR = "quarantine"
 REGISTRY_STORE = "_ethpm_registries.json"
+RELEASE_INDEX = "releases.db"
+SCRAPE_PROGRESS = "scrape_progress.jsonl"
 SOLC_INPUT = "solc_input.json"
 SOLC_OUTPUT = "solc_output.json"
 SOLC_PATH = "ETHPM_CLI_SOLC_PATH"
 SRC_DIR_NAME = "_src"
+VERIFIED_ASSETS = "verified_assets.json"
 
 VERSION_RELEASE_ABI = json.loads((CLI_ASSETS_DIR / "1.0.1.json").read_text())[
     "contract_types"
@@ -1,14 +1,21 @@
 import argparse
 from pathlib import Path
+import sys
+from typing import List, Union
 
-from eth_utils import humanize_hash
+from eth_typing import ChecksumAddress
+from eth_utils import humanize_hash, is_address, to_checksum_address
 from ethpm.constants import SUPPORTED_CHAIN_IDS
 
+from ethpm_cli._utils.budget import BUDGET_EXHAUSTED_EXIT_CODE, ScrapeBudget
+from ethpm_cli._utils.ipfs import DEFAULT_IPFS_JOBS
 from ethpm_cli._utils.logger import cli_logger
+from ethpm_cli._utils.metrics import DEFAULT_METRICS_INTERVAL
 from ethpm_cli._utils.solc import compile_contracts, generate_solc_input
 from ethpm_cli._utils.xdg import get_xdg_ethpmcli_root
 from ethpm_cli.commands.activate import activate_package
 from ethpm_cli.commands.auth import get_authorized_address
+from ethpm_cli.commands.coordinator import coordinate_scrape
 from ethpm_cli.commands.get import get_manifest
 from ethpm_cli.commands.install import (
     install_package,
@@ -28,17 +35,35 @@ from ethpm_cli.commands.registry import (
     add_registry,
     deploy_registry,
     get_active_registry,
+    get_chain_registry_addresses,
     list_registries,
     remove_registry,
 )
 from ethpm_cli.commands.release import release_package
-from ethpm_cli.commands.scraper import scrape
-from ethpm_cli.config import Config, validate_config_has_project_dir_attr
-from ethpm_cli.constants import IPFS_CHAIN_DATA, REGISTRY_STORE, SOLC_OUTPUT
+from ethpm_cli.commands.scraper import (
+    DEFAULT_POLL_INTERVAL,
+    MAX_BATCH_SIZE,
+    MIN_BATCH_SIZE,
+    ChainStore,
+    scrape_chains,
+)
+from ethpm_cli.commands.store import (
+    pack_asset_store,
+    unpack_asset_store,
+    verify_asset_store,
+)
+from ethpm_cli.config import (
+    Config,
+    get_chain_data_path,
+    setup_w3,
+    validate_config_has_project_dir_attr,
+)
+from ethpm_cli.constants import REGISTRY_STORE, SOLC_OUTPUT
 from ethpm_cli.exceptions import AuthorizationError, ConfigurationError, ValidationError
 from ethpm_cli.validation import (
     validate_chain_data_store,
     validate_install_cli_args,
+    validate_scrape_cli_args,
     validate_solc_output,
     validate_uninstall_cli_args,
 )
@@ -58,6 +83,29 @@ def add_chain_id_arg_to_parser(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def parse_chain_ids(value: str) -> List[int]:
+    try:
+        chain_ids = [int(chain_id) for chain_id in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"{value} is not a comma separated list of chain IDs."
+        )
+    # drop duplicates, keeping the given order
+    return list(dict.fromkeys(chain_ids))
+
+
+def parse_registries(value: str) -> Union[str, List[ChecksumAddress]]:
+    if value in ("active", "stored"):
+        return value
+    addresses = value.split(",")
+    if not all(is_address(address) for address in addresses):
+        raise argparse.ArgumentTypeError(
+            f"{value} is not 'active', 'stored' or a comma separated list of "
+            "registry addresses."
+        )
+    return list(dict.fromkeys(to_checksum_address(address) for address in addresses))
+
+
 def add_ethpm_dir_arg_to_parser(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--ethpm-dir",
@@ -382,24 +430,86 @@ create_wizard_parser.set_defaults(func=create_wizard_cmd)
 
 
 def scrape_action(args: argparse.Namespace) -> None:
-    config = Config(args)
+    validate_scrape_cli_args(args)
+    Config(args)
     xdg_ethpmcli_root = get_xdg_ethpmcli_root()
-    chain_data_path = xdg_ethpmcli_root / IPFS_CHAIN_DATA
-    validate_chain_data_store(chain_data_path, config.w3)
+    chain_ids = args.chain_ids if args.chain_ids else [1]
+    chain_stores = []
+    for chain_id in chain_ids:
+        w3 = setup_w3(chain_id)
+        chain_data_path = get_chain_data_path(xdg_ethpmcli_root, chain_id)
+        validate_chain_data_store(chain_data_path, w3)
+        if args.registries in ("active", "stored"):
+            registry_addresses = get_chain_registry_addresses(
+                xdg_ethpmcli_root / REGISTRY_STORE,
+                chain_id,
+                active_only=args.registries == "active",
+            )
+        else:
+            registry_addresses = tuple(args.registries) if args.registries else None
+        chain_stores.append(ChainStore(w3, chain_data_path, registry_addresses))
     cli_logger.info("Loading IPFS scraper...")
     start_block = args.start_block if args.start_block else 0
-    last_scraped_block = scrape(config.w3, xdg_ethpmcli_root, start_block)
-    last_scraped_block_hash = config.w3.eth.getBlock(last_scraped_block)["hash"]
-    cli_logger.info(
-        "All blocks scraped up to # %d: %s.",
-        last_scraped_block,
-        humanize_hash(last_scraped_block_hash),
-    )
-    cli_logger.debug(
-        "All blocks scraped up to # %d: %s.",
-        last_scraped_block,
-        last_scraped_block_hash,
+    if args.workers:
+        w3, chain_data_path, registry_addresses = chain_stores[0]
+        last_scraped_block = coordinate_scrape(
+            chain_ids[0],
+            xdg_ethpmcli_root,
+            chain_data_path,
+            args.workers,
+            start_block,
+            registry_addresses,
+            confirmations=args.confirmations,
+            ipfs_jobs=args.ipfs_jobs,
+            bloom_filter=args.bloom_filter,
+            jobs=args.jobs,
+            min_batch_size=args.min_batch_size,
+            max_batch_size=args.max_batch_size,
+        )
+        cli_logger.info(
+            "All blocks scraped up to # %d: %s.",
+            last_scraped_block,
+            humanize_hash(w3.eth.getBlock(last_scraped_block)["hash"]),
+        )
+        return
+
+    budget = ScrapeBudget(args.max_duration, args.max_rpc_calls, args.max_bytes)
+    last_scraped_blocks = scrape_chains(
+        chain_stores,
+        xdg_ethpmcli_root,
+        start_block,
+        ipfs_jobs=args.ipfs_jobs,
+        follow=args.follow,
+        pin_local=args.pin_local,
+        bloom_filter=args.bloom_filter,
+        jobs=args.jobs,
+        min_batch_size=args.min_batch_size,
+        max_batch_size=args.max_batch_size,
+        confirmations=args.confirmations,
+        poll_interval=args.poll_interval,
+        status_path=args.status_file,
+        prometheus_path=args.prometheus_file,
+        metrics_interval=args.metrics_interval,
+        budget=budget,
     )
+    for (w3, _, _), last_scraped_block in zip(chain_stores, last_scraped_blocks):
+        last_scraped_block_hash = w3.eth.getBlock(last_scraped_block)["hash"]
+        cli_logger.info(
+            "All blocks scraped up to # %d: %s.",
+            last_scraped_block,
+            humanize_hash(last_scraped_block_hash),
+        )
+        cli_logger.debug(
+            "All blocks scraped up to # %d: %s.",
+            last_scraped_block,
+            last_scraped_block_hash,
+        )
+    if budget.exhausted is not None:
+        cli_logger.info(
+            "Scrape budget of %s used up, run `ethpm scrape` again to resume.",
+            budget.exhausted,
+        )
+        sys.exit(BUDGET_EXHAUSTED_EXIT_CODE)
 
 
 scrape_parser = ethpm_parser.add_parser(
@@ -421,10 +531,228 @@ scrape_parser.add_argument(
     type=int,
     help="Block number to begin scraping from (defaults to blocks from ~ March 14, 2019).",
 )
-add_chain_id_arg_to_parser(scrape_parser)
+scrape_parser.add_argument(
+    "--jobs",
+    dest="jobs",
+    action="store",
+    type=int,
+    default=1,
+    help="Number of block batches to fetch concurrently (defaults to 1).",
+)
+scrape_parser.add_argument(
+    "--workers",
+    dest="workers",
+    action="store",
+    type=int,
+    help="Number of worker processes to scrape block ranges leased through lock "
+    "files in the ethPM XDG directory. Other hosts sharing the directory can run "
+    "workers on the same chain at once.",
+)
+scrape_parser.add_argument(
+    "--min-batch-size",
+    dest="min_batch_size",
+    action="store",
+    type=int,
+    default=MIN_BATCH_SIZE,
+    help=f"Smallest block window to query for events (defaults to {MIN_BATCH_SIZE}).",
+)
+scrape_parser.add_argument(
+    "--max-batch-size",
+    dest="max_batch_size",
+    action="store",
+    type=int,
+    default=MAX_BATCH_SIZE,
+    help=f"Largest block window to query for events (defaults to {MAX_BATCH_SIZE}).",
+)
+scrape_parser.add_argument(
+    "--ipfs-jobs",
+    dest="ipfs_jobs",
+    action="store",
+    type=int,
+    default=DEFAULT_IPFS_JOBS,
+    help=f"Number of IPFS assets to download concurrently (defaults to {DEFAULT_IPFS_JOBS}).",
+)
+scrape_parser.add_argument(
+    "--confirmations",
+    dest="confirmations",
+    action="store",
+    type=int,
+    default=0,
+    help="Number of blocks behind the chain head to stop scraping at (defaults to 0).",
+)
+scrape_parser.add_argument(
+    "--follow",
+    dest="follow",
+    action="store_true",
+    help="Keep polling for new blocks and scrape them as they are confirmed.",
+)
+scrape_parser.add_argument(
+    "--poll-interval",
+    dest="poll_interval",
+    action="store",
+    type=float,
+    default=DEFAULT_POLL_INTERVAL,
+    help="Seconds between polls for new blocks in follow mode "
+    f"(defaults to {DEFAULT_POLL_INTERVAL:g}).",
+)
+scrape_parser.add_argument(
+    "--pin-local",
+    dest="pin_local",
+    action="store_true",
+    help="Add and pin every scraped IPFS asset to the IPFS daemon running on localhost.",
+)
+scrape_parser.add_argument(
+    "--bloom-filter",
+    dest="bloom_filter",
+    action="store_true",
+    help="Fetch block headers in JSON-RPC batch requests and only query logs for "
+    "blocks whose logsBloom may hold a VersionRelease event.",
+)
+scrape_parser.add_argument(
+    "--status-file",
+    dest="status_file",
+    action="store",
+    type=Path,
+    help="Path to periodically write the scraper's progress and metrics to as JSON.",
+)
+scrape_parser.add_argument(
+    "--prometheus-file",
+    dest="prometheus_file",
+    action="store",
+    type=Path,
+    help="Path to periodically write the scraper's metrics to in the Prometheus "
+    "text format, ex. for the node exporter's textfile collector.",
+)
+scrape_parser.add_argument(
+    "--metrics-interval",
+    dest="metrics_interval",
+    action="store",
+    type=float,
+    default=DEFAULT_METRICS_INTERVAL,
+    help="Seconds between writes of the status and Prometheus files "
+    f"(defaults to {DEFAULT_METRICS_INTERVAL:g}).",
+)
+scrape_parser.add_argument(
+    "--max-duration",
+    dest="max_duration",
+    action="store",
+    type=float,
+    help="Stop scraping once this many seconds have passed, saving progress and "
+    f"exiting with status {BUDGET_EXHAUSTED_EXIT_CODE} so a later run resumes.",
+)
+scrape_parser.add_argument(
+    "--max-rpc-calls",
+    dest="max_rpc_calls",
+    action="store",
+    type=int,
+    help="Stop scraping once this many JSON-RPC requests have been sent, saving "
+    f"progress and exiting with status {BUDGET_EXHAUSTED_EXIT_CODE}.",
+)
+scrape_parser.add_argument(
+    "--max-bytes",
+    dest="max_bytes",
+    action="store",
+    type=int,
+    help="Stop scraping once this many bytes of IPFS assets have been fetched, "
+    f"saving progress and exiting with status {BUDGET_EXHAUSTED_EXIT_CODE}.",
+)
+scrape_parser.add_argument(
+    "--chain-id",
+    dest="chain_ids",
+    action="store",
+    type=parse_chain_ids,
+    help="Comma separated chain IDs of the blockchains to scrape, ex. 1,3,4,5,42 "
+    "(defaults to 1).",
+)
+scrape_parser.add_argument(
+    "--registries",
+    dest="registries",
+    action="store",
+    type=parse_registries,
+    help="Only scrape releases from these registries: 'active' for the active "
+    "registry, 'stored' for every registry in the registry store, or a comma "
+    "separated list of registry addresses (defaults to every contract).",
+)
 scrape_parser.set_defaults(func=scrape_action)
 
 
+#
+# ethpm store
+#
+
+
+def store_pack_cmd(args: argparse.Namespace) -> None:
+    pack_asset_store(get_xdg_ethpmcli_root())
+
+
+def store_unpack_cmd(args: argparse.Namespace) -> None:
+    unpack_asset_store(get_xdg_ethpmcli_root())
+
+
+def store_verify_cmd(args: argparse.Namespace) -> None:
+    report = verify_asset_store(get_xdg_ethpmcli_root(), args.quarantine, args.jobs)
+    cli_logger.info(
+        "%d assets verified, %d skipped as unchanged since they last verified.",
+        report.checked,
+        report.skipped,
+    )
+    for ipfs_hash in report.mismatched:
+        cli_logger.info("Asset stored as %s does not match its IPFS hash.", ipfs_hash)
+    if report.mismatched and not args.quarantine:
+        raise ValidationError(
+            f"{len(report.mismatched)} stored assets do not match their IPFS hash. "
+            "Run `ethpm store verify --quarantine` to move them out of the store."
+        )
+    if report.mismatched:
+        cli_logger.info(
+            "%d mismatched assets moved to the quarantine directory, "
+            "and will be fetched again by the next scrape.",
+            len(report.mismatched),
+        )
+
+
+store_parser = ethpm_parser.add_parser(
+    "store", help="Manage the local store of scraped IPFS assets."
+)
+store_subparsers = store_parser.add_subparsers(dest="store")
+
+# ethpm store pack
+store_pack_parser = store_subparsers.add_parser(
+    "pack",
+    help="Move every scraped IPFS asset into a single append-only packfile, "
+    "which the scraper then writes new assets to.",
+)
+store_pack_parser.set_defaults(func=store_pack_cmd)
+
+# ethpm store unpack
+store_unpack_parser = store_subparsers.add_parser(
+    "unpack",
+    help="Move every asset in the packfile back to one file per IPFS asset.",
+)
+store_unpack_parser.set_defaults(func=store_unpack_cmd)
+
+# ethpm store verify
+store_verify_parser = store_subparsers.add_parser(
+    "verify",
+    help="Check that every stored asset hashes to its IPFS hash. Assets that "
+    "verified before and haven't changed since are skipped.",
+)
+store_verify_parser.add_argument(
+    "--quarantine",
+    dest="quarantine",
+    action="store_true",
+    help="Move assets that don't match their IPFS hash out of the store.",
+)
+store_verify_parser.add_argument(
+    "--jobs",
+    dest="jobs",
+    action="store",
+    type=int,
+    help="Number of processes to hash assets with (defaults to the number of CPUs).",
+)
+store_verify_parser.set_defaults(func=store_verify_cmd)
+
+
 #
 # ethpm install
 #
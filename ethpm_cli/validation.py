@@ -90,6 +90,73 @@ def validate_uninstall_cli_args(args: Namespace) -> None:
         validate_ethpm_dir(args.ethpm_dir)
 
 
+def validate_scrape_cli_args(args: Namespace) -> None:
+    if args.jobs < 1:
+        raise ValidationError(f"--jobs must be a positive integer, not {args.jobs}.")
+
+    if args.ipfs_jobs < 1:
+        raise ValidationError(
+            f"--ipfs-jobs must be a positive integer, not {args.ipfs_jobs}."
+        )
+
+    if args.confirmations < 0:
+        raise ValidationError(
+            f"--confirmations cannot be negative, not {args.confirmations}."
+        )
+
+    if args.poll_interval <= 0:
+        raise ValidationError(
+            f"--poll-interval must be a positive number, not {args.poll_interval}."
+        )
+
+    if args.metrics_interval <= 0:
+        raise ValidationError(
+            f"--metrics-interval must be a positive number, not {args.metrics_interval}."
+        )
+
+    for flag, limit in (
+        ("--max-duration", args.max_duration),
+        ("--max-rpc-calls", args.max_rpc_calls),
+        ("--max-bytes", args.max_bytes),
+    ):
+        if limit is not None and limit <= 0:
+            raise ValidationError(f"{flag} must be a positive number, not {limit}.")
+
+    if args.chain_ids and len(args.chain_ids) > 1 and args.start_block:
+        raise ValidationError(
+            "--start-block cannot be used when scraping more than one chain, "
+            "since block numbers differ between chains."
+        )
+
+    if args.workers is not None:
+        if args.workers < 1:
+            raise ValidationError(
+                f"--workers must be a positive integer, not {args.workers}."
+            )
+        single_process_args = (
+            args.follow,
+            args.pin_local,
+            args.status_file,
+            args.prometheus_file,
+            args.max_duration,
+            args.max_rpc_calls,
+            args.max_bytes,
+        )
+        if any(single_process_args):
+            raise ValidationError(
+                "--workers cannot be combined with --follow, --pin-local, "
+                "--status-file, --prometheus-file or scrape budgets."
+            )
+        if args.chain_ids and len(args.chain_ids) > 1:
+            raise ValidationError("--workers can only scrape one chain at a time.")
+
+    if args.min_batch_size < 1 or args.min_batch_size > args.max_batch_size:
+        raise ValidationError(
+            f"Invalid batch size bounds: --min-batch-size {args.min_batch_size} "
+            f"must be positive and no larger than --max-batch-size {args.max_batch_size}."
+        )
+
+
 def validate_etherscan_key_available() -> None:
     if ETHERSCAN_KEY_ENV_VAR not in os.environ:
         raise EtherscanKeyNotFound(
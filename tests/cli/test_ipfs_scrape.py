@@ -10,4 +10,4 @@ def test_ipfs_scrape(tmp_path):
     child.expect(ENTRY_DESCRIPTION)
     child.expect("\r\n")
     child.expect("Scraping from block 1.\r\n")
-    child.expect("Blocks 1-5001 scraped. 0 VersionRelease events found.\r\n")
+    child.expect("Blocks 1-5000 scraped. 0 VersionRelease events found.\r\n")
@@ -0,0 +1,81 @@
+import pytest
+
+from ethpm_cli._utils.asset_store import (
+    LooseAssetStore,
+    PackedAssetStore,
+    get_asset_store,
+    get_ipfs_asset_path,
+)
+
+OWNED_HASH = "QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW"
+WALLET_HASH = "QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1"
+ESCROW_HASH = "QmPDwMHk8e1aMEZg3iKsUiPSkhHkywpGB3KHKM52RtGrkv"
+
+
+def test_loose_asset_store(tmp_path):
+    with LooseAssetStore(tmp_path) as store:
+        store.write(OWNED_HASH, b"owned")
+        (tmp_path / "Qm" / "be" / "Vy" / f"{WALLET_HASH}.part").write_bytes(b"")
+        (tmp_path / "chain_data.json").write_text("{}")
+
+        assert OWNED_HASH in store
+        assert WALLET_HASH not in store
+        assert store.read(OWNED_HASH) == b"owned"
+        assert list(store) == [OWNED_HASH]
+    assert get_ipfs_asset_path(tmp_path, OWNED_HASH).read_bytes() == b"owned"
+
+
+def test_packed_asset_store(tmp_path):
+    with PackedAssetStore(tmp_path) as store:
+        store.write(OWNED_HASH, b"owned")
+        store.write(WALLET_HASH, b"wallet")
+        store.write(OWNED_HASH, b"owned")
+        assert store.read(WALLET_HASH) == b"wallet"
+
+    assert (tmp_path / "assets.pack").read_bytes() == b"ownedwallet"
+    with PackedAssetStore(tmp_path) as reopened_store:
+        assert sorted(reopened_store) == sorted([OWNED_HASH, WALLET_HASH])
+        assert reopened_store.read(OWNED_HASH) == b"owned"
+        assert reopened_store.read(WALLET_HASH) == b"wallet"
+
+
+def test_packed_asset_stores_share_a_pack(tmp_path):
+    PackedAssetStore(tmp_path).close()
+    with PackedAssetStore(tmp_path) as store, PackedAssetStore(tmp_path) as other_store:
+        store.write(OWNED_HASH, b"owned")
+        other_store.write(WALLET_HASH, b"wallet")
+        store.write(ESCROW_HASH, b"escrow")
+
+    assert (tmp_path / "assets.pack").read_bytes() == b"ownedwalletescrow"
+    with PackedAssetStore(tmp_path) as reopened_store:
+        assert reopened_store.read(OWNED_HASH) == b"owned"
+        assert reopened_store.read(WALLET_HASH) == b"wallet"
+        assert reopened_store.read(ESCROW_HASH) == b"escrow"
+
+
+def test_packed_asset_store_ignores_interrupted_writes(tmp_path):
+    with PackedAssetStore(tmp_path) as store:
+        store.write(OWNED_HASH, b"owned")
+    # the pack was appended to, but the index entry was torn
+    with (tmp_path / "assets.pack").open(mode="ab") as pack_file:
+        pack_file.write(b"wal")
+    with (tmp_path / "assets.pack.idx").open(mode="a") as index_file:
+        index_file.write(f"{WALLET_HASH} 5")
+
+    with PackedAssetStore(tmp_path) as store:
+        assert list(store) == [OWNED_HASH]
+        store.write(WALLET_HASH, b"wallet")
+    with PackedAssetStore(tmp_path) as store:
+        assert store.read(OWNED_HASH) == b"owned"
+        assert store.read(WALLET_HASH) == b"wallet"
+
+
+@pytest.mark.parametrize(
+    "packed,store_class", ((False, LooseAssetStore), (True, PackedAssetStore))
+)
+def test_get_asset_store(tmp_path, packed, store_class):
+    if packed:
+        PackedAssetStore(tmp_path).close()
+
+    with get_asset_store(tmp_path) as store:
+        assert isinstance(store, store_class)
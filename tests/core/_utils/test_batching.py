@@ -0,0 +1,65 @@
+import pytest
+
+from ethpm_cli._utils.batching import AdaptiveBatchSize, is_result_limit_error
+
+
+@pytest.fixture
+def batch_size():
+    return AdaptiveBatchSize(100, 10, 400, target_logs=100, target_latency=10)
+
+
+def test_batch_size_is_clamped_to_bounds():
+    assert AdaptiveBatchSize(5, 10, 400).size == 10
+    assert AdaptiveBatchSize(5000, 10, 400).size == 400
+
+
+@pytest.mark.parametrize(
+    "block_count,log_count,latency,expected",
+    (
+        # full, sparse and fast batch grows the window
+        (100, 0, 0.1, 200),
+        # a short batch says nothing about a larger window
+        (20, 0, 0.1, 100),
+        # too many logs or too slow shrinks the window
+        (100, 101, 0.1, 50),
+        (100, 0, 11, 50),
+        # within targets keeps the window
+        (100, 60, 0.1, 100),
+    ),
+)
+def test_batch_size_adapts_to_responses(
+    batch_size, block_count, log_count, latency, expected
+):
+    batch_size.record(block_count, log_count, latency)
+    assert batch_size.size == expected
+
+
+def test_batch_size_never_leaves_bounds(batch_size):
+    for _ in range(10):
+        batch_size.shrink()
+    assert batch_size.size == 10
+
+    for _ in range(10):
+        batch_size.record(batch_size.size, 0, 0)
+    assert batch_size.size == 400
+
+
+def test_batch_size_rejects_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveBatchSize(100, 0, 10)
+    with pytest.raises(ValueError):
+        AdaptiveBatchSize(100, 20, 10)
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    (
+        (ValueError({"code": -32005, "message": "limit"}), True),
+        (ValueError({"code": -32000, "message": "Query Timeout Exceeded"}), True),
+        (ValueError({"code": -32602, "message": "invalid argument"}), False),
+        (ValueError("query returned more than 10000 results"), True),
+        (ValueError("execution reverted"), False),
+    ),
+)
+def test_is_result_limit_error(error, expected):
+    assert is_result_limit_error(error) is expected
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ethpm_cli._utils.blocks import (
+    BlockTimestamps,
+    find_block_before_timestamp,
+    find_deployment_block,
+)
+
+CHAIN_LENGTH = 1_000_000
+
+
+@pytest.fixture
+def getblock_calls():
+    return []
+
+
+@pytest.fixture
+def fake_w3(getblock_calls):
+    # irregular block times: 10s for the first half of the chain, 20s after
+    def get_block(block_number):
+        getblock_calls.append(block_number)
+        if block_number < CHAIN_LENGTH // 2:
+            return {"timestamp": block_number * 10}
+        return {"timestamp": CHAIN_LENGTH * 5 + (block_number - CHAIN_LENGTH // 2) * 20}
+
+    return SimpleNamespace(eth=SimpleNamespace(chainId=1, getBlock=get_block))
+
+
+@pytest.mark.parametrize(
+    "target_timestamp,expected",
+    (
+        (0, 0),
+        (1, 0),
+        (4_999_991, 499_999),
+        (5_000_000, 499_999),
+        (5_000_001, 500_000),
+        (14_000_000, 949_999),
+        (100_000_000, CHAIN_LENGTH),
+    ),
+)
+def test_find_block_before_timestamp(
+    fake_w3, getblock_calls, tmp_path, target_timestamp, expected
+):
+    timestamps = BlockTimestamps(fake_w3, tmp_path / "timestamps.json")
+    actual = find_block_before_timestamp(timestamps, 0, CHAIN_LENGTH, target_timestamp)
+    assert actual == expected
+    # 2 * log2(1,000,000) + endpoints
+    assert len(getblock_calls) <= 42
+
+
+def test_block_timestamps_are_cached_on_disk(fake_w3, getblock_calls, tmp_path):
+    cache_path = tmp_path / "timestamps.json"
+    timestamps = BlockTimestamps(fake_w3, cache_path)
+    find_block_before_timestamp(timestamps, 0, CHAIN_LENGTH, 7_777_777)
+    timestamps.flush()
+    first_search_calls = len(getblock_calls)
+    assert cache_path.is_file()
+
+    reloaded = BlockTimestamps(fake_w3, cache_path)
+    assert find_block_before_timestamp(reloaded, 0, CHAIN_LENGTH, 7_777_777) == 638_888
+    assert len(getblock_calls) == first_search_calls
+
+
+@pytest.mark.parametrize("deployment_block", (0, 1, 123_456, CHAIN_LENGTH))
+def test_find_deployment_block(deployment_block):
+    getcode_calls = []
+
+    def get_code(address, block_number):
+        getcode_calls.append(block_number)
+        return b"\x01" if block_number >= deployment_block else b""
+
+    w3 = SimpleNamespace(eth=SimpleNamespace(getCode=get_code))
+    assert find_deployment_block(w3, "0xA", CHAIN_LENGTH) == deployment_block
+    # log2(1,000,000) + the lookup at latest_block
+    assert len(getcode_calls) <= 21
+
+
+def test_find_deployment_block_without_code():
+    w3 = SimpleNamespace(eth=SimpleNamespace(getCode=lambda address, block: b""))
+    assert find_deployment_block(w3, "0xA", CHAIN_LENGTH) is None
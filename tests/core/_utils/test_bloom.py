@@ -0,0 +1,39 @@
+from eth_bloom import BloomFilter
+from eth_utils import keccak
+import pytest
+
+from ethpm_cli._utils.bloom import bloom_may_contain, bloom_may_contain_log
+
+TOPIC = keccak(text="VersionRelease(string,string,string)")
+ADDRESS = b"\x12" * 20
+OTHER_ADDRESS = b"\xab" * 20
+
+
+def make_bloom(*values):
+    bloom = BloomFilter()
+    for value in values:
+        bloom.add(value)
+    return int(bloom).to_bytes(256, "big")
+
+
+def test_bloom_may_contain_matches_reference_bloom():
+    bloom = make_bloom(TOPIC, ADDRESS)
+
+    assert bloom_may_contain(bloom, TOPIC)
+    assert bloom_may_contain(bloom, ADDRESS)
+    assert not bloom_may_contain(bloom, OTHER_ADDRESS)
+    assert not bloom_may_contain(bytes(256), TOPIC)
+
+
+@pytest.mark.parametrize(
+    "values,addresses,expected",
+    (
+        ((TOPIC, ADDRESS), None, True),
+        ((TOPIC, ADDRESS), [OTHER_ADDRESS, ADDRESS], True),
+        ((TOPIC, ADDRESS), [OTHER_ADDRESS], False),
+        ((ADDRESS,), None, False),
+        ((), None, False),
+    ),
+)
+def test_bloom_may_contain_log(values, addresses, expected):
+    assert bloom_may_contain_log(make_bloom(*values), TOPIC, addresses) is expected
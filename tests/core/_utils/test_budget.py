@@ -0,0 +1,40 @@
+import pytest
+
+from ethpm_cli._utils.budget import ScrapeBudget
+from ethpm_cli._utils.metrics import ScrapeMetrics
+
+
+def test_unbounded_budget_is_never_exhausted():
+    budget = ScrapeBudget()
+    budget.watch(ScrapeMetrics(1))
+
+    assert not budget.is_exhausted()
+    assert budget.exhausted is None
+
+
+@pytest.mark.parametrize(
+    "limits,counter,exhausted",
+    (
+        ({"max_rpc_calls": 5}, "rpc_calls", "5 JSON-RPC requests"),
+        ({"max_bytes": 5}, "ipfs_bytes_fetched", "5 bytes of IPFS assets"),
+    ),
+)
+def test_budget_sums_counters_of_watched_metrics(limits, counter, exhausted):
+    budget = ScrapeBudget(**limits)
+    chain_metrics, download_metrics = ScrapeMetrics(1), ScrapeMetrics(None)
+    budget.watch(chain_metrics)
+    budget.watch(download_metrics)
+    budget.watch(chain_metrics)
+
+    chain_metrics.increment(counter, 3)
+    download_metrics.increment(counter, 1)
+    assert not budget.is_exhausted()
+
+    download_metrics.increment(counter, 1)
+    assert budget.is_exhausted()
+    assert budget.exhausted == exhausted
+
+
+def test_duration_budget():
+    assert ScrapeBudget(max_duration=0).is_exhausted()
+    assert not ScrapeBudget(max_duration=60).is_exhausted()
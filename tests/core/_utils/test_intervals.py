@@ -0,0 +1,79 @@
+import pytest
+
+from ethpm_cli._utils.intervals import BlockRanges
+
+
+@pytest.fixture
+def ranges():
+    return BlockRanges(((0, 6), (9, 10), (13, 14)))
+
+
+def test_block_ranges_round_trip_chain_data(ranges):
+    chain_data = [
+        {"min": "0", "max": "6"},
+        {"min": "9", "max": "10"},
+        {"min": "13", "max": "14"},
+    ]
+    assert BlockRanges.from_chain_data(chain_data) == ranges
+    assert ranges.to_chain_data() == chain_data
+
+
+@pytest.mark.parametrize(
+    "new_range,expected",
+    (
+        ((20, 30), ((0, 6), (9, 10), (13, 14), (20, 30))),
+        ((7, 8), ((0, 10), (13, 14))),
+        ((11, 11), ((0, 6), (9, 11), (13, 14))),
+        ((2, 3), ((0, 6), (9, 10), (13, 14))),
+        ((5, 13), ((0, 14),)),
+        ((0, 100), ((0, 100),)),
+    ),
+)
+def test_block_ranges_add_merges_ranges(ranges, new_range, expected):
+    ranges.add(*new_range)
+    assert list(ranges) == list(expected)
+
+
+@pytest.mark.parametrize(
+    "old_range,expected",
+    (
+        ((7, 8), ((0, 6), (9, 10), (13, 14))),
+        ((2, 3), ((0, 1), (4, 6), (9, 10), (13, 14))),
+        ((5, 13), ((0, 4), (14, 14))),
+        ((0, 100), ()),
+    ),
+)
+def test_block_ranges_remove_splits_ranges(ranges, old_range, expected):
+    ranges.remove(*old_range)
+    assert list(ranges) == list(expected)
+
+
+@pytest.mark.parametrize(
+    "start,end,expected",
+    (
+        (0, 6, []),
+        (1, 14, [(7, 8), (11, 12)]),
+        (10, 20, [(11, 12), (15, 20)]),
+        (7, 8, [(7, 8)]),
+    ),
+)
+def test_block_ranges_gaps(ranges, start, end, expected):
+    assert list(ranges.gaps(start, end)) == expected
+
+
+def test_block_ranges_membership(ranges):
+    assert 0 in ranges
+    assert 10 in ranges
+    assert 7 not in ranges
+    assert ranges.contains_range(1, 6)
+    assert not ranges.contains_range(5, 9)
+
+
+def test_block_ranges_union(ranges):
+    other = BlockRanges(((7, 8), (20, 21)))
+    assert list(ranges.union(other)) == [(0, 10), (13, 14), (20, 21)]
+
+
+def test_block_ranges_rejects_invalid_range():
+    with pytest.raises(ValueError):
+        BlockRanges().add(5, 4)
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from ethpm_cli._utils.asset_store import get_ipfs_asset_path
+from ethpm_cli._utils.ipfs import (
+    IPFSAssetDownloader,
+    LocalIPFSPinner,
+    connect_to_local_ipfs,
+)
+from ethpm_cli._utils.metrics import ScrapeMetrics
+from ethpm_cli._utils.unixfs import get_ipfs_file_hash
+
+
+@pytest.fixture
+def resolved_uris(monkeypatch, owned_pkg_data):
+    resolved = []
+
+    def resolve_uri_contents(uri):
+        resolved.append(uri)
+        return owned_pkg_data["raw_manifest"]
+
+    monkeypatch.setattr(
+        "ethpm_cli._utils.ipfs.resolve_uri_contents", resolve_uri_contents
+    )
+    return resolved
+
+
+def test_get_ipfs_asset_path(tmp_path):
+    actual = get_ipfs_asset_path(
+        tmp_path, "QmdvZEW3AaUntDfFkcbdnYzeLAAeD4YFeixQsdmHF88T6Q"
+    )
+    assert actual == (
+        tmp_path / "Qm" / "dv" / "ZE" / "QmdvZEW3AaUntDfFkcbdnYzeLAAeD4YFeixQsdmHF88T6Q"
+    )
+
+
+def test_downloader_fetches_each_asset_once(tmp_path, owned_pkg_data, resolved_uris):
+    uri = owned_pkg_data["ipfs_uri"]
+    with IPFSAssetDownloader(tmp_path, max_workers=4) as downloader:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(downloader.fetch, [uri] * 20))
+        downloader.fetch_all([uri, uri])
+
+    assert resolved_uris == [uri]
+    assert all(result == owned_pkg_data["raw_manifest"] for result in results)
+    asset_path = get_ipfs_asset_path(tmp_path, owned_pkg_data["content_hash"])
+    assert asset_path.read_bytes() == owned_pkg_data["raw_manifest"]
+    assert list(asset_path.parent.iterdir()) == [asset_path]
+
+
+def test_fetch_all_consumes_uris_with_bounded_pending_downloads(
+    tmp_path, monkeypatch
+):
+    unblocked = threading.Event()
+    pulled = []
+
+    def resolve_uri_contents(uri):
+        unblocked.wait(10)
+        return uri.encode()
+
+    def stream_uris():
+        for index in range(20):
+            pulled.append(index)
+            yield f"https://example.com/{index}"
+
+    monkeypatch.setattr(
+        "ethpm_cli._utils.ipfs.resolve_uri_contents", resolve_uri_contents
+    )
+    with IPFSAssetDownloader(tmp_path, max_workers=2) as downloader:
+        fetcher = threading.Thread(target=downloader.fetch_all, args=(stream_uris(), 4))
+        fetcher.start()
+        while len(pulled) < 5:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        # 4 downloads pending, and the 5th uri waiting for one of them to finish
+        assert len(pulled) == 5
+        unblocked.set()
+        fetcher.join()
+
+    assert len(pulled) == 20
+
+
+def test_downloader_reads_stored_assets_from_disk(
+    tmp_path, owned_pkg_data, resolved_uris
+):
+    asset_path = get_ipfs_asset_path(tmp_path, owned_pkg_data["content_hash"])
+    asset_path.parent.mkdir(parents=True)
+    asset_path.write_bytes(owned_pkg_data["raw_manifest"])
+
+    with IPFSAssetDownloader(tmp_path) as downloader:
+        assert downloader.fetch(owned_pkg_data["ipfs_uri"]) == (
+            owned_pkg_data["raw_manifest"]
+        )
+    assert resolved_uris == []
+
+
+def test_pinner_pins_each_hash_once_in_batches(local_ipfs_daemon):
+    assets = {
+        get_ipfs_file_hash(contents): contents
+        for contents in (f"asset {index}".encode() for index in range(25))
+    }
+    metrics = ScrapeMetrics(None)
+    with LocalIPFSPinner(
+        connect_to_local_ipfs(), max_workers=2, batch_size=10, metrics=metrics
+    ) as pinner:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(pinner.pin, list(assets) * 2, list(assets.values()) * 2))
+
+    pin_requests = local_ipfs_daemon.pin_requests
+    pinned = [ipfs_hash for batch in pin_requests for ipfs_hash in batch]
+    assert sorted(pinned) == sorted(assets)
+    # every asset's contents are added before it is pinned
+    assert sorted(local_ipfs_daemon.added) == sorted(assets)
+    assert all(len(batch) <= 10 for batch in pin_requests)
+    assert metrics.snapshot()["counters"]["ipfs_assets_pinned"] == 25
+
+
+def test_downloader_pins_stored_assets(
+    tmp_path, owned_pkg_data, resolved_uris, local_ipfs_daemon
+):
+    with LocalIPFSPinner(connect_to_local_ipfs()) as pinner:
+        with IPFSAssetDownloader(tmp_path, pinner=pinner) as downloader:
+            downloader.fetch(owned_pkg_data["ipfs_uri"])
+
+    assert local_ipfs_daemon.added == [owned_pkg_data["content_hash"]]
+    assert local_ipfs_daemon.pin_requests == [[owned_pkg_data["content_hash"]]]
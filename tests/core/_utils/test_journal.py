@@ -0,0 +1,24 @@
+from ethpm_cli._utils.journal import PendingAssetJournal
+
+OWNED_URI = "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW"
+
+
+def test_pending_asset_journal(tmp_path):
+    journal = PendingAssetJournal(tmp_path / "pending_assets.jsonl")
+    assert journal.pending() == ()
+
+    journal.record(10, 20, [OWNED_URI])
+    assert journal.pending() == ((10, 20, [OWNED_URI]),)
+
+    journal.complete()
+    assert journal.pending() == ()
+    assert not journal.path.exists()
+
+
+def test_pending_asset_journal_skips_torn_entries(tmp_path):
+    journal = PendingAssetJournal(tmp_path / "pending_assets.jsonl")
+    journal.record(10, 20, [OWNED_URI])
+    with journal.path.open(mode="a") as journal_file:
+        journal_file.write('{"from_block": 20, "to_bl')
+
+    assert journal.pending() == ((10, 20, [OWNED_URI]),)
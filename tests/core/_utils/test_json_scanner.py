@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from ethpm_cli._utils.json_scanner import JSONScanner
+
+DOCUMENT = {
+    "a": 'quote " and backslash \\ and bracket } {',
+    "b": {"nested": [1, {"x": "]"}, "\\\\"], "empty": {}},
+    "c": [],
+    "d": -1.5e3,
+    "e": None,
+    "f": True,
+    "g": "ipfs://Qmé\\\"",
+}
+
+
+@pytest.mark.parametrize("indent", (None, 4))
+def test_skip_value_lands_on_each_key(indent):
+    scanner = JSONScanner(json.dumps(DOCUMENT, indent=indent).encode())
+    keys = []
+    for key in scanner.iter_object():
+        keys.append(key)
+        scanner.skip_value()
+
+    assert keys == list(DOCUMENT)
+    assert scanner.pos == len(scanner.data)
+
+
+def test_iter_uri_values_only_decodes_uri_strings():
+    scanner = JSONScanner(json.dumps(DOCUMENT).encode())
+    assert list(scanner.iter_uri_values()) == [
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        DOCUMENT["g"],
+    ]
+
+
+def test_nested_objects_are_read_in_place():
+    scanner = JSONScanner(json.dumps(DOCUMENT).encode())
+    members = {}
+    for key in scanner.iter_object():
+        if key == "b":
+            for nested_key in scanner.iter_object():
+                members[nested_key] = scanner.pos
+                scanner.skip_value()
+        elif key == "a":
+            members[key] = scanner.read_string()
+        else:
+            scanner.skip_value()
+
+    assert list(members) == ["a", "nested", "empty"]
+    assert members["a"] == DOCUMENT["a"]
+
+
+@pytest.mark.parametrize(
+    "data", (b'{"a": "unterminated}', b'{"a": [1, 2}', b'{"a" 1}', b'{"a": }')
+)
+def test_invalid_json_raises(data):
+    scanner = JSONScanner(data)
+    with pytest.raises(ValueError):
+        for _ in scanner.iter_object():
+            scanner.skip_value()
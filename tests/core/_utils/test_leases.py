@@ -0,0 +1,87 @@
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from ethpm_cli._utils.leases import (
+    LeaseKeeper,
+    acquire_lease,
+    read_lease_record,
+    release_lease,
+    renew_lease,
+)
+
+
+@pytest.fixture
+def lease_path(tmp_path):
+    return tmp_path / "leases" / "blocks-0-99.lease"
+
+
+@pytest.fixture
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def write_lease(lease_path, host, pid, expires_at):
+    lease_path.parent.mkdir(parents=True, exist_ok=True)
+    lease_path.write_text(
+        json.dumps(
+            {"token": "other", "host": host, "pid": pid, "expires_at": expires_at}
+        )
+    )
+
+
+def test_lease_is_held_until_released(lease_path):
+    lease = acquire_lease(lease_path)
+
+    assert lease is not None
+    assert acquire_lease(lease_path) is None
+    assert read_lease_record(lease_path)["token"] == lease.token
+    assert [path.name for path in lease_path.parent.iterdir()] == [lease_path.name]
+
+    release_lease(lease)
+    assert not lease_path.exists()
+    assert acquire_lease(lease_path) is not None
+
+
+def test_expired_lease_is_reclaimed(lease_path):
+    write_lease(lease_path, "elsewhere", 1, time.time() - 1)
+
+    lease = acquire_lease(lease_path)
+    assert lease is not None
+    assert read_lease_record(lease_path)["token"] == lease.token
+
+
+def test_lease_of_dead_local_process_is_reclaimed(lease_path, dead_pid):
+    write_lease(lease_path, socket.gethostname(), dead_pid, time.time() + 60)
+    assert acquire_lease(lease_path) is not None
+
+
+def test_live_lease_on_another_host_is_not_reclaimed(lease_path, dead_pid):
+    write_lease(lease_path, "elsewhere", dead_pid, time.time() + 60)
+    assert acquire_lease(lease_path) is None
+
+
+def test_reclaimed_lease_is_neither_renewed_nor_released(lease_path):
+    lease = acquire_lease(lease_path, duration=0)
+    time.sleep(0.01)
+    new_lease = acquire_lease(lease_path)
+    assert new_lease is not None
+
+    assert renew_lease(lease) is None
+    release_lease(lease)
+    assert read_lease_record(lease_path)["token"] == new_lease.token
+
+
+def test_lease_keeper_renews_and_releases(lease_path):
+    lease = acquire_lease(lease_path, duration=0.3)
+    with LeaseKeeper(lease, duration=0.3):
+        time.sleep(0.5)
+        assert read_lease_record(lease_path)["expires_at"] > time.time()
+        assert acquire_lease(lease_path) is None
+    assert not lease_path.exists()
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from web3 import HTTPProvider, Web3
+
+from ethpm_cli._utils.metrics import (
+    LatencyHistogram,
+    MetricsExporter,
+    ScrapeMetrics,
+    write_prometheus_file,
+)
+from ethpm_cli._utils.rpc import make_batch_request
+
+
+@pytest.fixture
+def metrics():
+    chain_metrics = ScrapeMetrics(1)
+    chain_metrics.head_block = 1000
+    chain_metrics.add_blocks_remaining(1000)
+    chain_metrics.record_scraped_batch(250, 3)
+    chain_metrics.increment("rpc_calls", 2)
+    chain_metrics.observe("logs", 0.02)
+    chain_metrics.observe("logs", 0.3)
+    return chain_metrics
+
+
+def test_latency_histogram_buckets_are_cumulative():
+    histogram = LatencyHistogram()
+    for seconds in (0.001, 0.02, 0.02, 100):
+        histogram.observe(seconds)
+
+    buckets = dict(histogram.cumulative_buckets())
+    assert buckets["0.005"] == 1
+    assert buckets["0.025"] == 3
+    assert buckets["30"] == 3
+    assert buckets["+Inf"] == 4
+    assert histogram.count == 4
+
+
+def test_scrape_metrics_snapshot(metrics):
+    snapshot = metrics.snapshot()
+
+    assert snapshot["chain_id"] == 1
+    assert snapshot["blocks_remaining"] == 750
+    assert snapshot["counters"]["blocks_scraped"] == 250
+    assert snapshot["counters"]["logs_found"] == 3
+    assert snapshot["counters"]["rpc_calls"] == 2
+    assert snapshot["rates"]["blocks_per_second"] > 0
+    # 250 blocks were scraped in the time 750 more take
+    assert snapshot["eta_seconds"] == pytest.approx(
+        750 / snapshot["rates"]["blocks_per_second"]
+    )
+    assert snapshot["stages"]["logs"]["count"] == 2
+
+
+def test_eta_is_unknown_before_any_progress():
+    assert ScrapeMetrics(1).snapshot()["eta_seconds"] is None
+
+
+def test_write_prometheus_file(metrics, tmp_path):
+    prometheus_path = tmp_path / "ethpm_scraper.prom"
+    write_prometheus_file(prometheus_path, [ScrapeMetrics(None), metrics])
+    lines = prometheus_path.read_text().splitlines()
+
+    assert "# TYPE ethpm_scraper_blocks_scraped_total counter" in lines
+    assert 'ethpm_scraper_blocks_scraped_total{chain_id="1"} 250' in lines
+    assert "ethpm_scraper_blocks_scraped_total 0" in lines
+    assert 'ethpm_scraper_head_block{chain_id="1"} 1000' in lines
+    labels = 'chain_id="1",stage="logs"'
+    assert (
+        f'ethpm_scraper_stage_latency_seconds_bucket{{{labels},le="0.025"}} 1' in lines
+    )
+    assert f"ethpm_scraper_stage_latency_seconds_count{{{labels}}} 2" in lines
+
+
+def test_metrics_exporter_writes_on_exit(metrics, tmp_path):
+    status_path = tmp_path / "status.json"
+    with MetricsExporter([metrics], status_path=status_path, interval=60):
+        metrics.record_scraped_batch(250, 0)
+
+    status = json.loads(status_path.read_text())
+    assert [chain["counters"]["blocks_scraped"] for chain in status["chains"]] == [500]
+
+
+def test_count_rpc_calls_counts_each_call_in_a_batch(monkeypatch):
+    def post_batch_request(endpoint_uri, data, **kwargs):
+        responses = [
+            {"jsonrpc": "2.0", "id": call["id"], "result": "0x1"}
+            for call in json.loads(data)
+        ]
+        return json.dumps(responses).encode()
+
+    monkeypatch.setattr("ethpm_cli._utils.rpc.post_batch_request", post_batch_request)
+    w3 = Web3(HTTPProvider("http://batch.node"))
+    metrics = ScrapeMetrics(1)
+    calls = [("eth_getBlockByNumber", [hex(number), False]) for number in range(3)]
+    with metrics.count_rpc_calls(w3):
+        make_batch_request(w3, calls)
+    make_batch_request(w3, calls)
+
+    assert metrics.get_counter("rpc_calls") == 3
+    assert metrics.snapshot()["stages"]["rpc_batch"]["count"] == 1
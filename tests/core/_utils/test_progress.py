@@ -0,0 +1,112 @@
+import json
+import threading
+
+import pytest
+
+from ethpm_cli._utils.progress import (
+    append_progress_record,
+    compact_chain_data,
+    get_progress_log_path,
+    lock_chain_data,
+    read_chain_data,
+)
+from ethpm_cli.config import initialize_chain_data_store
+
+CHECKPOINT = {"block": "19", "hash": "0x" + "ab" * 32}
+
+
+@pytest.fixture
+def chain_data_path(tmp_path):
+    path = tmp_path / "chain_data.json"
+    initialize_chain_data_store(path, 1)
+    return path
+
+
+def test_progress_records_are_appended_without_rewriting_chain_data(chain_data_path):
+    snapshot = chain_data_path.read_text()
+    append_progress_record(chain_data_path, {"from_block": 1, "to_block": 10})
+    append_progress_record(
+        chain_data_path,
+        {"from_block": 10, "to_block": 20, "batch_size": 10, "checkpoint": CHECKPOINT},
+    )
+
+    assert chain_data_path.read_text() == snapshot
+    assert read_chain_data(chain_data_path) == {
+        "chain_id": 1,
+        "scraped_blocks": [{"min": "0", "max": "19"}],
+        "batch_size": 10,
+        "checkpoints": [CHECKPOINT],
+    }
+
+
+def test_rollback_record_drops_later_blocks(chain_data_path):
+    append_progress_record(
+        chain_data_path, {"from_block": 1, "to_block": 20, "checkpoint": CHECKPOINT}
+    )
+    append_progress_record(chain_data_path, {"rollback_from": 15})
+
+    chain_data = read_chain_data(chain_data_path)
+    assert chain_data["scraped_blocks"] == [{"min": "0", "max": "14"}]
+    assert chain_data.get("checkpoints", []) == []
+
+
+def test_torn_progress_record_is_skipped(chain_data_path):
+    append_progress_record(chain_data_path, {"from_block": 1, "to_block": 10})
+    with get_progress_log_path(chain_data_path).open(mode="a") as log_file:
+        log_file.write('{"from_block": 10, "to_bl')
+    append_progress_record(chain_data_path, {"from_block": 20, "to_block": 30})
+
+    assert read_chain_data(chain_data_path)["scraped_blocks"] == [
+        {"min": "0", "max": "9"},
+        {"min": "20", "max": "29"},
+    ]
+
+
+def test_progress_log_is_compacted_once_it_outgrows_its_limit(
+    chain_data_path, monkeypatch
+):
+    monkeypatch.setattr("ethpm_cli._utils.progress.PROGRESS_COMPACTION_SIZE", 50)
+    append_progress_record(chain_data_path, {"from_block": 1, "to_block": 10})
+    assert get_progress_log_path(chain_data_path).is_file()
+
+    append_progress_record(chain_data_path, {"from_block": 10, "to_block": 20})
+    assert not get_progress_log_path(chain_data_path).is_file()
+    chain_data = json.loads(chain_data_path.read_text())
+    assert chain_data["scraped_blocks"] == [{"min": "0", "max": "19"}]
+
+
+def test_replaying_compacted_records_is_harmless(chain_data_path):
+    append_progress_record(
+        chain_data_path, {"from_block": 1, "to_block": 20, "checkpoint": CHECKPOINT}
+    )
+    append_progress_record(chain_data_path, {"rollback_from": 15})
+    append_progress_record(chain_data_path, {"from_block": 15, "to_block": 17})
+    expected = read_chain_data(chain_data_path)
+    progress_log = get_progress_log_path(chain_data_path).read_text()
+
+    # a crash after the snapshot is rewritten, but before the log is dropped
+    compact_chain_data(chain_data_path)
+    get_progress_log_path(chain_data_path).write_text(progress_log)
+
+    assert read_chain_data(chain_data_path) == expected
+
+
+def test_chain_data_lock_is_reentrant_and_exclusive(chain_data_path):
+    events = []
+
+    def append_record():
+        append_progress_record(chain_data_path, {"from_block": 1, "to_block": 10})
+        events.append("appended")
+
+    with lock_chain_data(chain_data_path):
+        with lock_chain_data(chain_data_path):
+            writer = threading.Thread(target=append_record)
+            writer.start()
+            writer.join(0.1)
+            events.append("released")
+    writer.join()
+
+    assert events == ["released", "appended"]
+    assert read_chain_data(chain_data_path)["scraped_blocks"] == [
+        {"min": "0", "max": "9"}
+    ]
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from web3 import HTTPProvider, Web3, WebsocketProvider
+
+from ethpm_cli._utils.rpc import get_blocks, make_batch_request
+from ethpm_cli.config import setup_w3
+
+BLOCK_HASH = "0x" + "ab" * 32
+
+
+@pytest.fixture
+def posted_batches(monkeypatch):
+    posted = []
+
+    def post_batch_request(endpoint_uri, data, **kwargs):
+        batch = json.loads(data)
+        posted.append(batch)
+        if "no-batch" in endpoint_uri:
+            return json.dumps({"jsonrpc": "2.0", "error": {"code": -32600}}).encode()
+        responses = [
+            {"jsonrpc": "2.0", "id": call["id"], "result": respond(call)}
+            for call in batch
+        ]
+        return json.dumps(list(reversed(responses))).encode()
+
+    monkeypatch.setattr("ethpm_cli._utils.rpc.post_batch_request", post_batch_request)
+    return posted
+
+
+def respond(call):
+    block_number = int(call["params"][0], 16)
+    if block_number > 10:
+        return None
+    return {
+        "number": hex(block_number),
+        "hash": BLOCK_HASH,
+        "timestamp": "0x10",
+        "logsBloom": "0x" + "00" * 256,
+    }
+
+
+def test_make_batch_request_returns_results_in_order(posted_batches):
+    w3 = Web3(HTTPProvider("http://batch.node"))
+    calls = [("eth_getBlockByNumber", [hex(number), False]) for number in range(3)]
+    results = make_batch_request(w3, calls)
+
+    assert [result["number"] for result in results] == ["0x0", "0x1", "0x2"]
+    assert len(posted_batches) == 1
+
+
+def test_make_batch_request_falls_back_when_rejected(posted_batches):
+    w3 = Web3(HTTPProvider("http://no-batch.node"))
+    calls = [("eth_getBlockByNumber", ["0x1", False])]
+
+    assert make_batch_request(w3, calls) is None
+    assert make_batch_request(w3, calls) is None
+    # the endpoint is only sent a batch once
+    assert len(posted_batches) == 1
+
+
+def test_make_batch_request_requires_batch_provider(posted_batches, caplog):
+    w3 = Web3(Web3.EthereumTesterProvider())
+    assert make_batch_request(w3, [("eth_blockNumber", [])]) is None
+    assert make_batch_request(w3, [("eth_blockNumber", [])]) is None
+    assert posted_batches == []
+    assert caplog.text.count("can't send batch requests") == 1
+
+
+def test_make_batch_request_without_websocket_loop(monkeypatch, caplog):
+    w3 = Web3(WebsocketProvider("ws://no-loop.node"))
+    # an event loop web3 no longer keeps where it used to
+    monkeypatch.setattr(WebsocketProvider, "_loop", None)
+
+    assert make_batch_request(w3, [("eth_blockNumber", [])]) is None
+    assert "can't send batch requests" in caplog.text
+
+
+def test_make_batch_request_over_scraper_websocket(monkeypatch, posted_batches):
+    monkeypatch.setenv("WEB3_INFURA_PROJECT_ID", "4f1a358967c7474aae6f8f4a7698aefc")
+    monkeypatch.delenv("WEB3_INFURA_SCHEME", raising=False)
+    w3 = setup_w3(1)
+    sent = []
+
+    async def coro_make_request(request_data):
+        batch = json.loads(request_data)
+        sent.append(batch)
+        return [
+            {"jsonrpc": "2.0", "id": call["id"], "result": respond(call)}
+            for call in batch
+        ]
+
+    monkeypatch.setattr(w3.provider, "coro_make_request", coro_make_request)
+    blocks = get_blocks(w3, [1, 2])
+
+    assert isinstance(w3.provider, WebsocketProvider)
+    assert [block["number"] for block in blocks] == [1, 2]
+    assert len(sent) == 1
+    assert posted_batches == []
+
+
+def test_get_blocks(posted_batches):
+    w3 = Web3(HTTPProvider("http://batch.node"))
+    blocks = get_blocks(w3, [3, 11])
+
+    assert blocks[0]["number"] == 3
+    assert blocks[0]["timestamp"] == 16
+    assert blocks[0]["hash"].hex() == BLOCK_HASH
+    assert blocks[1] is None
+    assert len(posted_batches) == 1
@@ -0,0 +1,35 @@
+import pytest
+
+from ethpm_cli._utils.asset_store import iter_loose_asset_paths
+from ethpm_cli._utils.unixfs import (
+    CHUNK_SIZE,
+    UNIXFS_RAW_TYPE,
+    get_ipfs_file_hash,
+    is_ipfs_file_hash,
+)
+
+
+@pytest.mark.parametrize(
+    "contents,expected",
+    (
+        (b"", "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"),
+        (b"hello world\n", "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"),
+    ),
+)
+def test_get_ipfs_file_hash(contents, expected):
+    assert get_ipfs_file_hash(contents) == expected
+
+
+def test_get_ipfs_file_hash_of_stored_assets(test_assets_dir):
+    for asset_path in iter_loose_asset_paths(test_assets_dir.parent / "ipfs"):
+        assert get_ipfs_file_hash(asset_path.read_bytes()) == asset_path.name
+
+
+def test_is_ipfs_file_hash_accepts_either_leaf_type():
+    contents = b"\x01" * (CHUNK_SIZE + 1)
+    raw_leaf_hash = get_ipfs_file_hash(contents, UNIXFS_RAW_TYPE)
+
+    assert raw_leaf_hash != get_ipfs_file_hash(contents)
+    assert is_ipfs_file_hash(raw_leaf_hash, contents)
+    assert is_ipfs_file_hash(get_ipfs_file_hash(contents), contents)
+    assert not is_ipfs_file_hash(raw_leaf_hash, contents[:-1])
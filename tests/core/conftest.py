@@ -1,7 +1,13 @@
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
+import threading
+from urllib.parse import parse_qs
 
+from ethpm.backends.ipfs import LocalIPFSBackend
 import pytest
 
+from ethpm_cli._utils.unixfs import get_ipfs_file_hash
 from ethpm_cli.constants import ETHPM_PACKAGES_DIR
 
 
@@ -17,3 +23,75 @@ def owned_pkg_data(test_assets_dir):
         "registry_uri": "erc1319://0x1457890158DECD360e6d4d979edBcDD59c35feeB:1/owned?version=1.0.0",  # noqa: E501
         "registry_address": "0x1457890158DECD360e6d4d979edBcDD59c35feeB",
     }
+
+
+class StandInIPFSDaemon(BaseHTTPRequestHandler):
+    """
+    Answers the parts of the IPFS HTTP API used to add and pin assets, recording
+    the hash of every added file and the hashes of every pin request.
+    """
+
+    def do_POST(self):
+        path, _, query = self.path.partition("?")
+        if path == "/api/v0/version":
+            self.respond({"Version": "0.4.23"})
+        elif path == "/api/v0/add":
+            contents = self.read_file()
+            ipfs_hash = get_ipfs_file_hash(contents)
+            self.server.added.append(ipfs_hash)
+            self.respond({"Name": ipfs_hash, "Hash": ipfs_hash, "Size": len(contents)})
+        elif path == "/api/v0/pin/add":
+            ipfs_hashes = parse_qs(query)["arg"]
+            self.server.pin_requests.append(ipfs_hashes)
+            self.respond({"Pins": ipfs_hashes})
+        else:
+            self.send_error(404)
+
+    def read_file(self):
+        body = b"".join(self.read_chunks())
+        headers = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n"
+        form = BytesParser().parsebytes(headers.encode() + body)
+        return form.get_payload()[0].get_payload(decode=True)
+
+    def read_chunks(self):
+        # the client streams files with chunked transfer encoding
+        while True:
+            chunk_size = int(self.rfile.readline().strip(), 16)
+            chunk = self.rfile.read(chunk_size)
+            self.rfile.readline()
+            if not chunk_size:
+                return
+            yield chunk
+
+    def respond(self, body):
+        response = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_ipfs_daemon(monkeypatch):
+    """
+    Serves a stand-in IPFS daemon in place of the one LocalIPFSBackend connects
+    to, returning it with the hashes of the files added to it in `added`, and the
+    list of hashes sent in each pin request in `pin_requests`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInIPFSDaemon)
+    server.added = []
+    server.pin_requests = []
+    monkeypatch.setattr(
+        LocalIPFSBackend,
+        "base_uri",
+        f"/ip4/127.0.0.1/tcp/{server.server_address[1]}/http",
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -1,10 +1,11 @@
 from argparse import Namespace
+import json
 from pathlib import Path
 
 import pytest
 
 from ethpm_cli._utils.xdg import get_xdg_ethpmcli_root
-from ethpm_cli.config import Config
+from ethpm_cli.config import Config, get_chain_data_path
 from ethpm_cli.constants import (
     ETHPM_DIR_ENV_VAR,
     ETHPM_PACKAGES_DIR,
@@ -80,3 +81,16 @@ def test_config_initializes_xdg_dir(config):
     xdg_ethpm_dir = get_xdg_ethpmcli_root()
     assert (xdg_ethpm_dir / KEYFILE_PATH).is_file()
     assert (xdg_ethpm_dir / IPFS_CHAIN_DATA).is_file()
+
+
+def test_get_chain_data_path_keeps_a_store_per_chain(config):
+    xdg_ethpm_dir = get_xdg_ethpmcli_root()
+    assert get_chain_data_path(xdg_ethpm_dir, 1) == xdg_ethpm_dir / IPFS_CHAIN_DATA
+
+    ropsten_chain_data_path = get_chain_data_path(xdg_ethpm_dir, 3)
+    assert ropsten_chain_data_path == xdg_ethpm_dir / "chains" / "3" / IPFS_CHAIN_DATA
+    assert json.loads(ropsten_chain_data_path.read_text()) == {
+        "chain_id": 3,
+        "scraped_blocks": [{"min": "0", "max": "0"}],
+    }
+    assert get_chain_data_path(xdg_ethpm_dir, 3) == ropsten_chain_data_path
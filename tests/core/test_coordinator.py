@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+from web3 import Web3
+
+from ethpm_cli._utils.leases import acquire_lease, read_lease_record
+from ethpm_cli._utils.xdg import get_xdg_ethpmcli_root
+from ethpm_cli.commands.coordinator import (
+    coordinate_scrape,
+    get_block_lease_path,
+    get_worker_journal_path,
+    hold_worker_slot,
+    iter_lease_ranges,
+    scrape_worker,
+)
+from ethpm_cli.commands.scraper import get_scraped_ranges
+from ethpm_cli.constants import LEASES_DIR
+
+
+def setup_tester_w3(chain_id):
+    w3 = Web3(Web3.EthereumTesterProvider())
+    w3.testing.mine(40)
+    return w3
+
+
+@pytest.fixture
+def w3():
+    return setup_tester_w3(1)
+
+
+@pytest.fixture
+def chain_data_path():
+    return get_xdg_ethpmcli_root() / "chain_data.json"
+
+
+def test_iter_lease_ranges():
+    actual = iter_lease_ranges([(5, 12), (15, 18), (35, 41)], 10)
+    assert list(actual) == [(0, 9), (10, 19), (30, 39), (40, 49)]
+
+
+def test_workers_merge_scraped_ranges(w3, chain_data_path):
+    leased_ranges = []
+
+    def run_worker():
+        leased_ranges.append(
+            scrape_worker(
+                w3,
+                get_xdg_ethpmcli_root(),
+                chain_data_path,
+                1,
+                w3.eth.blockNumber,
+                lease_blocks=8,
+                poll_interval=0.01,
+                min_batch_size=4,
+                max_batch_size=4,
+            )
+        )
+
+    workers = [threading.Thread(target=run_worker) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert list(get_scraped_ranges(chain_data_path)) == [(0, w3.eth.blockNumber - 1)]
+    # every range is leased by a single worker, once
+    assert sum(leased_ranges) == len(range(0, w3.eth.blockNumber, 8))
+    leases_dir = chain_data_path.parent / LEASES_DIR
+    assert not list(leases_dir.glob("*.lease"))
+
+
+def test_expired_lease_of_dead_worker_is_reclaimed(w3, chain_data_path):
+    lease_path = get_block_lease_path(chain_data_path, 8, 15)
+    assert acquire_lease(lease_path, duration=0.2) is not None
+
+    scrape_worker(
+        w3,
+        get_xdg_ethpmcli_root(),
+        chain_data_path,
+        1,
+        w3.eth.blockNumber,
+        lease_blocks=8,
+        poll_interval=0.05,
+    )
+
+    assert list(get_scraped_ranges(chain_data_path)) == [(0, w3.eth.blockNumber - 1)]
+    assert read_lease_record(lease_path) is None
+
+
+def test_workers_take_the_lowest_free_slot(chain_data_path):
+    with hold_worker_slot(chain_data_path) as first_slot:
+        with hold_worker_slot(chain_data_path) as second_slot:
+            assert (first_slot, second_slot) == (0, 1)
+    with hold_worker_slot(chain_data_path) as slot:
+        assert slot == 0
+    journal_path = get_worker_journal_path(chain_data_path, 0)
+    assert journal_path.name == "worker-0.pending_assets.jsonl"
+
+
+def test_coordinate_scrape_with_worker_processes(chain_data_path):
+    end_block = coordinate_scrape(
+        1,
+        get_xdg_ethpmcli_root(),
+        chain_data_path,
+        workers=2,
+        w3_factory=setup_tester_w3,
+        lease_blocks=8,
+        poll_interval=0.01,
+    )
+
+    # each worker scrapes its own tester chain, mined to the same height
+    assert end_block == 40
+    assert list(get_scraped_ranges(chain_data_path)) == [(0, 39)]
+    leases_dir = chain_data_path.parent / LEASES_DIR
+    assert not list(leases_dir.glob("*.lease"))
@@ -6,10 +6,11 @@ from ethpm_cli.commands.registry import (
     activate_registry,
     add_registry,
     generate_registry_store_data,
+    get_chain_registry_addresses,
     remove_registry,
 )
 from ethpm_cli.constants import REGISTRY_STORE
-from ethpm_cli.exceptions import InstallError
+from ethpm_cli.exceptions import InstallError, ValidationError
 
 URI_1 = "erc1319://0x1230000000000000000000000000000000000000:1"
 URI_2 = "erc1319://0xabc0000000000000000000000000000000000000:1"
@@ -141,3 +142,39 @@ def test_unable_to_activate_nonexistent_aliased_registry(config):
     add_registry(URI_1, "mine", config)
     with pytest.raises(InstallError):
         activate_registry("other", config)
+
+
+@pytest.mark.parametrize(
+    "chain_id,active_only,expected",
+    (
+        (
+            1,
+            False,
+            (
+                "0x1230000000000000000000000000000000000000",
+                "0xabc0000000000000000000000000000000000000",
+            ),
+        ),
+        (1, True, ("0x1230000000000000000000000000000000000000",)),
+    ),
+)
+def test_get_chain_registry_addresses(
+    test_assets_dir, tmp_path, chain_id, active_only, expected
+):
+    store_path = tmp_path / REGISTRY_STORE
+    store_path.write_text(
+        (test_assets_dir / "registry_store" / "multiple.json").read_text()
+    )
+    actual = get_chain_registry_addresses(store_path, chain_id, active_only)
+    assert sorted(actual) == sorted(expected)
+
+
+def test_get_chain_registry_addresses_without_registries_on_chain(
+    test_assets_dir, tmp_path
+):
+    store_path = tmp_path / REGISTRY_STORE
+    store_path.write_text(
+        (test_assets_dir / "registry_store" / "multiple.json").read_text()
+    )
+    with pytest.raises(ValidationError, match="No registry on chain 3"):
+        get_chain_registry_addresses(store_path, 3)
@@ -0,0 +1,76 @@
+from eth_utils import to_bytes
+import pytest
+
+from ethpm_cli.commands.release_index import ReleaseIndex
+
+REGISTRY = "0x2F5b4d8F5BA6c2A2bb6B5E9dFc1D2A2d8Ea0A7C3"
+OTHER_REGISTRY = "0x8FF5a1F1BaA7B0E1bC0F8d5aD5F2FA0A33F16b9A"
+
+
+def version_release_log(registry, name, version, block_number, log_index=0):
+    return {
+        "address": registry,
+        "args": {
+            "packageName": name,
+            "version": version,
+            "manifestURI": f"ipfs://{name}-{version}",
+        },
+        "blockNumber": block_number,
+        "transactionHash": to_bytes(block_number).rjust(32, b"\0"),
+        "logIndex": log_index,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    with ReleaseIndex(tmp_path / "releases.db") as release_index:
+        release_index.add_releases(
+            1,
+            [
+                version_release_log(REGISTRY, "owned", "1.0.0", 10),
+                version_release_log(OTHER_REGISTRY, "owned", "1.0.0", 12),
+                version_release_log(REGISTRY, "wallet", "1.0.0", 12, 1),
+                version_release_log(REGISTRY, "owned", "1.0.1", 15),
+            ],
+        )
+        yield release_index
+
+
+def test_get_releases_by_package(index):
+    releases = index.get_releases(package_name="owned")
+    assert [(r.version, r.block_number) for r in releases] == [
+        ("1.0.0", 10),
+        ("1.0.0", 12),
+        ("1.0.1", 15),
+    ]
+
+
+def test_get_releases_by_registry(index):
+    releases = index.get_releases(registry_address=REGISTRY.lower())
+    assert [(r.package_name, r.version) for r in releases] == [
+        ("owned", "1.0.0"),
+        ("wallet", "1.0.0"),
+        ("owned", "1.0.1"),
+    ]
+    assert index.get_releases(package_name="owned", registry_address=OTHER_REGISTRY)
+    assert index.get_releases(chain_id=3) == ()
+
+
+def test_adding_releases_again_is_a_noop(index):
+    index.add_releases(1, [version_release_log(REGISTRY, "owned", "1.0.1", 15)])
+    assert len(index.get_releases()) == 4
+
+
+def test_remove_releases_from_block(index):
+    index.remove_releases_from_block(1, 12)
+    assert [(r.package_name, r.version) for r in index.get_releases()] == [
+        ("owned", "1.0.0")
+    ]
+
+
+def test_release_index_persists(tmp_path):
+    index_path = tmp_path / "releases.db"
+    with ReleaseIndex(index_path) as index:
+        index.add_releases(1, [version_release_log(REGISTRY, "owned", "1.0.0", 10)])
+    with ReleaseIndex(index_path) as index:
+        assert len(index.get_releases()) == 1
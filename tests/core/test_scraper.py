@@ -1,15 +1,40 @@
 from datetime import datetime, timedelta
 import json
+import os
+import signal
+import threading
 
+from eth_utils.toolz import dissoc
 from ethpm import Package
 import pytest
 from web3 import Web3
 from web3.tools.pytest_ethereum.deployer import Deployer
 
 from ethpm_cli import CLI_ASSETS_DIR
+from ethpm_cli._utils.asset_store import PackedAssetStore, get_ipfs_asset_path
+from ethpm_cli._utils.budget import BUDGET_EXHAUSTED_EXIT_CODE, ScrapeBudget
 from ethpm_cli._utils.filesystem import check_dir_trees_equal
+from ethpm_cli._utils.ipfs import IPFSAssetDownloader
+from ethpm_cli._utils.metrics import ScrapeMetrics
 from ethpm_cli._utils.xdg import get_xdg_ethpmcli_root
-from ethpm_cli.commands.scraper import get_ethpm_birth_block, scrape
+from ethpm_cli.commands.release_index import ReleaseIndex
+from ethpm_cli.commands.scraper import (
+    format_version_release_logs,
+    get_ethpm_birth_block,
+    get_scraped_ranges,
+    iter_manifest_ipfs_uris,
+    iter_manifest_uri_fields,
+    rollback_reorged_blocks,
+    scrape,
+    scrape_batch,
+    scrape_chains,
+    stop_on_signals,
+)
+from ethpm_cli.commands.store import pack_asset_store
+from ethpm_cli.config import initialize_chain_data_store
+from ethpm_cli.constants import PENDING_ASSETS, RELEASE_INDEX
+from ethpm_cli.exceptions import ValidationError
+from ethpm_cli.parser import parser
 
 
 @pytest.fixture
@@ -38,6 +63,13 @@ def release(log, w3, name, version, uri):
     w3.eth.waitForTransactionReceipt(tx_hash)
 
 
+def assert_scraped_to_disk(ethpmcli_dir, expected_dir):
+    assert check_dir_trees_equal(ethpmcli_dir / "Qm", expected_dir / "Qm")
+    actual_chain_data = json.loads((ethpmcli_dir / "chain_data.json").read_text())
+    expected_chain_data = json.loads((expected_dir / "chain_data.json").read_text())
+    assert dissoc(actual_chain_data, "checkpoints") == expected_chain_data
+
+
 def test_scraper_logs_scraped_block_ranges(log, w3):
     ethpmcli_dir = get_xdg_ethpmcli_root()
 
@@ -49,7 +81,7 @@ def test_scraper_logs_scraped_block_ranges(log, w3):
     scrape(w3, ethpmcli_dir, 1)
     expected_1 = {"chain_id": 1, "scraped_blocks": [{"min": "0", "max": "6"}]}
     actual_1 = json.loads((ethpmcli_dir / "chain_data.json").read_text())
-    assert actual_1 == expected_1
+    assert dissoc(actual_1, "checkpoints") == expected_1
 
     # Scrape from custom start block
     w3.testing.mine(4)
@@ -59,7 +91,7 @@ def test_scraper_logs_scraped_block_ranges(log, w3):
         "scraped_blocks": [{"min": "0", "max": "6"}, {"min": "9", "max": "10"}],
     }
     actual_2 = json.loads((ethpmcli_dir / "chain_data.json").read_text())
-    assert actual_2 == expected_2
+    assert dissoc(actual_2, "checkpoints") == expected_2
 
     # Complex scrape from custom start block
     w3.testing.mine(4)
@@ -73,7 +105,7 @@ def test_scraper_logs_scraped_block_ranges(log, w3):
     }
     scrape(w3, ethpmcli_dir, 13)
     actual_3 = json.loads((ethpmcli_dir / "chain_data.json").read_text())
-    assert actual_3 == expected_3
+    assert dissoc(actual_3, "checkpoints") == expected_3
 
     # Test ranges partially collapse
     scrape(w3, ethpmcli_dir, 10)
@@ -82,13 +114,13 @@ def test_scraper_logs_scraped_block_ranges(log, w3):
         "scraped_blocks": [{"min": "0", "max": "6"}, {"min": "9", "max": "14"}],
     }
     actual_4 = json.loads((ethpmcli_dir / "chain_data.json").read_text())
-    assert actual_4 == expected_4
+    assert dissoc(actual_4, "checkpoints") == expected_4
 
     # Test ranges fully collapse
     scrape(w3, ethpmcli_dir, 1)
     expected_5 = {"chain_id": 1, "scraped_blocks": [{"min": "0", "max": "14"}]}
     actual_5 = json.loads((ethpmcli_dir / "chain_data.json").read_text())
-    assert actual_5 == expected_5
+    assert dissoc(actual_5, "checkpoints") == expected_5
 
 
 def test_scraper_writes_to_disk(log, log_2, test_assets_dir, w3):
@@ -121,7 +153,43 @@ def test_scraper_writes_to_disk(log, log_2, test_assets_dir, w3):
     w3.testing.mine(3)
     ethpmcli_dir = get_xdg_ethpmcli_root()
     scrape(w3, ethpmcli_dir, 1)
-    assert check_dir_trees_equal(ethpmcli_dir, (test_assets_dir.parent / "ipfs"))
+    assert_scraped_to_disk(ethpmcli_dir, test_assets_dir.parent / "ipfs")
+
+    with ReleaseIndex(ethpmcli_dir / RELEASE_INDEX) as index:
+        releases = index.get_releases()
+        owned_releases = index.get_releases(package_name="owned")
+    assert [(r.package_name, r.registry_address) for r in releases] == [
+        ("owned", log.address),
+        ("owned-dupe", log_2.address),
+        ("wallet", log.address),
+    ]
+    assert len(owned_releases) == 1
+    assert owned_releases[0].manifest_uri == (
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW"
+    )
+
+
+def test_scraper_writes_to_packed_asset_store(log, test_assets_dir, w3):
+    release(
+        log,
+        w3,
+        "wallet",
+        "1.0.0",
+        "ipfs://QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1",
+    )
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    pack_asset_store(ethpmcli_dir)
+    scrape(w3, ethpmcli_dir, 1)
+
+    assert not (ethpmcli_dir / "Qm").exists()
+    with PackedAssetStore(ethpmcli_dir) as pack:
+        for ipfs_hash in pack:
+            expected_path = get_ipfs_asset_path(
+                test_assets_dir.parent / "ipfs", ipfs_hash
+            )
+            assert pack.read(ipfs_hash) == expected_path.read_bytes()
+        assert "QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW" in pack
 
 
 def test_scraper_imports_existing_ethpmcli_dir(log, log_2, test_assets_dir, w3):
@@ -156,7 +224,624 @@ def test_scraper_imports_existing_ethpmcli_dir(log, log_2, test_assets_dir, w3):
     w3.testing.mine(3)
     # Second scrape
     scrape(w3, ethpmcli_dir, 1)
-    assert check_dir_trees_equal(ethpmcli_dir, (test_assets_dir.parent / "ipfs"))
+    assert_scraped_to_disk(ethpmcli_dir, test_assets_dir.parent / "ipfs")
+
+
+@pytest.mark.parametrize("jobs", (1, 4))
+def test_scraper_with_jobs_commits_batches_in_order(
+    log, log_2, test_assets_dir, w3, jobs
+):
+    release(
+        log,
+        w3,
+        "owned",
+        "1.0.0",
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+    )
+    w3.testing.mine(3)
+    release(
+        log_2,
+        w3,
+        "owned-dupe",
+        "1.0.0",
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+    )
+    w3.testing.mine(3)
+    release(
+        log,
+        w3,
+        "wallet",
+        "1.0.0",
+        "ipfs://QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1",
+    )
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    latest_block = scrape(
+        w3, ethpmcli_dir, 1, jobs=jobs, min_batch_size=2, max_batch_size=2
+    )
+
+    chain_data = json.loads((ethpmcli_dir / "chain_data.json").read_text())
+    assert chain_data["scraped_blocks"] == [
+        {"min": "0", "max": str(latest_block - 1)}
+    ]
+    assert chain_data["batch_size"] == 2
+    assert check_dir_trees_equal(
+        ethpmcli_dir / "Qm", test_assets_dir.parent / "ipfs" / "Qm"
+    )
+
+
+def test_scraper_follow_mode_scrapes_confirmed_blocks(log, test_assets_dir, w3):
+    polls = []
+
+    # a signal sets stop while the scraper waits for new blocks
+    class PolledStop(threading.Event):
+        def wait(self, timeout=None):
+            polls.append(timeout)
+            if len(polls) == 1:
+                release(
+                    log,
+                    w3,
+                    "owned",
+                    "1.0.0",
+                    "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+                )
+                w3.testing.mine(5)
+            else:
+                self.set()
+            return self.is_set()
+
+    w3.testing.mine(5)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    last_scraped_block = scrape(
+        w3,
+        ethpmcli_dir,
+        1,
+        confirmations=2,
+        follow=True,
+        poll_interval=0.5,
+        stop=PolledStop(),
+    )
+
+    assert polls == [0.5, 0.5]
+    assert last_scraped_block == w3.eth.blockNumber - 2
+    chain_data = json.loads((ethpmcli_dir / "chain_data.json").read_text())
+    assert chain_data["scraped_blocks"] == [
+        {"min": "0", "max": str(last_scraped_block - 1)}
+    ]
+    owned_manifest = "Qm/be/Vy/QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW"
+    assert (ethpmcli_dir / owned_manifest).read_bytes() == (
+        test_assets_dir.parent / "ipfs" / owned_manifest
+    ).read_bytes()
+
+
+def test_scraper_replays_assets_of_an_interrupted_batch(log, w3, monkeypatch):
+    release(
+        log,
+        w3,
+        "owned",
+        "1.0.0",
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+    )
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+
+    def crash(manifest_uris, downloader):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patched:
+        patched.setattr(
+            "ethpm_cli.commands.scraper.write_manifest_assets_to_disk", crash
+        )
+        with pytest.raises(KeyboardInterrupt):
+            scrape(w3, ethpmcli_dir, 1)
+
+    owned_manifest = get_ipfs_asset_path(
+        ethpmcli_dir, "QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW"
+    )
+    assert not owned_manifest.is_file()
+    assert (ethpmcli_dir / PENDING_ASSETS).is_file()
+
+    scrape(w3, ethpmcli_dir, 1)
+    assert owned_manifest.is_file()
+    assert not (ethpmcli_dir / PENDING_ASSETS).exists()
+
+
+def test_stopped_scraper_returns_first_unscraped_block(w3):
+    w3.testing.mine(6)
+    stop = threading.Event()
+    stop.set()
+
+    assert scrape(w3, get_xdg_ethpmcli_root(), 1, stop=stop) == 1
+
+
+def test_scraper_stops_on_exhausted_budget_and_resumes(w3, monkeypatch):
+    w3.testing.mine(6)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    metrics = ScrapeMetrics(1)
+    budget = ScrapeBudget(max_rpc_calls=1)
+
+    def scrape_batch_with_one_rpc_call(context, from_block, to_block):
+        metrics.increment("rpc_calls")
+        return scrape_batch(context, from_block, to_block)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(
+            "ethpm_cli.commands.scraper.scrape_batch", scrape_batch_with_one_rpc_call
+        )
+        next_block = scrape(
+            w3,
+            ethpmcli_dir,
+            1,
+            min_batch_size=2,
+            max_batch_size=2,
+            budget=budget,
+            metrics=metrics,
+        )
+
+    assert next_block == 3
+    assert budget.exhausted == "1 JSON-RPC requests"
+    assert list(get_scraped_ranges(ethpmcli_dir / "chain_data.json")) == [(0, 2)]
+
+    assert scrape(w3, ethpmcli_dir, 1) == w3.eth.blockNumber
+    assert list(get_scraped_ranges(ethpmcli_dir / "chain_data.json")) == [
+        (0, w3.eth.blockNumber - 1)
+    ]
+
+
+def test_scrape_exits_once_batched_calls_exhaust_budget(w3, monkeypatch):
+    def chain_id_middleware(make_request, w3):
+        def middleware(method, params):
+            if method == "eth_chainId":
+                return {"result": 1}
+            return make_request(method, params)
+
+        return middleware
+
+    # eth-tester doesn't take batch requests, so they are answered from its chain
+    # without going through w3, whose single requests are counted
+    def send_raw_batch(provider, request_data):
+        responses = []
+        for call in json.loads(request_data):
+            block = w3.provider.ethereum_tester.get_block_by_number(
+                int(call["params"][0], 16)
+            )
+            header = {
+                "number": hex(block["number"]),
+                "hash": block["hash"],
+                "timestamp": hex(block["timestamp"]),
+                "logsBloom": "0x" + block["logs_bloom"].to_bytes(256, "big").hex(),
+            }
+            responses.append({"jsonrpc": "2.0", "id": call["id"], "result": header})
+        return responses
+
+    w3.middleware_onion.add(chain_id_middleware)
+    w3.testing.mine(300)
+    monkeypatch.setattr("ethpm_cli.parser.setup_w3", lambda chain_id: w3)
+    monkeypatch.setattr("ethpm_cli._utils.rpc.supports_batch_requests", lambda w3: True)
+    monkeypatch.setattr(
+        "ethpm_cli.commands.scraper.supports_batch_requests", lambda w3: True
+    )
+    monkeypatch.setattr("ethpm_cli._utils.rpc.send_raw_batch", send_raw_batch)
+    args = parser.parse_args(
+        [
+            "scrape",
+            "--start-block",
+            "1",
+            "--bloom-filter",
+            "--min-batch-size",
+            "100",
+            "--max-batch-size",
+            "100",
+            "--max-rpc-calls",
+            "100",
+        ]
+    )
+
+    # no block has a log, so the 100 headers of the first batch are its only calls
+    # beyond the few single requests of the scrape
+    with pytest.raises(SystemExit) as exit_info:
+        args.func(args)
+
+    assert exit_info.value.code == BUDGET_EXHAUSTED_EXIT_CODE
+    scraped_ranges = get_scraped_ranges(get_xdg_ethpmcli_root() / "chain_data.json")
+    assert list(scraped_ranges) == [(0, 100)]
+
+
+def test_stop_on_signals():
+    stop = threading.Event()
+    with stop_on_signals(stop):
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert stop.is_set()
+        with pytest.raises(KeyboardInterrupt):
+            os.kill(os.getpid(), signal.SIGINT)
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+def test_scrape_chains_shares_one_asset_store(log, test_assets_dir, w3):
+    release(
+        log,
+        w3,
+        "owned",
+        "1.0.0",
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+    )
+    w3.testing.mine(3)
+    other_w3 = Web3(Web3.EthereumTesterProvider())
+    other_w3.testing.mine(8)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    other_chain_data_path = ethpmcli_dir / "chains" / "3" / "chain_data.json"
+    other_chain_data_path.parent.mkdir(parents=True)
+    initialize_chain_data_store(other_chain_data_path, 3)
+
+    last_scraped_blocks = scrape_chains(
+        [
+            (w3, ethpmcli_dir / "chain_data.json"),
+            (other_w3, other_chain_data_path),
+        ],
+        ethpmcli_dir,
+        1,
+    )
+
+    assert last_scraped_blocks == [w3.eth.blockNumber, other_w3.eth.blockNumber]
+    for chain_data_path, last_scraped_block in zip(
+        (ethpmcli_dir / "chain_data.json", other_chain_data_path), last_scraped_blocks
+    ):
+        chain_data = json.loads(chain_data_path.read_text())
+        assert chain_data["scraped_blocks"] == [
+            {"min": "0", "max": str(last_scraped_block - 1)}
+        ]
+    owned_manifest = "Qm/be/Vy/QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW"
+    assert (ethpmcli_dir / owned_manifest).is_file()
+    assert not (other_chain_data_path.parent / "Qm").exists()
+
+
+def test_scrape_chains_pins_assets_to_local_ipfs(log, w3, local_ipfs_daemon):
+    release(
+        log,
+        w3,
+        "wallet",
+        "1.0.0",
+        "ipfs://QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1",
+    )
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape_chains(
+        [(w3, ethpmcli_dir / "chain_data.json")], ethpmcli_dir, 1, pin_local=True
+    )
+
+    pinned = {
+        ipfs_hash for batch in local_ipfs_daemon.pin_requests for ipfs_hash in batch
+    }
+    stored = {
+        path.name for path in (ethpmcli_dir / "Qm").glob("**/*") if path.is_file()
+    }
+    assert pinned == stored
+    assert set(local_ipfs_daemon.added) == stored
+    assert "QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW" in pinned
+
+
+def test_scrape_chains_exports_metrics(log, w3, tmp_path):
+    release(
+        log,
+        w3,
+        "owned",
+        "1.0.0",
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+    )
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    status_path = tmp_path / "status.json"
+    prometheus_path = tmp_path / "ethpm_scraper.prom"
+    (last_scraped_block,) = scrape_chains(
+        [(w3, ethpmcli_dir / "chain_data.json")],
+        ethpmcli_dir,
+        1,
+        status_path=status_path,
+        prometheus_path=prometheus_path,
+    )
+
+    downloads, chain = json.loads(status_path.read_text())["chains"]
+    stored_assets = [
+        path for path in (ethpmcli_dir / "Qm").glob("**/*") if path.is_file()
+    ]
+    assert downloads["counters"]["ipfs_assets_fetched"] == len(stored_assets)
+    assert downloads["counters"]["ipfs_bytes_fetched"] > 0
+    assert chain["head_block"] == last_scraped_block
+    assert chain["blocks_remaining"] == 0
+    assert chain["counters"]["blocks_scraped"] == last_scraped_block - 1
+    assert chain["counters"]["logs_found"] == 1
+    assert chain["counters"]["rpc_calls"] > 0
+    assert set(chain["stages"]) >= {"checkpoint", "logs", "chain_data", "ipfs"}
+    assert 'ethpm_scraper_logs_found_total{chain_id="1"} 1' in (
+        prometheus_path.read_text().splitlines()
+    )
+
+
+def test_scraper_checkpoints_are_canonical(w3):
+    w3.testing.mine(6)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape(w3, ethpmcli_dir, 1, min_batch_size=2, max_batch_size=2)
+
+    chain_data = json.loads((ethpmcli_dir / "chain_data.json").read_text())
+    assert [cp["block"] for cp in chain_data["checkpoints"]] == ["2", "4", "5"]
+    for checkpoint in chain_data["checkpoints"]:
+        block = w3.eth.getBlock(int(checkpoint["block"]))
+        assert block.hash.hex() == checkpoint["hash"]
+    assert rollback_reorged_blocks(w3, ethpmcli_dir / "chain_data.json") is None
+
+
+def test_scraper_rescrapes_reorged_blocks(w3):
+    w3.testing.mine(3)
+    snapshot = w3.testing.snapshot()
+    w3.testing.mine(4)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    chain_data_path = ethpmcli_dir / "chain_data.json"
+    scrape(w3, ethpmcli_dir, 1, min_batch_size=2, max_batch_size=2)
+
+    # replace blocks 4+ with a fork
+    w3.testing.revert(snapshot)
+    fork_time = w3.eth.getBlock("latest").timestamp + 1000
+    w3.provider.ethereum_tester.time_travel(fork_time)
+    w3.testing.mine(5)
+
+    assert rollback_reorged_blocks(w3, chain_data_path) == 3
+    chain_data = json.loads(chain_data_path.read_text())
+    assert chain_data["scraped_blocks"] == [{"min": "0", "max": "2"}]
+    assert [cp["block"] for cp in chain_data["checkpoints"]] == ["2"]
+
+    latest_block = scrape(w3, ethpmcli_dir, 1, min_batch_size=2, max_batch_size=2)
+    chain_data = json.loads(chain_data_path.read_text())
+    assert chain_data["scraped_blocks"] == [
+        {"min": "0", "max": str(latest_block - 1)}
+    ]
+    assert rollback_reorged_blocks(w3, chain_data_path) is None
+
+
+def test_scraper_mirrors_every_release_from_a_registry_in_a_batch(log, w3):
+    # wallet pulls in owned as a dependency, but not the other way around
+    release(
+        log,
+        w3,
+        "wallet",
+        "1.0.0",
+        "ipfs://QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1",
+    )
+    release(
+        log,
+        w3,
+        "owned",
+        "1.0.0",
+        "ipfs://QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+    )
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape(w3, ethpmcli_dir, 1)
+
+    for ipfs_hash in (
+        "QmbeVyFLSuEUxiXKwSsEjef6icpdTdA4kGG9BcrJXKNKUW",
+        "QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1",
+    ):
+        assert get_ipfs_asset_path(ethpmcli_dir, ipfs_hash).is_file()
+
+
+def test_scraper_only_scrapes_given_registries(log, log_2, w3):
+    release(log, w3, "owned", "1.0.0", "https://owned.com")
+    release(log_2, w3, "wallet", "1.0.0", "https://wallet.com")
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape(w3, ethpmcli_dir, 1, registry_addresses=[log_2.address])
+
+    with ReleaseIndex(ethpmcli_dir / RELEASE_INDEX) as index:
+        releases = index.get_releases()
+    assert [(r.package_name, r.registry_address) for r in releases] == [
+        ("wallet", log_2.address)
+    ]
+
+
+def test_scraper_starts_from_registry_deployment_block(log_deployer, w3):
+    w3.testing.mine(5)
+    log = log_deployer.deploy("Log").deployments.get_instance("Log")
+    deployment_block = w3.eth.blockNumber
+    release(log, w3, "owned", "1.0.0", "https://owned.com")
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape(w3, ethpmcli_dir, registry_addresses=[log.address])
+
+    chain_data = json.loads((ethpmcli_dir / "chain_data.json").read_text())
+    assert chain_data["deployment_blocks"] == {log.address: str(deployment_block)}
+    assert chain_data["registry_addresses"] == [log.address]
+    # blocks before the registry was deployed are never queried
+    assert chain_data["scraped_blocks"] == [
+        {"min": "0", "max": "0"},
+        {"min": str(deployment_block), "max": str(w3.eth.blockNumber - 1)},
+    ]
+    with ReleaseIndex(ethpmcli_dir / RELEASE_INDEX) as index:
+        assert [r.package_name for r in index.get_releases()] == ["owned"]
+
+
+def test_scraper_refuses_to_change_scraped_registries(log, log_2, w3):
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape(w3, ethpmcli_dir, 1, registry_addresses=[log.address, log_2.address])
+    w3.testing.mine(3)
+    scrape(w3, ethpmcli_dir, 1, registry_addresses=[log_2.address, log.address])
+
+    with pytest.raises(ValidationError, match="scraped for the registries"):
+        scrape(w3, ethpmcli_dir, 1, registry_addresses=[log.address])
+    with pytest.raises(ValidationError, match="scraped for the registries"):
+        scrape(w3, ethpmcli_dir, 1)
+
+
+def test_scraper_refuses_to_narrow_a_full_scrape(log, w3):
+    w3.testing.mine(3)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    scrape(w3, ethpmcli_dir, 1)
+
+    with pytest.raises(ValidationError, match="scraped for every registry"):
+        scrape(w3, ethpmcli_dir, 1, registry_addresses=[log.address])
+
+
+def test_scraper_only_queries_logs_of_blocks_matching_bloom(
+    log, w3, monkeypatch
+):
+    # eth-tester reports blooms as integers under a non-standard key
+    def get_blocks(w3, block_numbers):
+        return [
+            {
+                "hash": w3.eth.getBlock(number)["hash"],
+                "logsBloom": w3.eth.getBlock(number)["logs_bloom"].to_bytes(256, "big"),
+            }
+            for number in block_numbers
+        ]
+
+    monkeypatch.setattr(
+        "ethpm_cli.commands.scraper.supports_batch_requests", lambda w3: True
+    )
+    monkeypatch.setattr("ethpm_cli.commands.scraper.get_blocks", get_blocks)
+    w3.testing.mine(5)
+    release(log, w3, "owned", "1.0.0", "https://owned.com")
+    release_block = w3.eth.blockNumber
+    w3.testing.mine(5)
+    log_queries = []
+    get_logs = w3.eth.getLogs
+
+    def spy_get_logs(filter_params):
+        log_queries.append((filter_params["fromBlock"], filter_params["toBlock"]))
+        return get_logs(filter_params)
+
+    monkeypatch.setattr(w3.eth, "getLogs", spy_get_logs)
+    ethpmcli_dir = get_xdg_ethpmcli_root()
+    metrics = ScrapeMetrics(1)
+    scrape(w3, ethpmcli_dir, 1, bloom_filter=True, metrics=metrics)
+
+    assert log_queries == [(release_block, release_block)]
+    assert metrics.snapshot()["counters"]["bloom_skipped_blocks"] == (
+        w3.eth.blockNumber - 2
+    )
+    with ReleaseIndex(ethpmcli_dir / RELEASE_INDEX) as index:
+        assert [r.package_name for r in index.get_releases()] == ["owned"]
+
+
+@pytest.mark.parametrize(
+    "false_positives,expected_queries",
+    (
+        # matches 2 blocks apart are queried together
+        ((5, 7, 20, 30), [(5, 7), (20, 20), (30, 30)]),
+        # too many separate runs are queried as the whole window
+        ((5, 10, 20, 30, 35), [(1, 39)]),
+    ),
+)
+def test_scraper_merges_scattered_bloom_matches(
+    w3, monkeypatch, false_positives, expected_queries
+):
+    def get_blocks(w3, block_numbers):
+        return [
+            {
+                "hash": w3.eth.getBlock(number)["hash"],
+                "logsBloom": b"\xff" * 256
+                if number in false_positives
+                else b"\x00" * 256,
+            }
+            for number in block_numbers
+        ]
+
+    monkeypatch.setattr(
+        "ethpm_cli.commands.scraper.supports_batch_requests", lambda w3: True
+    )
+    monkeypatch.setattr("ethpm_cli.commands.scraper.get_blocks", get_blocks)
+    monkeypatch.setattr("ethpm_cli.commands.scraper.BLOOM_GAP_BLOCKS", 2)
+    monkeypatch.setattr("ethpm_cli.commands.scraper.MAX_BLOOM_RUNS", 3)
+    w3.testing.mine(40)
+    log_queries = []
+    get_logs = w3.eth.getLogs
+
+    def spy_get_logs(filter_params):
+        log_queries.append((filter_params["fromBlock"], filter_params["toBlock"]))
+        return get_logs(filter_params)
+
+    monkeypatch.setattr(w3.eth, "getLogs", spy_get_logs)
+    scrape(w3, get_xdg_ethpmcli_root(), 1, bloom_filter=True, min_batch_size=40)
+
+    assert log_queries == expected_queries
+
+
+def test_format_version_release_logs_keeps_every_release():
+    def entry(address, name):
+        return {
+            "address": address,
+            "args": {"packageName": name, "version": "1.0.0", "manifestURI": name},
+        }
+
+    entries = [entry("0xA", "owned"), entry("0xB", "safe-math"), entry("0xA", "wallet")]
+    assert format_version_release_logs(entries) == {
+        "0xA": [
+            {"packageName": "owned", "version": "1.0.0", "manifestURI": "owned"},
+            {"packageName": "wallet", "version": "1.0.0", "manifestURI": "wallet"},
+        ],
+        "0xB": [
+            {"packageName": "safe-math", "version": "1.0.0", "manifestURI": "safe-math"}
+        ],
+    }
+
+
+def test_iter_manifest_ipfs_uris_reads_each_manifest_once(
+    tmp_path, monkeypatch
+):
+    manifests = {
+        "ipfs://QmAaaaaaaa": {
+            "sources": {"A.sol": "ipfs://QmAsrcsrcsrc"},
+            "build_dependencies": {"b": "ipfs://QmBbbbbbbb", "c": "ipfs://QmCccccccc"},
+        },
+        # shared dependency with a cycle back to the root
+        "ipfs://QmBbbbbbbb": {
+            "build_dependencies": {"a": "ipfs://QmAaaaaaaa", "c": "ipfs://QmCccccccc"}
+        },
+        "ipfs://QmCccccccc": {"meta": {"links": {"docs": "ipfs://QmCdocdocdoc"}}},
+    }
+    resolved = []
+
+    def resolve_uri_contents(uri):
+        resolved.append(uri)
+        return json.dumps(manifests[uri]).encode()
+
+    monkeypatch.setattr(
+        "ethpm_cli._utils.ipfs.resolve_uri_contents", resolve_uri_contents
+    )
+    with IPFSAssetDownloader(tmp_path) as downloader:
+        actual = list(iter_manifest_ipfs_uris(["ipfs://QmAaaaaaaa"], downloader))
+
+    assert sorted(resolved) == sorted(manifests)
+    assert set(actual) == {
+        "ipfs://QmAsrcsrcsrc",
+        "ipfs://QmBbbbbbbb",
+        "ipfs://QmCccccccc",
+        "ipfs://QmAaaaaaaa",
+        "ipfs://QmCdocdocdoc",
+    }
+
+
+def test_iter_manifest_uri_fields_skips_inline_contents():
+    manifest = {
+        "manifest_version": "2",
+        "meta": {
+            "authors": ["ipfs://QmNotALink"],
+            "links": {"docs": "ipfs://QmDocs", "website": "https://ethpm.com"},
+        },
+        "sources": {
+            "./A.sol": "pragma solidity ^0.5.0;\ncontract A { string s = \"ipfs:\"; }",
+            "./B.sol": "ipfs://QmBsrc",
+        },
+        "contract_types": {"A": {"abi": [], "source_uri": "ipfs://QmNotASource"}},
+        "build_dependencies": {"owned": "ipfs://QmOwned"},
+    }
+    actual = iter_manifest_uri_fields(json.dumps(manifest, indent=4).encode())
+
+    assert list(actual) == [
+        ("links", "ipfs://QmDocs"),
+        ("links", "https://ethpm.com"),
+        ("sources", "ipfs://QmBsrc"),
+        ("build_dependencies", "ipfs://QmOwned"),
+    ]
 
 
 @pytest.mark.parametrize("interval", (40, 400, 4000))
@@ -0,0 +1,87 @@
+import pytest
+
+from ethpm_cli._utils.asset_store import (
+    LooseAssetStore,
+    PackedAssetStore,
+    get_asset_store,
+    get_ipfs_asset_path,
+)
+from ethpm_cli._utils.filesystem import check_dir_trees_equal
+from ethpm_cli.commands.store import (
+    VerificationReport,
+    pack_asset_store,
+    unpack_asset_store,
+    verify_asset_store,
+)
+from ethpm_cli.exceptions import AmbigiousFileSystem
+
+WALLET_HASH = "QmRMSm4k37mr2T3A2MGxAj2eAHGR5veibVt1t9Leh5waV1"
+
+
+def test_pack_and_unpack_asset_store(tmp_path, test_assets_dir):
+    ipfs_dir = test_assets_dir.parent / "ipfs"
+    with LooseAssetStore(ipfs_dir) as expected_store:
+        expected_assets = {
+            ipfs_hash: expected_store.read(ipfs_hash) for ipfs_hash in expected_store
+        }
+    with LooseAssetStore(tmp_path) as loose_store:
+        for ipfs_hash, contents in expected_assets.items():
+            loose_store.write(ipfs_hash, contents)
+
+    assert pack_asset_store(tmp_path) == len(expected_assets)
+    assert not (tmp_path / "Qm").exists()
+    with PackedAssetStore(tmp_path) as pack:
+        assert {ipfs_hash: pack.read(ipfs_hash) for ipfs_hash in pack} == (
+            expected_assets
+        )
+
+    assert unpack_asset_store(tmp_path) == len(expected_assets)
+    assert not (tmp_path / "assets.pack").exists()
+    assert check_dir_trees_equal(tmp_path / "Qm", ipfs_dir / "Qm")
+
+
+def test_unpack_requires_a_packed_asset_store(tmp_path):
+    with pytest.raises(AmbigiousFileSystem, match="No packed asset store"):
+        unpack_asset_store(tmp_path)
+
+
+@pytest.fixture
+def corrupt_store(tmp_path, owned_pkg_data):
+    with LooseAssetStore(tmp_path) as loose_store:
+        loose_store.write(
+            owned_pkg_data["content_hash"], owned_pkg_data["raw_manifest"]
+        )
+        loose_store.write(WALLET_HASH, b"not the wallet manifest")
+    return tmp_path
+
+
+@pytest.mark.parametrize("packed", (False, True))
+def test_verify_asset_store(corrupt_store, owned_pkg_data, packed):
+    if packed:
+        pack_asset_store(corrupt_store)
+
+    report = verify_asset_store(corrupt_store, jobs=2)
+    assert report == VerificationReport(2, 0, (WALLET_HASH,))
+    # only the asset that failed is checked again
+    assert verify_asset_store(corrupt_store, jobs=2) == report._replace(
+        checked=1, skipped=1
+    )
+
+    report = verify_asset_store(corrupt_store, quarantine=True, jobs=2)
+    assert report == VerificationReport(1, 1, (WALLET_HASH,))
+    assert (corrupt_store / "quarantine" / WALLET_HASH).read_bytes() == (
+        b"not the wallet manifest"
+    )
+    with get_asset_store(corrupt_store) as store:
+        assert list(store) == [owned_pkg_data["content_hash"]]
+    assert verify_asset_store(corrupt_store, jobs=2) == VerificationReport(0, 1, ())
+
+
+def test_verify_asset_store_checks_changed_assets(corrupt_store, owned_pkg_data):
+    verify_asset_store(corrupt_store, quarantine=True, jobs=1)
+    owned_path = get_ipfs_asset_path(corrupt_store, owned_pkg_data["content_hash"])
+    owned_path.write_bytes(b"tampered")
+
+    assert verify_asset_store(corrupt_store, jobs=1) == VerificationReport(
+        1, 0, (owned_pkg_data["content_hash"],)
+    )
@@ -5,7 +5,11 @@ import pytest
 
 from ethpm_cli.constants import ETHPM_PACKAGES_DIR
 from ethpm_cli.exceptions import InstallError, UriNotSupportedError, ValidationError
-from ethpm_cli.validation import validate_install_cli_args, validate_same_registry
+from ethpm_cli.validation import (
+    validate_install_cli_args,
+    validate_same_registry,
+    validate_scrape_cli_args,
+)
 
 
 @pytest.fixture
@@ -130,3 +134,96 @@ def test_validate_same_registry_validates_matching_registries(left, right):
 def test_validate_same_registry_invalidates_nonmatching_registries(left, right):
     with pytest.raises(ValidationError):
         validate_same_registry(left, right)
+
+
+@pytest.fixture
+def scrape_args():
+    return Namespace(
+        jobs=1,
+        ipfs_jobs=4,
+        min_batch_size=10,
+        max_batch_size=100,
+        confirmations=0,
+        poll_interval=15,
+        metrics_interval=10,
+        max_duration=None,
+        max_rpc_calls=None,
+        max_bytes=None,
+        workers=None,
+        follow=False,
+        pin_local=False,
+        status_file=None,
+        prometheus_file=None,
+        chain_ids=None,
+        start_block=None,
+    )
+
+
+@pytest.mark.parametrize("jobs_arg", ("jobs", "ipfs_jobs"))
+@pytest.mark.parametrize("jobs", (0, -1))
+def test_validate_scrape_cli_args_rejects_invalid_jobs(jobs_arg, jobs, scrape_args):
+    setattr(scrape_args, jobs_arg, jobs)
+
+    with pytest.raises(ValidationError):
+        validate_scrape_cli_args(scrape_args)
+
+
+@pytest.mark.parametrize("min_batch_size,max_batch_size", ((0, 10), (20, 10)))
+def test_validate_scrape_cli_args_rejects_invalid_batch_sizes(
+    min_batch_size, max_batch_size, scrape_args
+):
+    scrape_args.min_batch_size = min_batch_size
+    scrape_args.max_batch_size = max_batch_size
+
+    with pytest.raises(ValidationError):
+        validate_scrape_cli_args(scrape_args)
+
+
+@pytest.mark.parametrize(
+    "arg,value",
+    (
+        ("confirmations", -1),
+        ("poll_interval", 0),
+        ("poll_interval", -1),
+        ("metrics_interval", 0),
+        ("max_duration", 0),
+        ("max_rpc_calls", -1),
+        ("max_bytes", 0),
+    ),
+)
+def test_validate_scrape_cli_args_rejects_invalid_follow_args(arg, value, scrape_args):
+    setattr(scrape_args, arg, value)
+
+    with pytest.raises(ValidationError):
+        validate_scrape_cli_args(scrape_args)
+
+
+def test_validate_scrape_cli_args_rejects_start_block_for_many_chains(scrape_args):
+    scrape_args.start_block = 100
+    scrape_args.chain_ids = [3]
+    validate_scrape_cli_args(scrape_args)
+
+    scrape_args.chain_ids = [1, 3]
+    with pytest.raises(ValidationError):
+        validate_scrape_cli_args(scrape_args)
+
+
+@pytest.mark.parametrize(
+    "arg,value",
+    (
+        ("follow", True),
+        ("pin_local", True),
+        ("status_file", "status.json"),
+        ("max_duration", 60),
+        ("chain_ids", [1, 3]),
+    ),
+)
+def test_validate_scrape_cli_args_rejects_workers_with_single_process_args(
+    arg, value, scrape_args
+):
+    scrape_args.workers = 4
+    validate_scrape_cli_args(scrape_args)
+
+    setattr(scrape_args, arg, value)
+    with pytest.raises(ValidationError):
+        validate_scrape_cli_args(scrape_args)